@@ -4,12 +4,13 @@ from typing import Tuple, Dict
 import json
 import os
 import logging
-from pathlib import Path
-from jsonschema import validate
+from jsonschema.exceptions import best_match
 import litellm
-from jsonschema import validate
 from app.models import Message
 
+from .llm_cache import get_response_cache
+from .registry import registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +19,8 @@ class BaseAgent:
 
     name: str = "agent"
     schema_file: str | None = None
+    # opt in: identical (model, prompt, text) calls are answered from the response cache
+    cache_responses: bool = False
 
     def handle_message(self, text: str) -> Tuple[str, Dict]:
         """Process the message and return content type and payload."""
@@ -25,28 +28,22 @@ class BaseAgent:
 
     def system_prompt(self) -> str:
         """Return the system prompt for this agent if available."""
-        path = Path(__file__).parent / "prompt" / "system_prompt" / f"{self.name}.md"
-        return path.read_text() if path.exists() else ""
+        return registry.prompt(self.name)
 
     def load_schema(self) -> Dict:
         """Load the JSON schema for this agent if defined."""
         if not self.schema_file:
             return {}
-        path = Path(__file__).parent / "schema" / self.schema_file
-        if path.exists():
-            with open(path) as f:
-                return json.load(f)
-        return {}
+        return registry.schema(self.schema_file)
 
     def validate_payload(self, payload: Dict) -> None:
         """Validate the payload against the agent schema."""
-        schema = self.load_schema()
-        if schema:
-            try:
-                validate(instance=payload, schema=schema)
-            except Exception as e:
-                logger.warning(f"[SCHEMA WARNING] Validation failed: {e}\nPayload: {payload}")
-                raise
+        validator = registry.validator(self.schema_file) if self.schema_file else None
+        if validator:
+            error = best_match(validator.iter_errors(payload))
+            if error is not None:
+                logger.warning(f"[SCHEMA WARNING] Validation failed: {error}\nPayload: {payload}")
+                raise error
 
     def generate_payload(self, text: str) -> Dict:
         """Call the LLM using litellm and return the parsed JSON payload."""
@@ -55,10 +52,17 @@ class BaseAgent:
             {"role": "user", "content": text},
         ]
         model = os.getenv("LLM_MODEL", "gpt-4o-mini")
+        cache = get_response_cache() if self.cache_responses else None
+        key = cache.key(model, messages) if cache else None
         try:
-            response = litellm.completion(model=model, messages=messages)
-            content = response["choices"][0]["message"]["content"]
-            logger.debug(f"[AGENT: {self.name}] [LLM DEBUG] Raw LLM output: {content}")
+            raw = cache.get(key, self.name) if cache else None
+            if raw is None:
+                response = litellm.completion(model=model, messages=messages)
+                raw = response["choices"][0]["message"]["content"]
+                logger.debug(f"[AGENT: {self.name}] [LLM DEBUG] Raw LLM output: {raw}")
+            else:
+                logger.debug(f"[AGENT: {self.name}] [LLM DEBUG] Cached LLM output: {raw}")
+            content = raw
             
             # Handle JSON wrapped in markdown code fences (common with newer models)
             if content.strip().startswith("```") and content.strip().endswith("```"):
@@ -74,6 +78,9 @@ class BaseAgent:
             
             payload = json.loads(content)
             logger.debug(f"[AGENT: {self.name}] [LLM DEBUG] Parsed payload: {payload}")
+            if cache:
+                # only answers that parsed are worth replaying
+                cache.set(key, raw)
         except Exception as e:
             logger.exception("LLM call failed")
             payload = {}
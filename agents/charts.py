@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import plotly.graph_objects as go
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# bump when the figure styling changes so stored renders are not reused
+RENDERER_VERSION = "1"
+PALETTE = ["#2E86C1", "#28B463", "#F39C12", "#E74C3C", "#8E44AD", "#17A2B8", "#FFC107", "#6C757D"]
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def bar_chart_spec(title: str, labels: List[str], values: List[float], x_title: str = "", y_title: str = "") -> Dict:
+    """Plain JSON description of a bar chart, returned to the client as is."""
+    return {"kind": "bar", "title": title, "labels": list(labels), "values": list(values), "x_title": x_title,
+            "y_title": y_title}
+
+
+def line_chart_spec(title: str, labels: List[str], values: List[float], x_title: str = "", y_title: str = "") -> Dict:
+    """Plain JSON description of a line chart, for series over time."""
+    return {**bar_chart_spec(title, labels, values, x_title, y_title), "kind": "line"}
+
+
+def chart_key(spec: Dict, fmt: str = "png") -> str:
+    data = json.dumps({"spec": spec, "format": fmt, "version": RENDERER_VERSION}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def chart_path(spec: Dict, fmt: str = "png") -> str:
+    return key_path(chart_key(spec, fmt), fmt)
+
+
+def key_path(key: str, fmt: str = "png") -> str:
+    return f"charts/{key}.{fmt}"
+
+
+def build_figure(spec: Dict) -> go.Figure:
+    if spec.get("kind") == "line":
+        trace = go.Scatter(x=spec["labels"], y=spec["values"], mode='lines+markers', line=dict(color=PALETTE[0]))
+    else:
+        trace = go.Bar(
+            x=spec["labels"],
+            y=spec["values"],
+            marker_color=[PALETTE[i % len(PALETTE)] for i in range(len(spec["labels"]))],
+            text=[f'${value:,}' for value in spec["values"]],
+            textposition='auto',
+        )
+    fig = go.Figure(data=[trace])
+    fig.update_layout(
+        title={
+            'text': spec.get("title", ""),
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 20, 'family': 'Arial, sans-serif'}
+        },
+        xaxis_title=spec.get("x_title", ""),
+        yaxis_title=spec.get("y_title", ""),
+        template='plotly_white',
+        showlegend=False,
+        height=500,
+        margin=dict(l=50, r=50, t=80, b=50),
+        font=dict(size=12, family='Arial, sans-serif'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    fig.update_xaxes(tickangle=45, title_font_size=14)
+    fig.update_yaxes(title_font_size=14, tickformat='$,.0f')
+    return fig
+
+
+def render_chart(spec: Dict, fmt: str = "png") -> bytes:
+    """Render ``spec`` with kaleido, the slow part kept out of the request."""
+    return build_figure(spec).to_image(format=fmt, width=800, height=500, scale=2)
+
+
+def render_to_storage(spec: Dict, fmt: str = "png") -> str:
+    """Render ``spec`` unless the file of its content hash exists and return the storage path."""
+    path = chart_path(spec, fmt)
+    try:
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(render_chart(spec, fmt)))
+            logger.info("Rendered chart %s", path)
+    finally:
+        cache.delete(f"chart_render:{path}")
+    return path
+
+
+def request_chart(spec: Dict, fmt: str = "png") -> Dict:
+    """Return ``{"chart_id", "url", "status"}`` of the rendered chart, scheduling the render when needed.
+
+    Identical specs share one file and one render.  ``CHART_RENDER_BACKEND``
+    is ``celery`` (the ``render_chart`` task) or ``thread`` (a background
+    thread of this process).  A ``pending`` chart is polled with
+    :func:`chart_status` until it is ``ready``.
+    """
+    key = chart_key(spec, fmt)
+    path = key_path(key, fmt)
+    chart = {"chart_id": key, "url": default_storage.url(path)}
+    if default_storage.exists(path):
+        return {**chart, "status": "ready"}
+    # only the first request of a chart schedules it, until the render finishes
+    if cache.add(f"chart_render:{path}", True, getattr(settings, "CHART_RENDER_TIMEOUT", 300)):
+        if getattr(settings, "CHART_RENDER_BACKEND", "thread") == "celery":
+            from finance.celery_app import render_chart as render_chart_task
+            render_chart_task.delay(spec=spec, fmt=fmt)
+        else:
+            _render_executor().submit(_render_in_thread, spec, fmt)
+    return {**chart, "status": "pending"}
+
+
+def chart_status(key: str, fmt: str = "png") -> Dict:
+    """``{"chart_id", "url", "status"}`` of the chart ``key`` returned by :func:`request_chart`.
+
+    The status is ``ready`` once the file is stored, ``pending`` while its
+    render is scheduled and ``failed`` when the render ended without a file.
+    """
+    path = key_path(key, fmt)
+    if default_storage.exists(path):
+        status = "ready"
+    elif cache.get(f"chart_render:{path}"):
+        status = "pending"
+    else:
+        status = "failed"
+    return {"chart_id": key, "url": default_storage.url(path), "status": status}
+
+
+def _render_in_thread(spec: Dict, fmt: str) -> None:
+    try:
+        render_to_storage(spec, fmt)
+    except Exception:
+        logger.exception("Chart render failed")
+
+
+def _render_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=getattr(settings, "CHART_RENDER_WORKERS", 1),
+                                           thread_name_prefix="chart-render")
+        return _executor
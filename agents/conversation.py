@@ -13,15 +13,14 @@ class ConversationAgent(BaseAgent):
 
     def __init__(self, manifest_path: str | None = None) -> None:
         self.manifest = load_manifest(manifest_path)
-
-    def system_prompt(self) -> str:
-        base = super().system_prompt()
         caps = [
             {"name": a["name"], "user_friendly": a.get("user_friendly", "")}
             for a in self.manifest.get("agents", [])
         ]
-        manifest_obj = json.dumps({"capabilities": caps}, ensure_ascii=False)
-        return base + "\n" + manifest_obj
+        self._capabilities = json.dumps({"capabilities": caps}, ensure_ascii=False)
+
+    def system_prompt(self) -> str:
+        return super().system_prompt() + "\n" + self._capabilities
 
     def _format_single_message(self, messages: list[str]) -> str:
         """
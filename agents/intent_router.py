@@ -0,0 +1,69 @@
+import logging
+import re
+from typing import Dict, List, Set, Tuple
+
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+class IntentRouter:
+    """Local keyword classifier over the intents of ``intents.json``.
+
+    Every keyword (or phrase) of an intent that appears in the message adds
+    its word count to the intent score.  A score is confident when it beats
+    the runner-up and either a phrase matched or it leads by ``min_margin``,
+    so a single generic keyword is never enough.  When only the agent is
+    confident (its intents together) the payload leaves ``intent`` unset and
+    the agent decides.  Ambiguous and unknown messages return ``None`` and are
+    left to the LLM router.
+    """
+
+    def __init__(self, min_margin: int = 2):
+        intents = registry.intents()
+        self.min_margin = min_margin
+        self.agents: Dict[str, str] = {}
+        self.patterns: List[Tuple[str, re.Pattern, int]] = []
+        for intent, config in intents.items():
+            self.agents[intent] = config.get("agent")
+            for keyword in config.get("keywords", []):
+                pattern = re.compile(r"\b" + r"\s+".join(map(re.escape, keyword.lower().split())) + r"\b")
+                self.patterns.append((intent, pattern, len(keyword.split())))
+
+    def scores(self, text: str) -> Tuple[Dict[str, int], Set[str]]:
+        """Score of every matched intent and the intents matched by a phrase."""
+        lower = text.lower()
+        scores: Dict[str, int] = {}
+        phrases: Set[str] = set()
+        for intent, pattern, weight in self.patterns:
+            if pattern.search(lower):
+                scores[intent] = scores.get(intent, 0) + weight
+                if weight > 1:
+                    phrases.add(intent)
+        return scores, phrases
+
+    def _confident(self, scores: Dict[str, int], phrases: Set[str]) -> str | None:
+        """The top scored key when it is a confident match."""
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        (top, score), runner_up = ranked[0], ranked[1][1] if len(ranked) > 1 else 0
+        if score > runner_up and (top in phrases or score - runner_up >= self.min_margin):
+            return top
+        return None
+
+    def classify(self, text: str) -> Dict | None:
+        """Return an orchestrator payload for a confident match, otherwise ``None``."""
+        scores, phrases = self.scores(text)
+        intent = self._confident(scores, phrases)
+        if intent:
+            return {"schema_version": "1", "agent": self.agents[intent], "intent": intent, "params": {}}
+        agent_scores: Dict[str, int] = {}
+        for matched, score in scores.items():
+            agent_scores[self.agents[matched]] = agent_scores.get(self.agents[matched], 0) + score
+        agent = self._confident(agent_scores, {self.agents[matched] for matched in phrases})
+        if agent:
+            # the agent is clear but not which of its intents, it picks the intent itself
+            return {"schema_version": "1", "agent": agent, "params": {}}
+        logger.debug("No confident intent for '%s': %s", text, scores)
+        return None
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """In-process LRU store, entries expire ``ttl`` seconds after they were set."""
+
+    def __init__(self, max_size: int = 1024, ttl: int = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Store in a Django cache (Redis/Memcached when configured), shared between processes.
+
+    The keys carry a generation counter, ``clear()`` bumps it instead of
+    clearing the whole cache the other users of the cache share.
+    """
+
+    def __init__(self, alias: str = "default", ttl: int = 3600, prefix: str = "llm:"):
+        self.alias = alias
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _key(self, key: str) -> str:
+        generation = self.cache.get_or_set(self.prefix + "generation", 0, None)
+        return f"{self.prefix}{generation}:{key}"
+
+    def get(self, key: str) -> str | None:
+        return self.cache.get(self._key(key))
+
+    def set(self, key: str, value: str) -> None:
+        self.cache.set(self._key(key), value, self.ttl)
+
+    def clear(self) -> None:
+        # the entries of the previous generations expire on their own
+        try:
+            self.cache.incr(self.prefix + "generation")
+        except ValueError:
+            self.cache.set(self.prefix + "generation", 1, None)
+
+
+class ResponseCache:
+    """Raw LLM responses addressed by a hash of the model and the messages.
+
+    ``stats`` counts hits and misses per agent.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = Counter()
+
+    @staticmethod
+    def key(model: str, messages: List[Dict]) -> str:
+        data = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get(self, key: str, agent: str = "") -> str | None:
+        value = self.backend.get(key)
+        self.stats[f"{agent}.hit" if value is not None else f"{agent}.miss"] += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.backend.set(key, value)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.stats.clear()
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the process response cache configured by ``LLM_CACHE_BACKEND``.
+
+    ``memory`` (default) or ``django``, ``off`` disables caching.  Entries
+    live ``LLM_CACHE_TTL`` seconds, the memory backend keeps at most
+    ``LLM_CACHE_SIZE`` of them.
+    """
+    global _response_cache
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory")
+    if backend_name == "off":
+        return None
+    if _response_cache is None:
+        ttl = int(os.getenv("LLM_CACHE_TTL", "3600"))
+        if backend_name == "django":
+            backend = DjangoCacheBackend(os.getenv("LLM_CACHE_ALIAS", "default"), ttl)
+        else:
+            backend = MemoryBackend(int(os.getenv("LLM_CACHE_SIZE", "1024")), ttl)
+        _response_cache = ResponseCache(backend)
+    return _response_cache
@@ -1,7 +1,7 @@
 import logging
+from collections import Counter
 from typing import Tuple, Dict
 import json
-from pathlib import Path
 
 from app.models import Message
 
@@ -14,6 +14,8 @@ from .tax_pension import TaxPensionAgent
 from .investment import InvestmentAgent
 from .reporting import ReportingAgent
 from .conversation import ConversationAgent
+from .intent_router import IntentRouter
+from .registry import registry
 from .debt_strategy import DebtStrategyAgent
 from .reminder_scheduler import ReminderSchedulerAgent
 from .compliance_privacy import CompliancePrivacyAgent
@@ -22,10 +24,21 @@ from .manifest import load_manifest
 logger = logging.getLogger(__name__)
 
 
+def _resolve(value):
+    """Context values may be passed as loaders so they are only computed for the agents that use them."""
+    return value() if callable(value) else value
+
+
 class Orchestrator(BaseAgent):
-    """Router agent backed by an LLM with heuristic fallback."""
+    """Router agent backed by a local intent router, an LLM and a heuristic fallback.
+
+    Confident keyword matches are routed without the LLM, ``metrics`` counts
+    which routing and summary path every message took.
+    """
 
     name = "orchestrator"
+    # the routing payload only depends on the message
+    cache_responses = True
 
     def __init__(self, manifest_path: str | None = None):
         self.manifest = load_manifest(manifest_path)
@@ -46,17 +59,17 @@ class Orchestrator(BaseAgent):
         self.agent_name_map = {
             entry["name"]: entry["key"] for entry in self.manifest.get("agents", [])
         }
+        self.intent_router = IntentRouter()
+        self.metrics = Counter()
+        self._system_prompt = None
 
     def system_prompt(self) -> str:
         base = super().system_prompt()
-        
-        # Load intent mapping from intents.json
-        intents_path = Path(__file__).parent / "prompt" / "system_prompt" / "intents.json"
-        intent_mapping = {}
-        if intents_path.exists():
-            with open(intents_path) as f:
-                intent_mapping = json.load(f)
-        
+        intent_mapping = registry.intents()
+        # built once per registry version, the files only change on a dev reload
+        if self._system_prompt and self._system_prompt[0] == registry.version:
+            return self._system_prompt[1]
+
         # Build the intent → agent mapping table
         intent_map_lines = []
         for intent, config in intent_mapping.items():
@@ -77,7 +90,8 @@ class Orchestrator(BaseAgent):
             "## INTENT → AGENT MAP\n\n```\n```", 
             f"## INTENT → AGENT MAP\n\n{intent_map_section}\n\n## AVAILABLE AGENTS\n\n{manifest_obj}"
         )
-        
+
+        self._system_prompt = (registry.version, full_prompt)
         return full_prompt
 
     def _heuristic_route(self, text: str) -> str:
@@ -106,35 +120,43 @@ class Orchestrator(BaseAgent):
             return "conversation"
         return "onboarding"
 
+    def classify(self, text: str) -> Dict:
+        """Return the routing payload, from the intent router when it is confident and from the LLM otherwise."""
+        payload = self.intent_router.classify(text)
+        if payload:
+            self.metrics["route.fast_path"] += 1
+            return payload
+        self.metrics["route.llm"] += 1
+        return self.generate_payload(text)
+
+    def _agent_key(self, text: str, payload: Dict) -> str:
+        agent_key = self.agent_name_map.get(payload.get("agent"))
+        if not agent_key:
+            self.metrics["route.heuristic"] += 1
+            agent_key = self._heuristic_route(text)
+            logger.debug("Heuristic selected agent: %s", agent_key)
+        return agent_key
+
     def route(self, text: str, payload: Dict | None = None) -> str:
-        """Return which agent should handle the text via the LLM."""
+        """Return which agent should handle the text."""
         if payload is None:
-            payload = self.generate_payload(text)
+            payload = self.classify(text)
         logger.debug("Routing message: '%s' with payload: %s", text, payload)
 
-        agent_name = payload.get("agent")
-        agent_key = self.agent_name_map.get(agent_name)
-
-        if not agent_key:
-            agent_key = self._heuristic_route(text)
-            logger.debug("Heuristic selected agent: %s", agent_key)
+        agent_key = self._agent_key(text, payload)
 
         logger.debug("Final routed agent: %s", agent_key)
         return agent_key
 
     def handle_message(self, text: str, **context) -> Tuple[str, Dict]:
         """Route the message and delegate to the appropriate agent."""
-        payload = self.generate_payload(text)
+        payload = self.classify(text)
         logger.debug("Orchestrator payload: %s", payload)
 
-        agent_name = payload.get("agent")
         intent = payload.get("intent")
         params = payload.get("params", {})
 
-        agent_key = self.agent_name_map.get(agent_name)
-
-        if not agent_key:
-            agent_key = self._heuristic_route(text)
+        agent_key = self._agent_key(text, payload)
         logger.debug("Delegating to agent: %s", agent_key)
 
         kwargs = {}
@@ -143,10 +165,15 @@ class Orchestrator(BaseAgent):
             if intent:
                 kwargs["intent"] = intent
             kwargs.update(
-                transactions=context.get("transactions"),
-                category_map=context.get("category_map"),
-                budget_targets=context.get("budget_targets"),
-                budget_info=context.get("budget_info"),
+                transactions=_resolve(context.get("transactions")),
+                category_map=_resolve(context.get("category_map")),
+                budget_targets=_resolve(context.get("budget_targets")),
+                budget_info=_resolve(context.get("budget_info")),
+            )
+        elif agent_key == "reporting":
+            kwargs.update(
+                engine=_resolve(context.get("report_engine")),
+                debts=_resolve(context.get("debts")),
             )
         elif agent_key == "conversation":
             # Pass intent and params to conversation agent for direct user interactions
@@ -160,9 +187,20 @@ class Orchestrator(BaseAgent):
         content_type, payload = self.agents[agent_key].handle_message(text, **kwargs)
         logger.debug("Agent %s returned %s", agent_key, content_type)
 
-        if agent_key != "conversation":
-            content_type, payload = self.agents["conversation"].handle_message(
-                text, source="Data", agent=agent_key, payload=payload
-            )
-
+        if content_type in (Message.CHART, Message.IMAGE) and payload.get("labels"):
+            # the client draws the chart, and shows the image once rendered
+            self.metrics["summary.chart"] += 1
+        elif agent_key != "conversation":
+            summary = payload.get("summary_markdown") if isinstance(payload, dict) else None
+            if summary:
+                # the agent already wrote a user facing summary, no need to rewrite it with the LLM
+                self.metrics["summary.local"] += 1
+                content_type, payload = Message.TEXT, {"text": summary}
+            else:
+                self.metrics["summary.llm"] += 1
+                content_type, payload = self.agents["conversation"].handle_message(
+                    text, source="Data", agent=agent_key, payload=payload
+                )
+
+        logger.debug("Routing metrics: %s", dict(self.metrics))
         return content_type, payload
@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from jsonschema import Draft7Validator
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = Path(__file__).parent / "prompt" / "system_prompt"
+SCHEMA_DIR = Path(__file__).parent / "schema"
+
+
+def _read_json(path: Path) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _compile_validator(path: Path) -> Draft7Validator:
+    schema = _read_json(path)
+    Draft7Validator.check_schema(schema)
+    return Draft7Validator(schema)
+
+
+class PromptRegistry:
+    """System prompts, intents and compiled schema validators of the agents.
+
+    Every file is read and parsed once per process and shared by all agent
+    instances, the returned objects must be treated as read-only.  With
+    ``reload`` (``AGENT_PROMPTS_RELOAD=1``, for development) a file is read
+    again when its mtime changes and ``version`` is increased, so prompts
+    derived from the files can be rebuilt.
+    """
+
+    def __init__(self, prompt_dir: Path = PROMPT_DIR, schema_dir: Path = SCHEMA_DIR, reload: bool | None = None):
+        self.prompt_dir = Path(prompt_dir)
+        self.schema_dir = Path(schema_dir)
+        self.reload = os.getenv("AGENT_PROMPTS_RELOAD") == "1" if reload is None else reload
+        self.version = 0
+        self._entries: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def prompt(self, name: str) -> str:
+        return self._get(self.prompt_dir / f"{name}.md", Path.read_text, "")
+
+    def intents(self) -> Dict:
+        return self._get(self.prompt_dir / "intents.json", _read_json, {})
+
+    def schema(self, file_name: str) -> Dict:
+        return self._get(self.schema_dir / file_name, _read_json, {})
+
+    def validator(self, file_name: str) -> Draft7Validator | None:
+        return self._get(self.schema_dir / file_name, _compile_validator, None)
+
+    def _get(self, path: Path, loader: Callable[[Path], Any], default: Any) -> Any:
+        key = (path, loader)
+        entry = self._entries.get(key)
+        if entry is not None and not self.reload:
+            return entry[1]
+        mtime = path.stat().st_mtime_ns if path.exists() else None
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        with self._lock:
+            value = loader(path) if mtime is not None else default
+            if entry is not None:
+                self.version += 1
+                logger.info("Reloaded %s", path)
+            self._entries[key] = (mtime, value)
+        return value
+
+
+registry = PromptRegistry()
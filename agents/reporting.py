@@ -1,25 +1,28 @@
-import base64
-import io
 import uuid
 from datetime import datetime
 from typing import Dict, List
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
+from . import charts
 from .base import BaseAgent
 from app.models import Message
+from myFinance.report_engine import ReportEngine
 
 
 class ReportingAgent(BaseAgent):
     """
     Reporting & Visualization Agent using Plotly for beautiful financial charts.
     
-    CURRENT IMPLEMENTATION: Plotly + PNG export + base64 encoding
+    CURRENT IMPLEMENTATION: the reply carries the chart spec (labels/values)
+    and a ``chart_url``; the Plotly PNG is rendered off the request by
+    ``agents.charts`` and stored once per content hash.  While
+    ``chart_status`` is ``pending`` the client draws the labels/values and
+    polls ``/api/charts/<chart_id>/`` until the image is ``ready``.  The data comes from
+    ``myFinance.report_engine`` (the monthly rollup), or sample data when no
+    engine is passed.
     
     FUTURE OPTIONS TO CONSIDER:
     1. Interactive HTML charts: Use fig.to_html() for interactive charts in iframes
-    2. SVG export: Use fig.to_image(format="svg") for scalable vector graphics
+    2. SVG export: request_chart(spec, "svg") for scalable vector graphics
     3. Chart.js integration: Use pyecharts or similar for web-native charts
     4. Real-time updates: WebSocket integration for live chart updates
     5. Dashboard mode: Multi-chart layouts using plotly.subplots
@@ -28,100 +31,115 @@ class ReportingAgent(BaseAgent):
     name = "reporting"
     schema_file = "Report.json"
 
-    def handle_message(self, text: str):
-        """Generate charts based on user request."""
+    def handle_message(self, text: str, engine=None, debts: List[Dict] | None = None):
+        """Generate charts based on user request.
+
+        ``engine`` is the user's :class:`~myFinance.report_engine.ReportEngine`;
+        without it the sample chart is returned.
+        """
         
         lower = text.lower()
-        chart_data = self._generate_sample_chart()
-        categories = [
-            "Food & Dining", "Transportation", "Shopping", "Entertainment",
-            "Bills & Utilities", "Healthcare", "Travel", "Other",
-        ]
-        amounts = [1200, 800, 600, 400, 900, 300, 500, 200]
-        if "chart data" in lower:
-            payload = {
-                "report_id": str(uuid.uuid4()),
-                "type": "budget",
-                "generated_at": datetime.now().isoformat(),
-                "source_refs": ["sample_data"],
-                "labels": categories,
-                "values": amounts,
-                "summary_markdown": "## Monthly Expenses by Category\n\nThis chart shows your spending breakdown by category for the selected period.",
-            }
+        if engine is None:
+            spec = self._sample_chart_spec()
+            payload = self._payload("budget", spec, ["sample_data"],
+                                    "## Monthly Expenses by Category\n\nThis chart shows your spending breakdown by category for the selected period.")
+        else:
+            payload = self._report(lower, engine, debts)
+            spec = payload.pop("spec")
+        if "chart data" in lower or spec is None:
             self.validate_payload(payload)
             return Message.CHART, payload
-        payload = {
-            "report_id": str(uuid.uuid4()),
-            "type": "budget",
-            "generated_at": datetime.now().isoformat(),
-            "source_refs": ["sample_data"],
-            "chart_url": f"data:image/png;base64,{chart_data}",
-            "summary_markdown": "## Monthly Expenses by Category\n\nThis chart shows your spending breakdown by category for the selected period.",
-        }
+        chart = charts.request_chart(spec)
+        payload["chart_id"] = chart["chart_id"]
+        payload["chart_url"] = chart["url"]
+        payload["chart_status"] = chart["status"]
         if "chart image" in lower:
             self.validate_payload(payload)
             return Message.IMAGE, payload
         self.validate_payload(payload)
         return Message.CHART, payload
-    def _generate_sample_chart(self) -> str:
-        """Generate a sample monthly expenses by category bar chart."""
+
+    def _payload(self, report_type: str, spec: Dict | None, source_refs: List[str], summary: str) -> Dict:
+        payload = {
+            "report_id": str(uuid.uuid4()),
+            "type": report_type,
+            "generated_at": datetime.now().isoformat(),
+            "source_refs": source_refs,
+            "summary_markdown": summary,
+        }
+        if spec is not None:
+            payload.update(title=spec["title"], labels=spec["labels"], values=spec["values"])
+        return payload
+
+    def _report(self, lower: str, engine, debts: List[Dict] | None) -> Dict:
+        """Payload of the report asked for in ``lower``, computed by ``engine``; its ``spec`` is popped by the caller."""
+        if "debt" in lower:
+            spec = self._generate_debt_payoff_timeline(debts or [], engine)
+            if spec is None:
+                payload = self._payload("debt_payoff", None, [], "## Debt Payoff Timeline\n\n"
+                                        "Tell me the balance, interest rate and monthly payment of each debt.")
+                payload["missing_info"] = ["debts"]
+            else:
+                timeline = engine.debt_payoff_timeline(debts)
+                lines = [
+                    f"- **{name}**: " + (f"paid off in {months} months, ${timeline['interest'][name]:,.2f} interest"
+                                         if months is not None else "the payment does not cover the interest")
+                    for name, months in timeline["payoff_months"].items()
+                ]
+                payload = self._payload("debt_payoff", spec, ["debts"], "## Debt Payoff Timeline\n\n" + "\n".join(lines))
+            return {**payload, "spec": spec}
+
+        if not engine.has_data():
+            payload = self._payload("budget", None, ["monthly_tag_totals"], "## No Data Yet\n\n"
+                                    "There are no transactions to report on yet, upload or sync your accounts first.")
+            payload["missing_info"] = ["transactions"]
+            return {**payload, "spec": None}
+
+        if "net worth" in lower or "trend" in lower:
+            spec = self._generate_net_worth_trend(engine)
+            trend = engine.net_worth_trend()
+            summary = (f"## Net Worth Trend\n\nYour net cash flow over the last {len(trend['values'])} months "
+                       f"is ${trend['values'][-1]:,.2f}.")
+            return {**self._payload("net_worth", spec, ["monthly_tag_totals"], summary), "spec": spec}
+
+        breakdown = engine.category_breakdown()
+        change = engine.month_over_month()
+        spec = charts.bar_chart_spec(f"Expenses by Category, last {engine.months} months", breakdown["labels"],
+                                     breakdown["values"], x_title='Category', y_title='Amount ($)')
+        lines = [f"Total expenses: ${breakdown['total']:,.2f}."]
+        if change["labels"]:
+            lines.append(f"\nLargest changes in {change['month']} compared to the month before:")
+            for name, delta, percent in list(zip(change["labels"], change["delta"], change["percent"]))[:3]:
+                lines.append(f"- **{name}**: {delta:+,.2f}" + (f" ({percent:+.1f}%)" if percent is not None else ""))
+        summary = "## Expenses by Category\n\n" + "\n".join(lines)
+        return {**self._payload("budget", spec, ["monthly_tag_totals"], summary), "spec": spec}
+
+    def _sample_chart_spec(self) -> Dict:
+        """Spec of a sample monthly expenses by category bar chart."""
         # Sample data - in production, this would come from actual financial data
         categories = ['Food & Dining', 'Transportation', 'Shopping', 'Entertainment', 
                      'Bills & Utilities', 'Healthcare', 'Travel', 'Other']
         amounts = [1200, 800, 600, 400, 900, 300, 500, 200]
-        
-        # Create beautiful bar chart using Plotly
-        fig = go.Figure(data=[
-            go.Bar(
-                x=categories,
-                y=amounts,
-                marker_color=['#2E86C1', '#28B463', '#F39C12', '#E74C3C', 
-                             '#8E44AD', '#17A2B8', '#FFC107', '#6C757D'],
-                text=[f'${amount:,}' for amount in amounts],
-                textposition='auto',
-            )
-        ])
-        
-        # Customize layout for professional appearance
-        fig.update_layout(
-            title={
-                'text': 'Monthly Expenses by Category',
-                'x': 0.5,
-                'xanchor': 'center',
-                'font': {'size': 20, 'family': 'Arial, sans-serif'}
-            },
-            xaxis_title='Category',
-            yaxis_title='Amount ($)',
-            template='plotly_white',  # Clean, professional theme
-            showlegend=False,
-            height=500,
-            margin=dict(l=50, r=50, t=80, b=50),
-            font=dict(size=12, family='Arial, sans-serif'),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-        )
-        
-        # Style the axes
-        fig.update_xaxes(tickangle=45, title_font_size=14)
-        fig.update_yaxes(title_font_size=14, tickformat='$,.0f')
-        
-        # Export to PNG and encode as base64
-        img_bytes = fig.to_image(format="png", width=800, height=500, scale=2)
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
-        return img_base64
+        return charts.bar_chart_spec('Monthly Expenses by Category', categories, amounts, x_title='Category',
+                                     y_title='Amount ($)')
 
-    def _generate_net_worth_trend(self, data: List[Dict]) -> str:
-        """Generate net worth trend chart (example for future implementation)."""
-        # This would be implemented when we have actual net worth data
-        pass
+    def _generate_net_worth_trend(self, engine) -> Dict | None:
+        """Line chart spec of the cumulative net cash flow, ``None`` without data."""
+        if engine is None or not engine.has_data():
+            return None
+        trend = engine.net_worth_trend()
+        return charts.line_chart_spec('Net Worth Trend', trend["labels"], trend["values"], x_title='Month',
+                                      y_title='Amount ($)')
     
     def _generate_portfolio_allocation(self, holdings: List[Dict]) -> str:
         """Generate portfolio allocation pie chart (example for future implementation)."""
         # This would be implemented when we have actual portfolio data
         pass
     
-    def _generate_debt_payoff_timeline(self, debts: List[Dict]) -> str:
-        """Generate debt payoff timeline chart (example for future implementation)."""
-        # This would be implemented when we have actual debt data
-        pass
+    def _generate_debt_payoff_timeline(self, debts: List[Dict], engine=None) -> Dict | None:
+        """Line chart spec of the total remaining debt per month, ``None`` without debts."""
+        if not debts:
+            return None
+        timeline = (engine or ReportEngine(None)).debt_payoff_timeline(debts)
+        return charts.line_chart_spec('Debt Payoff Timeline', timeline["labels"], timeline["values"],
+                                      x_title='Month', y_title='Remaining balance ($)')
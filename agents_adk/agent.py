@@ -3,8 +3,11 @@ Main entry point for the ADK-based finance agent system.
 Properly structured with all agents, workflows, and ADK features.
 """
 
+import logging
 import os
-from typing import Dict, Any
+import threading
+import time
+from typing import Any, Callable, Dict, List
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 from google.adk.sessions import Session
@@ -30,6 +33,8 @@ from .tools.finance_tools import (
 # Load environment variables
 os.environ.setdefault('GOOGLE_GENAI_USE_VERTEXAI', '0')
 
+logger = logging.getLogger(__name__)
+
 
 def create_reporting_agent() -> Agent:
     """Create the reporting agent for financial reports and analysis."""
@@ -415,28 +420,32 @@ def create_simple_tax_pension_agent() -> Agent:
     )
 
 
+# Factories of the sub agents of the orchestrator, in routing order
+AGENT_FACTORIES: Dict[str, Callable[[], Agent]] = {
+    'onboarding_agent': create_onboarding_agent,
+    'cash_flow_agent': create_cash_flow_agent,
+    'goal_setting_agent': create_goal_setting_agent,
+    'reporting_agent': create_reporting_agent,
+    'investment_agent': create_investment_agent,
+    'debt_strategy_agent': create_debt_strategy_agent,
+    'safety_agent': create_safety_agent,
+    'tax_pension_agent': create_tax_pension_agent,
+    'compliance_privacy_agent': create_compliance_privacy_agent,
+    'reminder_scheduler_agent': create_reminder_scheduler_agent,
+    'conversation_agent': create_conversation_agent,
+    # Simple agents without tools for demonstration
+    'simple_investment_agent': create_simple_investment_agent,
+    'simple_safety_agent': create_simple_safety_agent,
+    'simple_tax_pension_agent': create_simple_tax_pension_agent,
+}
+
+
 # Create all agents
 def create_all_agents() -> Dict[str, Agent]:
     """Create all finance agents with proper configuration."""
     
     # Create individual agents
-    agents = {
-        'onboarding_agent': create_onboarding_agent(),
-        'cash_flow_agent': create_cash_flow_agent(),
-        'goal_setting_agent': create_goal_setting_agent(),
-        'reporting_agent': create_reporting_agent(),
-        'investment_agent': create_investment_agent(),
-        'debt_strategy_agent': create_debt_strategy_agent(),
-        'safety_agent': create_safety_agent(),
-        'tax_pension_agent': create_tax_pension_agent(),
-        'compliance_privacy_agent': create_compliance_privacy_agent(),
-        'reminder_scheduler_agent': create_reminder_scheduler_agent(),
-        'conversation_agent': create_conversation_agent(),
-        # Simple agents without tools for demonstration
-        'simple_investment_agent': create_simple_investment_agent(),
-        'simple_safety_agent': create_simple_safety_agent(),
-        'simple_tax_pension_agent': create_simple_tax_pension_agent()
-    }
+    agents = {name: factory() for name, factory in AGENT_FACTORIES.items()}
     
     # Create orchestrator with all sub-agents
     orchestrator = create_finance_orchestrator()
@@ -446,6 +455,65 @@ def create_all_agents() -> Dict[str, Agent]:
     return agents
 
 
+class AgentRegistry:
+    """Agents by name, each built by its factory on first use and kept.
+
+    ``build_times`` holds the seconds each agent took to build, the time of
+    the orchestrator includes its sub agents built along with it.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Agent]] = {}
+        self._agents: Dict[str, Agent] = {}
+        self.build_times: Dict[str, float] = {}
+        # reentrant, the orchestrator factory gets its sub agents from the registry
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Agent]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._agents.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._agents
+
+    def get(self, name: str) -> Agent:
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                factory = self._factories[name]
+                start = time.perf_counter()
+                agent = self._agents[name] = factory()
+                self.build_times[name] = time.perf_counter() - start
+                logger.debug("Built agent %s in %.1f ms", name, self.build_times[name] * 1000)
+            return agent
+
+    def all(self) -> Dict[str, Agent]:
+        return {name: self.get(name) for name in self._factories}
+
+    def report(self) -> str:
+        """Build time of every built agent, slowest first."""
+        lines = ['{:<28}{:>10}'.format('agent', 'build ms')]
+        for name, seconds in sorted(self.build_times.items(), key=lambda item: -item[1]):
+            lines.append('{:<28}{:>10.1f}'.format(name, seconds * 1000))
+        return '\n'.join(lines)
+
+
+def _create_root_agent() -> Agent:
+    orchestrator = create_finance_orchestrator()
+    orchestrator.sub_agents = [agent_registry.get(name) for name in AGENT_FACTORIES]
+    return orchestrator
+
+
+agent_registry = AgentRegistry()
+for _name, _factory in AGENT_FACTORIES.items():
+    agent_registry.register(_name, _factory)
+agent_registry.register('orchestrator', _create_root_agent)
+
+
 # Simple workflow management without complex ADK workflows
 class SimpleWorkflow:
     """Simple workflow implementation for multi-step processes."""
@@ -468,13 +536,19 @@ def create_finance_workflows(agents: Dict[str, Agent]) -> Dict[str, Any]:
     }
 
 
-# Initialize the complete system
-all_agents = create_all_agents()
-finance_workflows = create_finance_workflows(all_agents)
+def __getattr__(name: str) -> Any:
+    # the agent graph is built on first access, not when the module is imported
+    if name in ('root_agent', 'orchestrator'):
+        value = agent_registry.get('orchestrator')
+    elif name == 'all_agents':
+        value = agent_registry.all()
+    elif name == 'finance_workflows':
+        value = create_finance_workflows(agent_registry.all())
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
-# Main entry points
-root_agent = all_agents['orchestrator']
-orchestrator = all_agents['orchestrator']  # Alias for compatibility
 
 # Export key components
 __all__ = [
@@ -482,6 +556,8 @@ __all__ = [
     'orchestrator',
     'all_agents',
     'finance_workflows',
+    'agent_registry',
+    'AgentRegistry',
     'create_all_agents',
     'create_finance_workflows'
 ]
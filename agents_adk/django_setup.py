@@ -0,0 +1,23 @@
+"""
+Django set up on first use, for the ADK tools running outside of a Django
+process (``adk web``, the scripts of this package).
+"""
+
+import os
+
+import django
+from django.apps import apps
+
+
+def ensure_django() -> None:
+    """Set Django up unless the running process already did."""
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance.settings')
+        django.setup()
+
+
+def finance_queries():
+    """The ``myFinance.finance_queries`` module, with Django set up."""
+    ensure_django()
+    from myFinance import finance_queries
+    return finance_queries
@@ -0,0 +1,189 @@
+"""
+Result cache of the ADK finance tools, scoped to a conversation turn or session.
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+from ..django_setup import finance_queries
+
+TURN = "turn"
+SESSION = "session"
+# session state key of the cache statistics
+STATS_KEY = "tool_cache"
+
+
+class _SessionEntries:
+    """Cached results of one ADK session."""
+
+    def __init__(self):
+        self.invocation_id = None
+        self.turn: Dict[tuple, str] = {}
+        self.session: Dict[tuple, tuple] = {}
+        self.stats = Counter(hits=0, misses=0, invalidations=0)
+
+
+class ToolResultCache:
+    """In-process cache of tool results keyed by ``(user_id, data version, tool name, arguments)``.
+
+    ``turn`` entries live until the session starts another invocation (the
+    next user message), so repeated calls of the orchestrator and its sub
+    agents within one turn share them.  ``session`` entries live for the
+    session, at most ``ADK_TOOL_CACHE_TTL`` seconds.  Write tools drop the
+    entries of the user in every session, and any other change of the user's
+    data (e.g. a celery ingestion) replaces the data version, see
+    ``FinanceQueryService.version``.  Up to ``ADK_TOOL_CACHE_SESSIONS``
+    sessions are kept, least recently used first out.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, ttl: Optional[float] = None):
+        self._max_sessions = max_sessions
+        self._ttl = ttl
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    # the settings are read on use, the module is imported before Django is set up outside of a Django process
+    @property
+    def max_sessions(self) -> int:
+        return self._max_sessions or getattr(settings, "ADK_TOOL_CACHE_SESSIONS", 256)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl or getattr(settings, "ADK_TOOL_CACHE_TTL", 300)
+
+    def get(self, tool_context, key: tuple, scope: str) -> Optional[str]:
+        with self._lock:
+            entries = self._entries(tool_context)
+            if scope == TURN:
+                result = entries.turn.get(key)
+            else:
+                expires, result = entries.session.get(key, (0, None))
+                if expires < time.monotonic():
+                    result = None
+            entries.stats["hits" if result is not None else "misses"] += 1
+            return result
+
+    def put(self, tool_context, key: tuple, scope: str, result: str) -> None:
+        with self._lock:
+            entries = self._entries(tool_context)
+            if scope == TURN:
+                entries.turn[key] = result
+            else:
+                entries.session[key] = (time.monotonic() + self.ttl, result)
+
+    def invalidate(self, user_id, tool_context=None) -> None:
+        """Drop the cached results of ``user_id`` in every session."""
+        user_id = str(user_id)
+        with self._lock:
+            for entries in self._sessions.values():
+                for scoped in (entries.turn, entries.session):
+                    for key in [key for key in scoped if key[0] == user_id]:
+                        del scoped[key]
+            if tool_context is not None:
+                self._entries(tool_context).stats["invalidations"] += 1
+
+    def stats(self, tool_context) -> Dict[str, int]:
+        with self._lock:
+            entries = self._sessions.get(self._session_key(tool_context.session))
+            stats = dict(entries.stats) if entries else dict(_SessionEntries().stats)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    @staticmethod
+    def _session_key(session) -> tuple:
+        return session.app_name, session.user_id, session.id
+
+    def _entries(self, tool_context) -> _SessionEntries:
+        key = self._session_key(tool_context.session)
+        entries = self._sessions.get(key)
+        if entries is None:
+            entries = self._sessions[key] = _SessionEntries()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(key)
+        if entries.invocation_id != tool_context.invocation_id:
+            # a new turn started
+            entries.invocation_id = tool_context.invocation_id
+            entries.turn.clear()
+        return entries
+
+
+tool_cache = ToolResultCache()
+
+
+def _with_tool_context(func: Callable, wrapper: Callable) -> Callable:
+    """Give ``wrapper`` the signature of ``func`` plus ``tool_context``, which ADK injects and hides from the model."""
+    signature = inspect.signature(func)
+    parameters = list(signature.parameters.values())
+    if "tool_context" not in signature.parameters:
+        parameters.append(inspect.Parameter("tool_context", inspect.Parameter.KEYWORD_ONLY, default=None))
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+
+def _data_version(user_id: str) -> str:
+    # the model signals replace it on every change of the user's data, in any process
+    return finance_queries().FinanceQueryService.version(user_id)
+
+
+def _publish_stats(tool_context) -> None:
+    # the statistics are kept in the session state, so they are stored with the session
+    tool_context.state[STATS_KEY] = tool_cache.stats(tool_context)
+
+
+def cached_tool(scope: str = TURN) -> Callable:
+    """Cache the JSON result of a read tool for the ``turn`` or the ``session``.
+
+    Calls outside of an ADK run (no ``tool_context``) and error results are
+    not cached.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, tool_context=None, **kwargs):
+            if tool_context is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            user_id = str(arguments.pop("user_id"))
+            key = (user_id, _data_version(user_id), func.__name__, json.dumps(arguments, sort_keys=True, default=str))
+            result = tool_cache.get(tool_context, key, scope)
+            if result is None:
+                result = func(*args, **kwargs)
+                if not result.startswith('{"error"'):
+                    tool_cache.put(tool_context, key, scope, result)
+            _publish_stats(tool_context)
+            return result
+
+        return _with_tool_context(func, wrapper)
+
+    return decorator
+
+
+def invalidates_tool_cache(func: Callable) -> Callable:
+    """Drop the cached results of the user after the write tool ran."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, tool_context=None, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tool_cache.invalidate(signature.bind(*args, **kwargs).arguments["user_id"], tool_context)
+            if tool_context is not None:
+                _publish_stats(tool_context)
+
+    return _with_tool_context(func, wrapper)
@@ -33,7 +33,7 @@ def next_bill_date(user):
     defaults to the DateInput start_date
     """
     bill_dates = []
-    for c_info in Credential.objects.all().values_list('additional_info', flat=True):
+    for c_info in Credential.objects.filter(user=user).values_list('additional_info', flat=True):
         for detail in c_info.get('card_details', []):
             bill_dates.append(detail['next_bill'])
     bill_day = datetime.datetime.fromisoformat(max(bill_dates)).date() if bill_dates else DateInput.objects.filter(
@@ -45,8 +45,11 @@ def next_bill_date(user):
     return next_bill
 
 
-def date_in_bill_month(day, user):
-    bill_day = next_bill_date(user)
+def date_in_bill_month(day, user, bill_day=None):
+    """
+    :param bill_day: precomputed next_bill_date(user), computed when not given
+    """
+    bill_day = bill_day or next_bill_date(user)
     try:
         bill_in_month = bill_day.replace(day=day) # day is out of range for month
     except ValueError:
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.14 on 2026-10-18 20:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_name', models.CharField(max_length=128)),
+                ('session_id', models.CharField(max_length=128)),
+                ('state', models.JSONField(default=dict)),
+                ('update_time', models.FloatField(default=0)),
+                ('compacted_until', models.FloatField(default=0)),
+                ('conversation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='agent_sessions', to='app.conversation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AgentSessionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=128)),
+                ('author', models.CharField(max_length=128)),
+                ('timestamp', models.FloatField()),
+                ('is_compaction', models.BooleanField(default=False)),
+                ('data', models.JSONField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='app.agentsession')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='agentsessionevent',
+            index=models.Index(fields=['session', 'timestamp'], name='app_agentse_session_fdcfa5_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='agentsession',
+            unique_together={('app_name', 'user', 'session_id')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.14 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_agent_session'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'timestamp', 'id'], name='app_message_convers_519a08_idx'),
+        ),
+    ]
@@ -52,8 +52,49 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [models.Index(fields=["conversation", "timestamp", "id"])]
 
     def __str__(self) -> str:
         return f"{self.sender} - {self.payload}"
 
 
+
+
+class AgentSession(models.Model):
+    """Durable ADK session of a user, keyed by the conversation id."""
+
+    app_name = models.CharField(max_length=128)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    session_id = models.CharField(max_length=128)
+    conversation = models.ForeignKey(
+        Conversation, related_name="agent_sessions", null=True, blank=True, on_delete=models.CASCADE
+    )
+    state = models.JSONField(default=dict)
+    # epoch seconds of the last stored event, compared by the in-process cache
+    update_time = models.FloatField(default=0)
+    # events up to this timestamp are covered by a compaction event
+    compacted_until = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = [("app_name", "user", "session_id")]
+
+    def __str__(self) -> str:
+        return f"{self.app_name} session {self.session_id} for {self.user_id}"
+
+
+class AgentSessionEvent(models.Model):
+    """Single ADK event of a session, rows are only inserted, never updated."""
+
+    session = models.ForeignKey(AgentSession, related_name="events", on_delete=models.CASCADE)
+    event_id = models.CharField(max_length=128)
+    author = models.CharField(max_length=128)
+    timestamp = models.FloatField()
+    is_compaction = models.BooleanField(default=False)
+    data = models.JSONField()
+
+    class Meta:
+        ordering = ["timestamp", "id"]
+        indexes = [models.Index(fields=["session", "timestamp"])]
+
+    def __str__(self) -> str:
+        return f"{self.author} event {self.event_id}"
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class MessageCursorPagination(CursorPagination):
+    """Chat messages newest first, a page is ``page_size`` (max 200) messages."""
+
+    ordering = ("-timestamp", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
@@ -1,5 +1,6 @@
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from .models import Conversation, Message
 
@@ -45,4 +46,27 @@ class MessageSerializer(serializers.ModelSerializer):
         ]
 
 
+class CompactMessageSerializer(MessageSerializer):
+    """Message with chart and image payloads reduced to their summary fields.
 
+    The full payload is served by ``payload_url``.
+    """
+
+    HEAVY_CONTENT_TYPES = (Message.CHART, Message.IMAGE)
+    SUMMARY_KEYS = ("report_id", "type", "generated_at", "title", "summary_markdown")
+
+    payload = serializers.SerializerMethodField()
+    payload_url = serializers.SerializerMethodField()
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ["payload_url"]
+
+    def get_payload(self, obj) -> dict:
+        if obj.content_type not in self.HEAVY_CONTENT_TYPES:
+            return obj.payload
+        return {key: obj.payload[key] for key in self.SUMMARY_KEYS if key in obj.payload}
+
+    def get_payload_url(self, obj) -> str | None:
+        if obj.content_type not in self.HEAVY_CONTENT_TYPES:
+            return None
+        return reverse("chat_message", args=[obj.pk], request=self.context.get("request"))
@@ -2,51 +2,76 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import datetime
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Iterable, List, Dict, Optional, Any
+from typing import Iterable, Iterator, List, Dict, Optional, Any
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from app.models import Conversation, Message
+from app.services.event_loop import EventLoopThread, adk_loop
 from myFinance.models import Transaction, TransactionNameTag, TagGoal
 
-# Load environment variables from agents_adk/.env file
-env_file = Path(__file__).parent.parent.parent / 'agents_adk' / '.env'
-if env_file.exists():
-    with open(env_file) as f:
-        for line in f:
-            if line.strip() and not line.startswith('#'):
-                if '=' in line:
-                    key, value = line.strip().split('=', 1)
-                    os.environ[key] = value
-
-from agents_adk.agent import root_agent
+from agents_adk.agent import agent_registry
 
 try:
+    from google.adk.agents.run_config import RunConfig, StreamingMode, ToolThreadPoolConfig
     from google.adk.runners import Runner
-    from google.adk.sessions import InMemorySessionService
     from google.genai import types
+
+    from app.services.session_service import DjangoSessionService
 except Exception:  # pragma: no cover - ADK may not be installed during tests
+    RunConfig = StreamingMode = ToolThreadPoolConfig = None  # type: ignore
     Runner = None  # type: ignore
-    InMemorySessionService = None  # type: ignore
+    DjangoSessionService = None  # type: ignore
     types = None  # type: ignore
 
 
 logger = logging.getLogger(__name__)
 
+ENV_FILE = Path(__file__).parent.parent.parent / 'agents_adk' / '.env'
+
+
+@lru_cache(maxsize=None)
+def load_agent_env(env_file: Path = ENV_FILE) -> None:
+    """Load the environment variables of the agents from ``agents_adk/.env``, once per process."""
+    if env_file.exists():
+        with open(env_file) as f:
+            for line in f:
+                if line.strip() and not line.startswith('#'):
+                    if '=' in line:
+                        key, value = line.strip().split('=', 1)
+                        os.environ[key] = value
+
 
 class ADKChatService:
     """Service layer using the ADK runner to process messages."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        loop: EventLoopThread | None = None,
+        debug_sessions: bool | None = None,
+        session_service: Any = None,
+    ) -> None:
         if Runner is None:
             raise ImportError("google-adk is required for ADKChatService")
-        self.session_service = InMemorySessionService()
-        self.runner = Runner(agent=root_agent, app_name="FinanceAgent", session_service=self.session_service)
+        load_agent_env()
+        # the async session and runner APIs all run on one long-lived loop
+        self.loop = loop or adk_loop
+        # ADK_DEBUG_SESSIONS=1 logs the session state around every message
+        self.debug_sessions = os.getenv("ADK_DEBUG_SESSIONS") == "1" if debug_sessions is None else debug_sessions
+        # sessions live in the database, shared by all workers and kept across restarts
+        self.session_service = session_service or DjangoSessionService()
+
+    @cached_property
+    def runner(self) -> Any:
+        # the agent graph is built for the first message, not when the service is created
+        return Runner(agent=agent_registry.get("orchestrator"), app_name="FinanceAgent",
+                      session_service=self.session_service)
 
     def get_conversation(self, user: get_user_model()) -> Conversation:
         conversation, _ = Conversation.objects.get_or_create(user=user)
@@ -172,24 +197,23 @@ class ADKChatService:
                     user_id=user_id, 
                     session_id=session_id
                 )
-                logger.info(f"🆕 Created new session for user {user_id}, session {session_id}")
+                logger.debug("Created new session for user %s, session %s", user_id, session_id)
             else:
-                logger.info(f"♻️  Using existing session for user {user_id}, session {session_id} (events: {len(existing_session.events)})")
-        
-        try:
-            # Try to get the current event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # When called inside async context, use run_until_complete
-                loop.run_until_complete(ensure_session_async())
-            else:
-                # Loop exists but not running, use asyncio.run
-                asyncio.run(ensure_session_async())
-        except RuntimeError:
-            # No event loop in current thread (Django request thread), create one
-            asyncio.run(ensure_session_async())
+                logger.debug("Using existing session for user %s, session %s (events: %s)", user_id, session_id,
+                             len(existing_session.events))
+
+        self.loop.run(ensure_session_async())
 
     def send_message(self, user: get_user_model(), text: str) -> Message:
+        *_, last = self.stream_message(user, text, streaming=False)
+        return last["message"]
+
+    def stream_message(self, user: get_user_model(), text: str, *, streaming: bool = True) -> Iterator[Dict]:
+        """Run the agent flow, yielding ``{"type": "delta", "text": ...}`` chunks as the model produces them.
+
+        The last item is ``{"type": "message", "message": <agent Message>}``, the
+        reply is persisted before it is yielded.
+        """
         conversation = self.get_conversation(user)
         user_id = str(user.id)
         session_id = str(conversation.id)
@@ -204,17 +228,30 @@ class ADKChatService:
 
         self._ensure_session(user_id, session_id)
 
-        # DEBUG: Log session state BEFORE processing
-        logger.info(f"🔍 DEBUG: Processing message '{text}' for user {user_id}, session {session_id}")
-        asyncio.run(self._debug_session_state(user_id, session_id, "BEFORE"))
+        if self.debug_sessions:
+            logger.info(f"🔍 DEBUG: Processing message '{text}' for user {user_id}, session {session_id}")
+            self.loop.run(self._debug_session_state(user_id, session_id, "BEFORE"))
 
         user_message = types.Content(role="user", parts=[types.Part(text=text)])
-        events = self.runner.run(user_id=user_id, session_id=session_id, new_message=user_message)
+        # sync tools run on ADK's tool threads, off the shared loop where Django refuses database access
+        run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE,
+            tool_thread_pool_config=ToolThreadPoolConfig(max_workers=settings.ADK_TOOL_WORKERS),
+        )
+        events = self.loop.iterate(self.runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=user_message, run_config=run_config
+        ))
         
         final_text = None
         for event in events:
-            # DEBUG: Log each event as it comes
-            logger.info(f"📨 EVENT: {type(event).__name__} - Author: {getattr(event, 'author', 'N/A')} - Is_final: {getattr(event, 'is_final_response', lambda: False)()}")
+            # partial events carry the next chunk of text, the aggregated text follows in a final event
+            if getattr(event, "partial", False):
+                for part in (event.content.parts if event.content else None) or []:
+                    if getattr(part, "text", None):
+                        yield {"type": "delta", "text": part.text}
+                continue
+
+            logger.debug("EVENT: %s - Author: %s", type(event).__name__, getattr(event, "author", "N/A"))
             
             if hasattr(event, "content") and event.content:
                 for part in event.content.parts:
@@ -225,8 +262,8 @@ class ADKChatService:
                     final_text = event.content.parts[0].text
                 break
         
-        # DEBUG: Log session state AFTER processing
-        asyncio.run(self._debug_session_state(user_id, session_id, "AFTER"))
+        if self.debug_sessions:
+            self.loop.run(self._debug_session_state(user_id, session_id, "AFTER"))
         
         if final_text is None:
             final_text = ""
@@ -237,7 +274,7 @@ class ADKChatService:
             content_type=Message.TEXT,
             payload={"text": final_text},
         )
-        return agent_msg
+        yield {"type": "message", "message": agent_msg}
 
     async def _debug_session_state(self, user_id: str, session_id: str, stage: str) -> None:
         """Debug helper to log session state and events."""
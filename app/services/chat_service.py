@@ -4,12 +4,15 @@ from __future__ import annotations
 
 import datetime
 import logging
-from typing import Iterable, List, Dict, Optional, Any
+from functools import partial
+from typing import Iterable, Iterator, List, Dict, Optional, Any
 
 from django.contrib.auth import get_user_model
 
 from app.models import Conversation, Message
-from myFinance.models import Transaction, TransactionNameTag, TagGoal
+from myFinance.financial_context import FinancialContext
+from myFinance.report_engine import ReportEngine
+from myFinance.models import Transaction
 from agents.orchestrator import Orchestrator
 
 logger = logging.getLogger(__name__)
@@ -47,7 +50,7 @@ class ChatService:
         end: Optional[datetime.date] = None,
     ) -> Iterable[Transaction]:
         """Return transactions for the user in the optional date range."""
-        qs = Transaction.objects.filter(user=user)
+        qs = Transaction.objects.filter(user=user).select_related("tag")
         if start:
             qs = qs.filter(date__gte=start)
         if end:
@@ -74,28 +77,17 @@ class ChatService:
 
     def get_category_map(self, user: get_user_model()) -> Dict[str, str]:
         """Return mapping of merchant/description to category."""
-        mapping: Dict[str, str] = {}
-        for item in TransactionNameTag.objects.filter(user=user):
-            if item.tag:
-                mapping[item.transaction_name] = item.tag.name
-        return mapping
+        return FinancialContext(user).category_map()
 
     def get_budget_targets(self, user: get_user_model()) -> Dict[str, float]:
         """Return budget target values per tag name."""
-        return {
-            goal.tag.name: goal.value
-            for goal in TagGoal.objects.filter(user=user).select_related("tag")
-        }
+        return FinancialContext(user).budget_targets()
 
     def build_financial_context(
         self, user: get_user_model()
     ) -> tuple[List[Dict], Dict[str, str], Dict[str, float]]:
-        """Return serialized transactions, category map and budget targets."""
-        txns = self.serialize_transactions(self.get_transactions(user))
-        category_map = self.get_category_map(user)
-        budget_targets = self.get_budget_targets(user)
-        logger.debug("Built financial context for user %s", user)
-        return txns, category_map, budget_targets
+        """Return the recent transactions, category map and budget targets."""
+        return FinancialContext(user).as_tuple()
 
     # ------------------------------------------------------------------
     # Budget input placeholders
@@ -163,16 +155,17 @@ class ChatService:
             payload={"text": text},
         )
 
-        txns, category_map, budget_targets = self.build_financial_context(user)
-        budget_info = self.get_budget_inputs(user)
+        # the context parts are passed as loaders, only the agent that reads them queries the db
+        context = FinancialContext(user)
 
         logger.debug("Sending message to orchestrator: '%s'", text)
         content_type, payload = self.orchestrator.handle_message(
             text,
-            transactions=txns,
-            category_map=category_map,
-            budget_targets=budget_targets,
-            budget_info=budget_info,
+            transactions=context.transactions,
+            category_map=context.category_map,
+            budget_targets=context.budget_targets,
+            budget_info=partial(self.get_budget_inputs, user),
+            report_engine=partial(ReportEngine, user),
         )
         logger.debug("Orchestrator returned content_type=%s", content_type)
         agent_msg = Message.objects.create(
@@ -182,3 +175,17 @@ class ChatService:
             payload=payload,
         )
         return agent_msg
+
+    def stream_message(self, user: get_user_model(), text: str) -> Iterator[Dict]:
+        """Stream interface of :meth:`send_message`, without streaming.
+
+        The orchestrator and its agents answer with complete JSON payloads, so
+        the whole reply is computed first and a text reply is yielded as a
+        single ``delta`` before the persisted ``message``: the time to the
+        first token is the time of :meth:`send_message`.  Only
+        ``ADKChatService`` streams the model output.
+        """
+        agent_msg = self.send_message(user, text)
+        if agent_msg.content_type == Message.TEXT:
+            yield {"type": "delta", "text": agent_msg.payload.get("text", "")}
+        yield {"type": "message", "message": agent_msg}
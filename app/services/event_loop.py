@@ -0,0 +1,96 @@
+"""Long-lived asyncio loop for calling the async ADK APIs from sync Django code."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import queue
+import threading
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class EventLoopThread:
+    """An event loop running forever in a daemon thread.
+
+    Coroutines are submitted from any thread with :meth:`submit` or
+    :meth:`run`, so the async session service and runner share one loop for
+    the whole process instead of creating one per call.  The loop is started
+    on first use.
+    """
+
+    def __init__(self, name: str = "adk-event-loop") -> None:
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._serve, args=(self._loop, ready), name=self.name,
+                                                daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        loop.close()
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule ``coro`` on the loop and return a thread-safe future of its result."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(f"{self.name}: waiting on the loop from its own thread would deadlock")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable, timeout: float | None = None) -> Any:
+        """Run ``coro`` on the loop and block until it returns (or raises)."""
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """Consume an async iterator on the loop and yield its items to the calling thread.
+
+        Closing the returned generator early cancels the iteration on the loop.
+        """
+        items: queue.Queue = queue.Queue()
+
+        async def pump():
+            async with aclosing(agen):
+                async for item in agen:
+                    items.put(item)
+
+        future = self.submit(pump())
+        future.add_done_callback(lambda _: items.put(_DONE))
+        try:
+            while (item := items.get()) is not _DONE:
+                yield item
+            future.result()
+        finally:
+            if not future.done():
+                future.cancel()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join(timeout=5)
+            self._loop = self._thread = None
+
+
+adk_loop = EventLoopThread()
+atexit.register(adk_loop.stop)
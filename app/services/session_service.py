@@ -0,0 +1,287 @@
+"""ADK session service persisted with the Django ORM."""
+
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from app.models import AgentSession, AgentSessionEvent, Conversation
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.events.event_actions import EventActions, EventCompaction
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+
+
+class DjangoSessionService(BaseSessionService):
+    """Drop-in ``session_service`` for the ADK ``Runner`` backed by the database.
+
+    Sessions are keyed by ``(app_name, user, session_id)``, the chat services
+    use the conversation id as session id so every worker sees the same
+    history.  Events are only appended; once more than ``compact_after``
+    events follow the last compaction, all but the most recent
+    ``keep_events`` are folded into an ADK compaction event holding a plain
+    text summary, and only the events after it are loaded again.  Loaded
+    sessions are kept in an in-process LRU of ``cache_size`` entries, which
+    is validated against the stored ``update_time`` on every read.
+
+    ``app:`` and ``user:`` prefixed state is stored with the session it was
+    written in.
+    """
+
+    def __init__(
+        self,
+        cache_size: int | None = None,
+        compact_after: int | None = None,
+        keep_events: int | None = None,
+        summary_chars: int | None = None,
+    ) -> None:
+        self.cache_size = cache_size or getattr(settings, "ADK_SESSION_CACHE_SIZE", 256)
+        self.compact_after = compact_after or getattr(settings, "ADK_SESSION_COMPACT_AFTER", 200)
+        self.keep_events = keep_events or getattr(settings, "ADK_SESSION_KEEP_EVENTS", 50)
+        self.summary_chars = summary_chars or getattr(settings, "ADK_SESSION_SUMMARY_CHARS", 4000)
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # BaseSessionService
+    # ------------------------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await sync_to_async(self._create)(app_name, user_id, state or {}, session_id)
+        return copy.deepcopy(session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        session = await sync_to_async(self._load)(app_name, user_id, session_id)
+        if session is None:
+            return None
+        session = copy.deepcopy(session)
+        if config and config.after_timestamp:
+            session.events = [event for event in session.events if event.timestamp >= config.after_timestamp]
+        if config and config.num_recent_events is not None:
+            session.events = session.events[-config.num_recent_events:] if config.num_recent_events else []
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await sync_to_async(self._list)(app_name, user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await sync_to_async(self._delete)(app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        session.last_update_time = event.timestamp
+        await sync_to_async(self._store_event)(session, event)
+        return event
+
+    # ------------------------------------------------------------------
+    # ORM
+    # ------------------------------------------------------------------
+
+    def _create(self, app_name: str, user_id: str, state: Dict, session_id: Optional[str]) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        conversation = None
+        if session_id.isdigit():
+            conversation = Conversation.objects.filter(pk=session_id, user_id=user_id).first()
+        now = time.time()
+        row, created = AgentSession.objects.get_or_create(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            defaults={"state": state, "update_time": now, "conversation": conversation},
+        )
+        if not created:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=dict(state), last_update_time=now)
+        self._cache_put((app_name, user_id, session_id), session)
+        return session
+
+    def _load(self, app_name: str, user_id: str, session_id: str) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        row = (
+            AgentSession.objects.filter(app_name=app_name, user_id=user_id, session_id=session_id)
+            .values("id", "state", "update_time", "compacted_until")
+            .first()
+        )
+        if row is None:
+            self._cache_pop(key)
+            return None
+        cached = self._cache_get(key)
+        if cached is not None and cached.last_update_time == row["update_time"]:
+            return cached
+        events = [
+            Event.model_validate(data)
+            for data in AgentSessionEvent.objects.filter(
+                session_id=row["id"], timestamp__gt=row["compacted_until"]
+            ).values_list("data", flat=True)
+        ]
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=row["state"],
+            events=events,
+            last_update_time=row["update_time"],
+        )
+        self._cache_put(key, session)
+        return session
+
+    def _list(self, app_name: str, user_id: Optional[str]) -> ListSessionsResponse:
+        rows = AgentSession.objects.filter(app_name=app_name).order_by("update_time")
+        if user_id is not None:
+            rows = rows.filter(user_id=user_id)
+        return ListSessionsResponse(
+            sessions=[
+                Session(app_name=app_name, user_id=str(row.user_id), id=row.session_id, state=row.state,
+                        last_update_time=row.update_time)
+                for row in rows
+            ]
+        )
+
+    def _delete(self, app_name: str, user_id: str, session_id: str) -> None:
+        AgentSession.objects.filter(app_name=app_name, user_id=user_id, session_id=session_id).delete()
+        self._cache_pop((app_name, user_id, session_id))
+
+    def _store_event(self, session: Session, event: Event) -> None:
+        key = (session.app_name, session.user_id, session.id)
+        state_delta = event.actions.state_delta if event.actions else {}
+        with transaction.atomic():
+            row = AgentSession.objects.select_for_update().get(
+                app_name=session.app_name, user_id=session.user_id, session_id=session.id
+            )
+            previous_update = row.update_time
+            AgentSessionEvent.objects.create(
+                session=row,
+                event_id=event.id,
+                author=event.author,
+                timestamp=event.timestamp,
+                is_compaction=bool(event.actions and event.actions.compaction),
+                data=event.model_dump(mode="json", exclude_none=True),
+            )
+            if state_delta:
+                row.state = {**row.state, **state_delta}
+            row.update_time = event.timestamp
+            row.save(update_fields=["state", "update_time"])
+            compacted = self._compact(row)
+
+        cached = self._cache_get(key)
+        if compacted or cached is None or cached.last_update_time != previous_update:
+            # rebuilt from the database on the next read
+            self._cache_pop(key)
+        else:
+            cached.events.append(event.model_copy(deep=True))
+            cached.state.update(copy.deepcopy(state_delta))
+            cached.last_update_time = event.timestamp
+
+    def _compact(self, row: AgentSession) -> bool:
+        """Fold old events into a compaction event once too many follow the last one."""
+        events = AgentSessionEvent.objects.filter(session=row, timestamp__gt=row.compacted_until)
+        if events.filter(is_compaction=False).count() <= self.compact_after:
+            return False
+        stored = list(events.values_list("timestamp", "author", "is_compaction", "data"))
+        # keep whole turns: the retained part starts with a user message
+        cut = len(stored) - self.keep_events
+        while cut < len(stored) and stored[cut][1] != "user":
+            cut += 1
+        if cut >= len(stored) or cut == 0:
+            return False
+        compacted = stored[:cut]
+        previous = [data["actions"]["compaction"] for _, _, is_compaction, data in compacted if is_compaction]
+        start = previous[-1]["start_timestamp"] if previous else compacted[0][0]
+        summary = self._summarize(
+            previous[-1] if previous else None,
+            [data for _, _, is_compaction, data in compacted if not is_compaction],
+        )
+        compaction = Event(
+            author="user",
+            invocation_id=Event.new_id(),
+            actions=EventActions(
+                compaction=EventCompaction(
+                    start_timestamp=start,
+                    end_timestamp=compacted[-1][0],
+                    compacted_content=types.Content(role="model", parts=[types.Part(text=summary)]),
+                )
+            ),
+        )
+        AgentSessionEvent.objects.create(
+            session=row,
+            event_id=compaction.id,
+            author=compaction.author,
+            timestamp=compaction.timestamp,
+            is_compaction=True,
+            data=compaction.model_dump(mode="json", exclude_none=True),
+        )
+        row.compacted_until = compacted[-1][0]
+        row.update_time = compaction.timestamp
+        row.save(update_fields=["compacted_until", "update_time"])
+        logger.info("Compacted %s events of session %s", len(compacted), row.session_id)
+        return True
+
+    def _summarize(self, previous: Optional[Dict], events: List[Dict]) -> str:
+        """Plain text transcript of the compacted events, the most recent ``summary_chars`` kept."""
+        lines = []
+        if previous:
+            lines.append(previous["compacted_content"]["parts"][0].get("text", "").removeprefix(SUMMARY_HEADER))
+        for data in events:
+            for part in (data.get("content") or {}).get("parts") or []:
+                if part.get("text"):
+                    lines.append(f"{data['author']}: {' '.join(part['text'].split())}")
+                elif part.get("function_call"):
+                    lines.append(f"{data['author']} called {part['function_call'].get('name')}")
+        summary = "\n".join(lines)
+        if len(summary) > self.summary_chars:
+            summary = "..." + summary[-self.summary_chars:]
+        return SUMMARY_HEADER + summary
+
+    # ------------------------------------------------------------------
+    # LRU cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: tuple) -> Optional[Session]:
+        with self._lock:
+            session = self._cache.get(key)
+            if session is not None:
+                self._cache.move_to_end(key)
+            return session
+
+    def _cache_put(self, key: tuple, session: Session) -> None:
+        with self._lock:
+            self._cache[key] = session
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_pop(self, key: tuple) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
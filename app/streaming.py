@@ -0,0 +1,149 @@
+"""Server-sent events stream of the chat replies.
+
+``ChatStreamApp`` is a plain ASGI app mounted by ``finance.asgi``, the agent
+runs in a worker thread and every chunk is written as soon as it arrives so a
+slow LLM answer does not hold a request worker.  Under WSGI the same frames
+are served by ``app.views.ChatStreamView``.  The model output is streamed as
+it is generated by ``ADKChatService``; the ``ChatService`` fallback sends its
+text reply as one ``delta`` once complete.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from asgiref.sync import sync_to_async
+from corsheaders.conf import conf as cors_conf
+from django.db import close_old_connections
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from app.serializers import MessageSerializer
+
+logger = logging.getLogger(__name__)
+
+CHAT_STREAM_PATH = "/api/chat/stream/"
+
+
+def sse(event: str, data: Dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+def chat_events(service, user, text: str) -> Iterator[bytes]:
+    """SSE frames of one chat message: ``delta`` chunks, then the persisted ``message`` or an ``error``."""
+    try:
+        for item in service.stream_message(user, text):
+            if item["type"] == "delta":
+                yield sse("delta", {"text": item["text"]})
+            else:
+                yield sse("message", MessageSerializer(item["message"]).data)
+    except Exception:
+        logger.exception("Chat stream failed for user %s", user.pk)
+        yield sse("error", {"detail": "The assistant failed to answer, please try again"})
+    finally:
+        close_old_connections()
+
+
+def _authenticate(authorization: str):
+    """Return the user of a ``Token <key>`` header, ``None`` when it is missing or invalid."""
+    scheme, _, key = authorization.partition(" ")
+    if scheme.lower() != "token" or not key.strip():
+        return None
+    try:
+        user, _ = TokenAuthentication().authenticate_credentials(key.strip())
+    except AuthenticationFailed:
+        return None
+    finally:
+        close_old_connections()
+    return user
+
+
+def _cors_headers(origin: str | None) -> List[Tuple[bytes, bytes]]:
+    if not origin or not (cors_conf.CORS_ALLOW_ALL_ORIGINS or origin in cors_conf.CORS_ALLOWED_ORIGINS):
+        return []
+    headers = [(b"access-control-allow-origin", origin.encode()), (b"vary", b"origin")]
+    if cors_conf.CORS_ALLOW_CREDENTIALS:
+        headers.append((b"access-control-allow-credentials", b"true"))
+    return headers
+
+
+def _default_service():
+    from app.views import chat_service
+    return chat_service
+
+
+class ChatStreamApp:
+    """ASGI app answering ``POST {"text": ...}`` with a ``text/event-stream`` of the reply."""
+
+    def __init__(self, get_service: Callable = _default_service):
+        self.get_service = get_service
+
+    async def __call__(self, scope, receive, send) -> None:
+        headers = {key.decode().lower(): value.decode() for key, value in scope.get("headers", [])}
+        cors = _cors_headers(headers.get("origin"))
+        if scope["method"] == "OPTIONS":
+            await self._respond(send, 200, b"", cors + [
+                (b"access-control-allow-methods", b"POST, OPTIONS"),
+                (b"access-control-allow-headers", ", ".join(cors_conf.CORS_ALLOW_HEADERS).encode()),
+            ])
+            return
+        if scope["method"] != "POST":
+            await self._respond(send, 405, b'{"detail": "Method not allowed."}', cors)
+            return
+
+        body = await self._read_body(receive)
+        user = await sync_to_async(_authenticate)(headers.get("authorization", ""))
+        if user is None:
+            await self._respond(send, 401, b'{"detail": "Invalid token."}', cors)
+            return
+        try:
+            text = json.loads(body or b"{}").get("text", "")
+        except (ValueError, AttributeError):
+            await self._respond(send, 400, b'{"detail": "JSON body expected."}', cors)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ] + cors,
+        })
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue = asyncio.Queue()
+
+        def produce():
+            # the reply is persisted even when the client disconnects midway
+            try:
+                for frame in chat_events(self.get_service(), user, text):
+                    loop.call_soon_threadsafe(frames.put_nowait, frame)
+            finally:
+                loop.call_soon_threadsafe(frames.put_nowait, None)
+
+        producer = loop.run_in_executor(None, produce)
+        while (frame := await frames.get()) is not None:
+            await send({"type": "http.response.body", "body": frame, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        await producer
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return body
+
+    @staticmethod
+    async def _respond(send, status: int, body: bytes, headers: List[Tuple[bytes, bytes]]) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+            + headers,
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -4,7 +4,7 @@ from unicodedata import category
 
 from django.db.models import Sum, F, Q, Max, Min
 
-from app.utils import expenses_transactions
+from app.utils import expenses_monthly_totals, monthly_expenses
 from myFinance.models import DateInput, Tag, Transaction
 
 
@@ -21,11 +21,9 @@ def aggregate_category(user, category):
     data = []
     start_date = DateInput.objects.filter(user=user, name='start_date')
     if start_date.exists():
-        transactions_exp = expenses_transactions(user)
-        if transactions_exp.count() == 0:
+        if not expenses_monthly_totals(user).exists():
             return None
-        transactions_exp = transactions_exp.filter(tag=category)
-        aggregated_trans = transactions_exp.values('month_date').annotate(Sum('value')).order_by('month_date')
+        aggregated_trans = monthly_expenses(user, tag=category)
         max_value = aggregated_trans.aggregate(Max('value__sum'))
         min_value = aggregated_trans.aggregate(Min('value__sum'))
         moving_average = moving_average([item['value__sum'] for item in aggregated_trans], 3)
@@ -131,8 +131,9 @@ class MessageFormatCompatibilityTests(unittest.TestCase):
                 elif content_type == Message.IMAGE:
                     # Image format: should have chart_url
                     self.assertIn("chart_url", payload)
-                    # Should be base64 data URL
-                    self.assertTrue(payload["chart_url"].startswith("data:image/"))
+                    # Should reference the rendered chart file, not inline data
+                    self.assertTrue(payload["chart_url"].endswith(".png"))
+                    self.assertFalse(payload["chart_url"].startswith("data:"))
 
     def test_orchestrator_single_message_response(self):
         """Test that orchestrator always returns single message format."""
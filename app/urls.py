@@ -29,7 +29,10 @@ urlpatterns = [
     path('api/users/', views.UserView.as_view()),
     path('user_transactions_names', views.UserTransactionsNames.as_view()),
     path('api/chat/send/', views.ChatSendView.as_view()),
+    path('api/chat/stream/', views.ChatStreamView.as_view()),
     path('api/chat/history/', views.ChatHistoryView.as_view()),
+    path('api/chat/messages/<int:pk>/', views.ChatMessageView.as_view(), name='chat_message'),
+    path('api/charts/<slug:chart_id>/', views.ChartStatusView.as_view(), name='chart_status'),
 
     # path('', views.index, name='home'),
     # re_path(r'^.*\.html', views.pages, name='pages'),
@@ -1,13 +1,104 @@
+import bisect
+import calendar
+import copy
 import datetime
+from collections import defaultdict
 
 from dateutil import relativedelta
-from django.db.models import Sum
+from django.db.models import Sum, F, OuterRef, Subquery
 
-from myFinance.models import Transaction, DateInput
+from app.date_utils import date_in_bill_month, next_bill_date, end_month
+from myFinance.billing_cycle import BillingCycle
+from myFinance.models import Transaction, DateInput, MonthlyTagTotal, TagGoal, RecurringTransaction
 
 def approx_rolling_average(avg, new_sample, n):
     return (avg * (n - 1) + new_sample) / n
 
+class CategoryMonthSummary:
+    """
+    Sum of the transactions value per tag together with the tag name, type and goal value, in a single query.
+    Rows have the keys tag_id, value__sum, tag_name, tag_type and goal (None when the tag has no goal).
+    """
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def queryset(self):
+        goal = TagGoal.objects.filter(tag=OuterRef('tag_id')).order_by('id').values('value')[:1]
+        return self.transactions.values('tag_id').annotate(
+            Sum('value'), tag_name=F('tag__name'), tag_type=F('tag__type'), goal=Subquery(goal)).order_by('tag_id')
+
+    def __iter__(self):
+        return iter(self.queryset())
+
+
+class RecurringTransactionMatcher:
+    """
+    Finds the user recurring transactions that were not charged yet in the current month (calendar or bill month).
+    The recurring transactions, the next bill date and each month transactions are loaded once and matched in memory:
+    a recurring transaction is charged when a transaction name contains its name and the value is within 10%.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.recurring = list(RecurringTransaction.objects.filter(user=user))
+        self._next_bill = None
+
+    @property
+    def next_bill(self):
+        if self._next_bill is None:
+            self._next_bill = next_bill_date(self.user)
+        return self._next_bill
+
+    def month_range(self, bill_month):
+        if bill_month:
+            end = self.next_bill.date()
+            return end - relativedelta.relativedelta(months=1), end
+        today = datetime.date.today()
+        return today.replace(day=1), today.replace(day=calendar.monthrange(today.year, today.month)[1])
+
+    def date_in_month(self, day, bill_month):
+        if bill_month:
+            date = date_in_bill_month(day, self.user, bill_day=self.next_bill)
+            return date.date() if isinstance(date, datetime.datetime) else date
+        today = datetime.date.today()
+        return today.replace(day=min(day, end_month(today).day))
+
+    def name_index(self, start, end):
+        """:returns transaction name -> sorted values of the transactions between start and end"""
+        index = defaultdict(list)
+        transactions = Transaction.objects.filter(user=self.user, date__gte=start, date__lte=end)
+        for name, value in transactions.values_list('name', 'value'):
+            index[name].append(value)
+        for values in index.values():
+            values.sort()
+        return index
+
+    def unregistered(self, bill_month):
+        """:returns copies of the recurring transactions not charged this month, dated to their day in the month"""
+        if not self.recurring:
+            return []
+        index = self.name_index(*self.month_range(bill_month))
+        names_containing = {}
+        non_registered_transactions = []
+        for item in self.recurring:
+            if item.name not in names_containing:
+                names_containing[item.name] = [name for name in index if item.name in name]
+            min_val, max_val = (item.value * 0.9, item.value * 1.1) if item.value > 0 else (
+                item.value * 1.1, item.value * 0.9)
+            if any(self._has_value_in_range(index[name], min_val, max_val) for name in names_containing[item.name]):
+                continue
+            item = copy.copy(item)
+            item.date = self.date_in_month(item.date.day, bill_month)
+            non_registered_transactions.append(item)
+        return non_registered_transactions
+
+    @staticmethod
+    def _has_value_in_range(values, min_val, max_val):
+        i = bisect.bisect_left(values, min_val)
+        return i < len(values) and values[i] <= max_val
+
+
 def expenses_transactions(user):
     """:returns anything that should not be excluded from the monthly expenses calculation"""
     if not Transaction.objects.filter(user=user).exists():
@@ -17,6 +108,26 @@ def expenses_transactions(user):
     return Transaction.objects.filter(date__gte=start_date, date__lte=end, user=user).exclude( tag__expense=False,)
 
 
+def expenses_monthly_totals(user, today=None):
+    """
+    :returns the MonthlyTagTotal rows of the months counted in the monthly expenses calculation, the billing months
+    from the one of the start_date to the one of today
+    """
+    start_date = DateInput.objects.filter(name='start_date', user=user).values_list('date', flat=True).first()
+    cycle = BillingCycle(start_date.day if start_date else 1)
+    totals = MonthlyTagTotal.objects.filter(user=user, month_date__lte=cycle.month_date(today or datetime.date.today())
+                                            ).exclude(tag__expense=False)
+    return totals.filter(month_date__gte=cycle.month_date(start_date)) if start_date else totals
+
+
+def monthly_expenses(user, tag=None, today=None):
+    """:returns the expenses sum per month_date (optionally of a single tag) ordered by month_date"""
+    totals = expenses_monthly_totals(user, today)
+    if tag is not None:
+        totals = totals.filter(tag=tag)
+    return totals.values('month_date').annotate(Sum('value')).order_by('month_date')
+
+
 def all_transactions_in_dates(user):
     """:returns anything that should not be excluded from the monthly expenses calculation"""
     if not Transaction.objects.filter(user=user):
@@ -36,10 +147,9 @@ def income_transactions(user):
 
 
 def average_expenses(user):
-    trans = expenses_transactions(user)
-    if not trans.exists():
+    some = expenses_monthly_totals(user).aggregate(Sum('value'))['value__sum']
+    if some is None:
         return 0
-    some = trans.aggregate(Sum('value'))['value__sum']
     return round(some / number_of_months(user))
 
 
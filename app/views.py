@@ -8,17 +8,22 @@ import datetime
 import logging
 
 from bootstrap_modal_forms.generic import BSModalFormView
-from dateutil.relativedelta import relativedelta
 from django.db.models import Sum, Max, Min
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from django.forms import formset_factory
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from rest_framework import status
+from rest_framework import generics
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
+    OpenApiParameter,
     PolymorphicProxySerializer,
     inline_serializer,
 )
@@ -44,12 +49,13 @@ from myFinance.serialisers import (
     CredentialTypesSerializer,
 )
 from telegram_bot import telegram_bot_api
-from .date_utils import date_in_bill_month, next_bill_date, end_month
 from .forms import TransactionModelForm
-from .utils import expenses_transactions, average_income
+from .utils import average_income, monthly_expenses, CategoryMonthSummary, RecurringTransactionMatcher
 from .models import Conversation, Message
-from .serializers import MessageSerializer
-from agents import Orchestrator
+from .pagination import MessageCursorPagination
+from .serializers import CompactMessageSerializer, MessageSerializer
+from .streaming import chat_events
+from agents import Orchestrator, charts
 from agents.openapi_utils import get_all_message_serializers
 
 # from app.graph.graph_api import monthly_average_by_category, line_fig_by_tag_by_month, line_fig_by_month, \
@@ -72,11 +78,10 @@ class SummeryWidgetsView(APIView):
         data = {}
         start_date = DateInput.objects.filter(user=request.user, name='start_date')
         if start_date.exists():
-            transactions_exp = app.utils.expenses_transactions(request.user)
+            aggregated_trans = app.utils.monthly_expenses(request.user)
             # transactions_all = graph_api.all_transactions_in_dates(request.user)
-            if transactions_exp.count() == 0:
+            if not aggregated_trans:
                 return None
-            aggregated_trans = transactions_exp.values('month_date').annotate(Sum('value'))
             data = aggregated_trans
             # data = load_index_figures(request.user)
 
@@ -146,17 +151,16 @@ class MonthCategoryView(APIView):
         if 'category' in request.GET:
             transactions = transactions.filter(tag__name__in=request.GET['category'])
 
-        tag_sums = transactions.values('tag_id').annotate(Sum('value'))
-        for i, tag_sum in enumerate(tag_sums):
-            tag = Tag.objects.get(id=tag_sum['tag_id'])
-            # diff = int(tag.taggoal_set.first().value) - tag_sum['value__sum']
+        for i, tag_sum in enumerate(CategoryMonthSummary(transactions)):
+            # diff = int(tag_sum['goal']) - tag_sum['value__sum']
             # value_sum = round(tag_sum['value__sum']) if diff >= 0 else '*{}*'.format(round(tag_sum['value__sum']))
             value = round(tag_sum['value__sum'])
-            goal = int(tag.taggoal_set.first().value) if tag.taggoal_set.first() else 0
+            goal = int(tag_sum['goal']) if tag_sum['goal'] is not None else 0
 
             data.append(
-                {'category_id': tag.id, 'category': tag.name, 'key': tag.name, 'value': value, 'goal': goal,
-                 'type': tag.type,
+                {'category_id': tag_sum['tag_id'], 'category': tag_sum['tag_name'], 'key': tag_sum['tag_name'],
+                 'value': value, 'goal': goal,
+                 'type': tag_sum['tag_type'],
                  'percent': value / goal * 100 if goal and goal > 0 else 100,
                  'color': Pas[i % len(Pas)]})
         return Response(data)
@@ -178,25 +182,16 @@ class BankInfo(APIView):
             total_balance += cred.balance if cred.balance else 0
         bank_balance = round(bank_balance, 2)
         total_balance = round(total_balance, 2)
-        estimated_recurring_transactions_month = RecurringTransaction.objects.filter(user=request.user,
-                                                                                     id__in=[item.id for item in
-                                                                                             estimated_recurring_transactions(
-                                                                                                 False, request.user)])
-        estimated_recurring_month_sum = \
-            estimated_recurring_transactions_month.exclude(value__lte=0).aggregate(Sum('value'))[
-                'value__sum'] or 0
+        recurring_matcher = RecurringTransactionMatcher(request.user)
+        estimated_recurring_month_sum = sum(
+            item.value for item in recurring_matcher.unregistered(bill_month=False) if item.value > 0)
         month_current_sum = \
             app.utils.expenses_transactions(request.user).filter(date__gte=start_month, date__lte=end_month).aggregate(
                 Sum('value'))['value__sum'] or 0
         month_expected_sum = month_current_sum + estimated_recurring_month_sum
 
-        estimated_recurring_transactions_bill_month = RecurringTransaction.objects.filter(user=request.user,
-                                                                                          id__in=[item.id for item in
-                                                                                                  estimated_recurring_transactions(
-                                                                                                      True,
-                                                                                                      request.user)])
-        estimated_transactions_bill_month_total = estimated_recurring_transactions_bill_month.aggregate(Sum('value'))[
-                                                      'value__sum'] or 0
+        estimated_transactions_bill_month_total = sum(
+            item.value for item in recurring_matcher.unregistered(bill_month=True))
         estimated_total_balance = total_balance - estimated_transactions_bill_month_total
 
         data = [
@@ -243,28 +238,7 @@ class CredentialViewSet(viewsets.ModelViewSet):
 
 
 def estimated_recurring_transactions(bill_month, user):
-    non_registered_transactions = []
-    for item in RecurringTransaction.objects.filter(user=user):
-        if bill_month:
-            date__in_month = date_in_bill_month(item.date.day, user)
-            end = next_bill_date(user)
-            start = end - relativedelta(months=1)
-        else:
-            date__in_month = datetime.date.today().replace(day=min(item.date.day, end_month(datetime.date.today()).day))
-            start = datetime.date.today().replace(day=1)
-            end = datetime.date.today().replace(day=calendar.monthrange(start.year, start.month)[1])
-
-        min_val, max_val = (item.value * 0.9, item.value * 1.1) if item.value > 0 else (item.value * 1.1, item.value * 0.9)
-        if not Transaction.objects.filter(user=user,
-                                          name__contains=item.name,
-                                          value__lte=max_val,
-                                          value__gte=min_val,
-                                          date__gte=start,
-                                          date__lte=end).exists():
-            item.date = date__in_month.date() if isinstance(date__in_month, datetime.datetime) else date__in_month
-            non_registered_transactions.append(item)
-    return non_registered_transactions
-    # return RecurringTransaction.objects.filter(user=user, id__in=non_registered_transactions)
+    return RecurringTransactionMatcher(user).unregistered(bill_month)
 
 
 class RecurringTransactionsViewSet(viewsets.ModelViewSet):
@@ -315,11 +289,9 @@ class UserTagViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance)
         data = serializer.data
         data['goal'] = instance.taggoal_set.first().value if instance.taggoal_set.exists() else None
-        transactions_exp = expenses_transactions(instance.user).filter(tag=instance)
-        values = transactions_exp.values('month_date').annotate(Sum('value')).order_by('month_date')
-        data['expense_month_avg'] = round(sum([v['value__sum'] for v in values]) / len(values)) if values else 0
+        values = list(monthly_expenses(instance.user, tag=instance))
         data['expense_month_avg'] = round(sum([v['value__sum'] for v in values]) / len(values)) if values else 0
-        last_months = list(values)[-4:]
+        last_months = values[-4:]
         data['expense_last_months_avg'] = round(
             sum([v['value__sum'] for v in last_months]) / len(last_months)) if last_months else 0
         return Response(data)
@@ -350,13 +322,10 @@ class TotalMonthExpensesView(APIView):
         data = []
         start_date = DateInput.objects.filter(user=request.user, name='start_date')
         if start_date.exists():
-            transactions_exp = expenses_transactions(request.user)
-            # transactions_all = all_transactions_in_dates(request.user)
-            if transactions_exp.count() == 0:
+            if not app.utils.expenses_monthly_totals(request.user).exists():
                 return None
-            if request.GET.get('category'):
-                transactions_exp = transactions_exp.filter(tag=request.GET.get('category'))
-            aggregated_trans = transactions_exp.values('month_date').annotate(Sum('value')).order_by('month_date')
+            # transactions_all = all_transactions_in_dates(request.user)
+            aggregated_trans = monthly_expenses(request.user, tag=request.GET.get('category') or None)
             max_value = aggregated_trans.aggregate(Max('value__sum'))
             min_value = aggregated_trans.aggregate(Min('value__sum'))
             moving_average = moving_average([item['value__sum'] for item in aggregated_trans], 3)
@@ -441,30 +410,29 @@ def create_continuous_category_summery(user):
                                                 minute=0, second=0, microsecond=0)
     transactions = Transaction.objects.filter(tag__type=Tag.CONTINUOUS, date__gte=start_month, date__lte=end_month,
                                               user=user)
-    tag_sums = transactions.values('tag_id').annotate(Sum('value'))
+    tag_sums = list(CategoryMonthSummary(transactions))
     total = 0
     # last_scanned = models.DateInput.objects.get(name='last_scanned', user=request.user).date
     s = '*Date {}*\n'.format(datetime.date.today().strftime('%d/%m'))
     for tag_sum in tag_sums:
-        tag = Tag.objects.get(id=tag_sum['tag_id'])
-        goal = tag.taggoal_set.first()
-        if goal:
-            diff = int(goal.value) - tag_sum['value__sum']
+        goal = tag_sum['goal']
+        if goal is not None:
+            diff = int(goal) - tag_sum['value__sum']
         else:
             diff = 0
         value_sum = round(tag_sum['value__sum']) if diff >= 0 else '*{}*'.format(round(tag_sum['value__sum']))
         total += diff
-        t = '\n' + '{}: {}/ {}'.format(tag.name.replace('_', ' ').capitalize(),
-                                       value_sum, str(int(goal.value)) if goal else '')
+        t = '\n' + '{}: {}/ {}'.format(tag_sum['tag_name'].replace('_', ' ').capitalize(),
+                                       value_sum, str(int(goal)) if goal is not None else '')
 
         s += t
         # add TagGaols with 0 spent
     tag_goals = models.TagGoal.objects.exclude( # TODO FIX so it will not have all the tag names
         tag__name__in=['credit cards', 'bills', 'salary', 'same', 'debt payment', 'Donations', 'other income',
                        'commission', 'exclude', 'vacation'])
-    tag_goals = tag_goals.filter(tag__type=Tag.CONTINUOUS).exclude(
+    tag_goals = tag_goals.filter(tag__user=user, tag__type=Tag.CONTINUOUS).exclude(
         tag__id__in=[tag_sum['tag_id'] for tag_sum in tag_sums]).exclude(
-        tag__expense=False)
+        tag__expense=False).select_related('tag')
     for tag_goal in tag_goals:
         if tag_goal.value == 0:
             continue
@@ -520,14 +488,62 @@ except ImportError as e:
     chat_service = ChatService()
 
 
-class ChatHistoryView(APIView):
-    """Return conversation history for the authenticated user."""
+@extend_schema(
+    parameters=[
+        OpenApiParameter("since", OpenApiTypes.DATETIME, description="Only messages newer than this time"),
+        OpenApiParameter("compact", OpenApiTypes.BOOL, description="Reduce chart and image payloads to a summary"),
+    ]
+)
+class ChatHistoryView(generics.ListAPIView):
+    """Return conversation history for the authenticated user, newest first.
+
+    Cursor paginated on ``(timestamp, id)``.  ``since`` limits the history to
+    newer messages for incremental sync, with ``compact`` chart and image
+    payloads are replaced by a link to ``ChatMessageView``.
+    """
+
+    pagination_class = MessageCursorPagination
+
+    def get_queryset(self):
+        messages = chat_service.history(self.request.user)
+        since = self.request.query_params.get("since")
+        if since:
+            since_time = parse_datetime(since)
+            if since_time is None:
+                raise ValidationError({"since": ["Expected an ISO 8601 datetime."]})
+            messages = messages.filter(timestamp__gt=since_time)
+        return messages
+
+    def get_serializer_class(self):
+        if self.request.query_params.get("compact", "").lower() in ("1", "true"):
+            return CompactMessageSerializer
+        return MessageSerializer
+
+
+class ChatMessageView(generics.RetrieveAPIView):
+    """Return a single chat message of the authenticated user with its full payload."""
 
     serializer_class = MessageSerializer
 
-    def get(self, request):
-        messages = chat_service.history(request.user)
-        return Response(MessageSerializer(messages, many=True).data)
+    def get_queryset(self):
+        return Message.objects.filter(conversation__user=self.request.user)
+
+
+class ChartStatusView(APIView):
+    """Render status of the chart ``chart_id`` of a report, polled by the client while it is ``pending``."""
+
+    @extend_schema(
+        responses=inline_serializer(
+            name="ChartStatus",
+            fields={
+                "chart_id": serializers.CharField(),
+                "url": serializers.CharField(),
+                "status": serializers.ChoiceField(choices=["pending", "ready", "failed"]),
+            },
+        )
+    )
+    def get(self, request, chart_id):
+        return Response(charts.chart_status(chart_id))
 
 
 class ChatSendView(APIView):
@@ -552,3 +568,27 @@ class ChatSendView(APIView):
         return Response(MessageSerializer(agent_msg).data)
 
 
+class ChatStreamView(APIView):
+    """Stream the agent response as server-sent events.
+
+    Served by ``finance.asgi`` without a worker thread per request, this view
+    is the fallback when the project runs under WSGI.
+    """
+
+    @extend_schema(
+        request=inline_serializer(
+            name="ChatStreamRequest",
+            fields={"text": serializers.CharField()},
+        ),
+        responses={(200, "text/event-stream"): str},
+    )
+    def post(self, request):
+        text = request.data.get("text", "")
+        response = StreamingHttpResponse(
+            chat_events(chat_service, request.user, text), content_type="text/event-stream; charset=utf-8"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
@@ -1,27 +1,108 @@
 import abc
 import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+FETCH_WORKERS = 4
+FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5
+
+
+def pooled_session(pool_size=FETCH_WORKERS, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    """
+    requests session that keeps up to pool_size connections alive and retries connection errors, 429 and 5xx
+    responses with exponential backoff (POST included, the bank APIs use POST for reads)
+    """
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=None, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def fetch_concurrently(fetch, items, max_workers=FETCH_WORKERS):
+    """
+    calls fetch(item) for every item with at most max_workers calls in flight
+    :returns list of the results in the order of items, the first failure is raised
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fetch(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(fetch, items))
+
+
+class ScrapeSession:
+    """
+    HTTP session of a single scrape.
+    The browser cookies are copied once, on the first call (after the login), connections are kept alive and retried
+    as in pooled_session and the latency of every endpoint is recorded and logged when the session is closed.
+    Safe to share between the threads of fetch_concurrently.
+    """
+
+    def __init__(self, driver=None, pool_size=FETCH_WORKERS, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+        self.driver = driver
+        self.session = pooled_session(pool_size, retries, backoff)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.latency = defaultdict(list)
+        self._cookies_copied = driver is None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, method, url, **kwargs):
+        self._copy_cookies()
+        started = time.monotonic()
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                self.latency['{} {}'.format(method, urlsplit(url).path)].append(time.monotonic() - started)
+
+    def get_json(self, url, headers=None, params=None):
+        return json.loads(self.request('GET', url, headers=headers, params=params).text)
+
+    def post_json(self, url, headers=None, data=None, json_data=None):
+        return json.loads(self.request('POST', url, headers=headers, data=data, json=json_data).text)
+
+    def latency_summary(self):
+        """:returns {endpoint: {'calls', 'total', 'max'}} with the times in seconds"""
+        with self._lock:
+            return {endpoint: {'calls': len(times), 'total': sum(times), 'max': max(times)}
+                    for endpoint, times in self.latency.items()}
+
+    def close(self):
+        for endpoint, stats in self.latency_summary().items():
+            logger.info('{}: {} calls, {:.2f}s total, {:.2f}s max'.format(endpoint, stats['calls'], stats['total'],
+                                                                        stats['max']))
+        self.session.close()
+
+    def _copy_cookies(self):
+        with self._lock:
+            if self._cookies_copied:
+                return
+            for cookie in self.driver.get_cookies():
+                self.session.cookies.set(cookie['name'], cookie['value'])
+            self._cookies_copied = True
+
 
 class Scraper:
     @abc.abstractmethod
     def get_transactions(self, start, end,credential,  *args, **kwargs):
         pass
-
-    def get_with_requests(self, driver, url, headers, params):
-        cookies = driver.get_cookies()
-        s = requests.Session()
-        for cookie in cookies:
-            s.cookies.set(cookie['name'], cookie['value'])
-        # headers['user-agent'] = driver.execute_script("return navigator.userAgent;")
-        response = s.get(url, headers=headers, params=params)
-        return json.loads(response.text)
-
-    def post_with_requests(self, driver, url, headers, data):
-        cookies = driver.get_cookies()
-        s = requests.Session()
-        for cookie in cookies:
-            s.cookies.set(cookie['name'], cookie['value'])
-        # headers['user-agent'] = driver.execute_script("return navigator.userAgent;")
-        response = s.post(url, headers=headers, data=data)
-        return json.loads(response.text)
\ No newline at end of file
@@ -1,20 +1,16 @@
 # import asyncio
 import datetime
 import logging
-import os
 import time
 
-import django
-from bank_scraper.base_scraper import Scraper
+from bank_scraper.base_scraper import ScrapeSession, Scraper
 from telegram_bot import telegram_bot_api
 
 logger = logging.getLogger(__name__)
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance.settings")
-django.setup()
 from selenium.webdriver.common.by import By
 
-from bank_scraper.selenium_api import get_selenium_driver
+from bank_scraper.selenium_api import driver_pool
 
 URL = "https://start.telebank.co.il/Titan/gatewayAPI/lastTransactions/transactions/0142181635/ByLastYear"
 URL_LOANS = 'https://start.telebank.co.il/Titan/gatewayAPI/onlineLoans/loansQuery/0142181635'
@@ -53,41 +49,39 @@ class DiscountScraper(Scraper):
 
     def get_transactions(self, start, end, credential, username=None, password=None, user_id=None, headless=False,
                          grid=True, *args, **kwargs):
-        driver = get_selenium_driver(headless=headless, grid=grid)
-        try:
-            driver.get('https://start.telebank.co.il/login/#/LOGIN_PAGE')
-            time.sleep(2)
-            inputs = driver.find_elements(By.XPATH, '//input')
-            inputs[0].send_keys(user_id)
-            inputs[1].send_keys(password)
-            inputs[2].send_keys(username)
-            driver.find_element(By.XPATH, "//button[contains(., 'כניסה')]").click()
-            time.sleep(5)
-            transactions = []
+        with driver_pool.lease(headless=headless, grid=grid) as driver, ScrapeSession(driver) as session:
+            try:
+                driver.get('https://start.telebank.co.il/login/#/LOGIN_PAGE')
+                time.sleep(2)
+                inputs = driver.find_elements(By.XPATH, '//input')
+                inputs[0].send_keys(user_id)
+                inputs[1].send_keys(password)
+                inputs[2].send_keys(username)
+                driver.find_element(By.XPATH, "//button[contains(., 'כניסה')]").click()
+                time.sleep(5)
+                transactions = []
 
-            if datetime.datetime.now() - start > datetime.timedelta(days=365):
-                print('Cant get transaction that are older than a year')
-                start = datetime.datetime.now() - datetime.timedelta(days=365)
-                print('setting start date to:', start)
+                if datetime.datetime.now() - start > datetime.timedelta(days=365):
+                    print('Cant get transaction that are older than a year')
+                    start = datetime.datetime.now() - datetime.timedelta(days=365)
+                    print('setting start date to:', start)
 
-            data = self.get_with_requests(driver, URL, HEADERS, PARAMS)
+                data = session.get_json(URL, HEADERS, PARAMS)
 
-            if type(data) == dict:
-                data = [data]
-            if data[0].get('Error') and data[0].get('Error').get('ReturnedCode') == 'RET010297':
-                return transactions
-            account_balance = data[0]['CurrentAccountLastTransactions']['CurrentAccountInfo']['AccountBalance']
-            credential.additional_info[credential.ADDITIONAL_INFO_BALANCE] = account_balance
-            s = self.get_with_requests(driver, URL_LOANS, HEADERS, PARAMS)
-            loans = -s['LoansQuery']['Summary']['TotalBalance']
+                if type(data) == dict:
+                    data = [data]
+                if data[0].get('Error') and data[0].get('Error').get('ReturnedCode') == 'RET010297':
+                    return transactions
+                account_balance = data[0]['CurrentAccountLastTransactions']['CurrentAccountInfo']['AccountBalance']
+                credential.additional_info[credential.ADDITIONAL_INFO_BALANCE] = account_balance
+                s = session.get_json(URL_LOANS, HEADERS, PARAMS)
+                loans = -s['LoansQuery']['Summary']['TotalBalance']
 
-            credential.additional_info[credential.ADDITIONAL_INFO_LOANS] = loans
-            credential.save()
-        except Exception as e:
-            telegram_bot_api.send_img(driver.get_screenshot_as_png())
-            driver.quit()
-            raise e
-        driver.quit()
+                credential.additional_info[credential.ADDITIONAL_INFO_LOANS] = loans
+                credential.save()
+            except Exception as e:
+                telegram_bot_api.send_img(driver.get_screenshot_as_png())
+                raise e
         for transaction in data[0]['CurrentAccountLastTransactions']['OperationEntry']:
             if end >= datetime.datetime.strptime(transaction['OperationDate'], '%Y%m%d') >= start:
                 transactions.append({
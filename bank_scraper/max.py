@@ -6,22 +6,18 @@
 # from pyppeteer_stealth import stealth
 import datetime
 import json
-import os
 import time
 import urllib
 
-import django
 from dateutil import relativedelta
 
 from telegram_bot import telegram_bot_api
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "finance.settings")
-django.setup()
 
 from selenium.webdriver.common.by import By
 
-from bank_scraper.base_scraper import Scraper
-from bank_scraper.selenium_api import get_selenium_driver
+from bank_scraper.base_scraper import ScrapeSession, Scraper
+from bank_scraper.selenium_api import driver_pool
 
 
 URL = "https://www.max.co.il/api/registered/getHomePageData?v=V3.90-HF.29.53"
@@ -50,46 +46,44 @@ class MaxScraper(Scraper):
 
     def get_transactions(self, start, end, credential, username=None, password=None, grid=True, headless = True, *args, **kwargs):
 
-        driver = get_selenium_driver(grid=grid, headless = headless)  # driver = uc.Chrome(enable_cdp_events=True)
-        try:
-            driver.get('https://www.max.co.il/homepage/welcome')
-            time.sleep(2)
-
-            driver.execute_script("arguments[0].click();", driver.find_element(By.CLASS_NAME, 'go-to-personal-area'))
-            driver.execute_script("arguments[0].click();", driver.find_element(By.ID, 'login-password-link'))
-            driver.find_element(By.XPATH, '//*[@formcontrolname="username"]').send_keys(username)
-            driver.find_element(By.XPATH, '//*[@formcontrolname="password"]').send_keys(password)
-            driver.execute_script("arguments[0].click();", driver.find_elements(By.XPATH, "//button[@id='send-code']")[1])
-            time.sleep(5)
-            driver.get('https://www.max.co.il/transaction-details/personal')
-            time.sleep(3)
-            print('trying')
-            home_page_data = self.get_with_requests(driver, URL, HEADERS, PAYLOAD)
-            current_month_total_some = 0
-            for x in home_page_data['Result']['UserCards']['Summary']:
-                if x['CurrencySymbol'] == '₪':
-                    current_month_total_some = x['ActualDebitSum']
-            card_details = [{'last_digits': card['Last4Digits'],
-                             'next_bill': card['CycleSummary'][0]['Date'],
-                             'debit': card['CycleSummary'][0]['ActualDebitSum']} for card in
-                            home_page_data['Result']['UserCards']['Cards'] if len(card['CycleSummary']) > 0]
-
-            credential.additional_info[credential.ADDITIONAL_INFO_BALANCE] = float(current_month_total_some) * -1
-            credential.additional_info['card_details'] = card_details
-            credential.save()
-
-            url = 'https://www.max.co.il/api/registered/transactionDetails/getTransactionsAndGraphs?filterData={}&firstCallCardIndex=-1null&v=V3.85-HF.21'.format(
-                urllib.parse.unquote(
-                    json.dumps(
-                        {"userIndex": -1, "cardIndex": -1, "monthView": False, "date": start.strftime('%Y-%m-%d'),
-                         "dates": {"startDate": start.strftime('%Y-%m-%d'), "endDate": end.strftime('%Y-%m-%d')},
-                         "bankAccount": {"bankAccountIndex": -1, "cards": None}})))
-            transactions_response = self.get_with_requests(driver, url, HEADERS, PAYLOAD)
-        except Exception as e:
-            telegram_bot_api._send_img(driver.get_screenshot_as_png())
-            driver.quit()
-            raise e
-        driver.quit()
+        with driver_pool.lease(grid=grid, headless=headless) as driver, ScrapeSession(driver) as session:  # driver = uc.Chrome(enable_cdp_events=True)
+            try:
+                driver.get('https://www.max.co.il/homepage/welcome')
+                time.sleep(2)
+
+                driver.execute_script("arguments[0].click();", driver.find_element(By.CLASS_NAME, 'go-to-personal-area'))
+                driver.execute_script("arguments[0].click();", driver.find_element(By.ID, 'login-password-link'))
+                driver.find_element(By.XPATH, '//*[@formcontrolname="username"]').send_keys(username)
+                driver.find_element(By.XPATH, '//*[@formcontrolname="password"]').send_keys(password)
+                driver.execute_script("arguments[0].click();", driver.find_elements(By.XPATH, "//button[@id='send-code']")[1])
+                time.sleep(5)
+                driver.get('https://www.max.co.il/transaction-details/personal')
+                time.sleep(3)
+                print('trying')
+                home_page_data = session.get_json(URL, HEADERS, PAYLOAD)
+                current_month_total_some = 0
+                for x in home_page_data['Result']['UserCards']['Summary']:
+                    if x['CurrencySymbol'] == '₪':
+                        current_month_total_some = x['ActualDebitSum']
+                card_details = [{'last_digits': card['Last4Digits'],
+                                 'next_bill': card['CycleSummary'][0]['Date'],
+                                 'debit': card['CycleSummary'][0]['ActualDebitSum']} for card in
+                                home_page_data['Result']['UserCards']['Cards'] if len(card['CycleSummary']) > 0]
+
+                credential.additional_info[credential.ADDITIONAL_INFO_BALANCE] = float(current_month_total_some) * -1
+                credential.additional_info['card_details'] = card_details
+                credential.save()
+
+                url = 'https://www.max.co.il/api/registered/transactionDetails/getTransactionsAndGraphs?filterData={}&firstCallCardIndex=-1null&v=V3.85-HF.21'.format(
+                    urllib.parse.unquote(
+                        json.dumps(
+                            {"userIndex": -1, "cardIndex": -1, "monthView": False, "date": start.strftime('%Y-%m-%d'),
+                             "dates": {"startDate": start.strftime('%Y-%m-%d'), "endDate": end.strftime('%Y-%m-%d')},
+                             "bankAccount": {"bankAccountIndex": -1, "cards": None}})))
+                transactions_response = session.get_json(url, HEADERS, PAYLOAD)
+            except Exception as e:
+                telegram_bot_api._send_img(driver.get_screenshot_as_png())
+                raise e
         trans = []
         for t in transactions_response['result']['transactions']:
             name = t['merchantName']
@@ -1,5 +1,8 @@
+import atexit
 import os
+import threading
 import time
+from contextlib import contextmanager
 
 import chromedriver_autoinstaller
 
@@ -12,6 +15,8 @@ from selenium_stealth import stealth
 logging.getLogger('seleniumwire').setLevel(logging.WARNING)
 from finance import settings
 
+logger = logging.getLogger(__name__)
+
 
 def get_driver():
     options = webdriver.ChromeOptions()
@@ -86,6 +91,119 @@ def get_selenium_driver(grid=True, headless = True, wire = False):
     return driver
 
 
+class DriverPool:
+    """
+    Keeps started drivers warm between scrapes.
+    Drivers are keyed by the get_selenium_driver options, a leased driver is health checked before it is handed out,
+    reset (cookies, storage, captured requests) when it is returned and quit after max_uses leases, after idle_timeout
+    seconds without a lease or when the scrape using it raised.
+    """
+
+    def __init__(self, factory=get_selenium_driver, max_uses=None, idle_timeout=None, max_idle=None):
+        self.factory = factory
+        self.max_uses = max_uses or settings.SELENIUM_POOL_MAX_USES
+        self.idle_timeout = idle_timeout or settings.SELENIUM_POOL_IDLE_TIMEOUT
+        self.max_idle = max_idle if max_idle is not None else settings.SELENIUM_POOL_MAX_IDLE
+        self._idle = {}
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, grid=True, headless=True, wire=False):
+        key = (grid, headless, wire)
+        driver = self._acquire(key)
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self._release(key, driver, healthy)
+
+    def _acquire(self, key):
+        self.evict_idle()
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                driver = idle.pop()[0] if idle else None
+            if driver is None:
+                driver = self.factory(grid=key[0], headless=key[1], wire=key[2])
+                break
+            if self._is_healthy(driver):
+                break
+            self._quit(driver)
+        with self._lock:
+            # the lease count is read by _release and dropped by _quit on other threads
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        return driver
+
+    def _release(self, key, driver, healthy):
+        with self._lock:
+            idle_count = sum(len(drivers) for drivers in self._idle.values())
+            uses = self._uses.get(id(driver), 0)
+        if not healthy or uses >= self.max_uses or idle_count >= self.max_idle or not self._reset(driver):
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append((driver, time.monotonic()))
+
+    def evict_idle(self):
+        """quits the drivers that were not leased for idle_timeout seconds"""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for key, drivers in self._idle.items():
+                expired.extend(driver for driver, released in drivers if now - released > self.idle_timeout)
+                self._idle[key] = [(driver, released) for driver, released in drivers if
+                                   now - released <= self.idle_timeout]
+        for driver in expired:
+            self._quit(driver)
+
+    def close(self):
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver, _ in idle]
+            self._idle = {}
+        for driver in drivers:
+            self._quit(driver)
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """clears the state of the previous scrape so the next login starts from a clean profile"""
+        try:
+            driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+        except Exception:
+            pass  # pages without an origin (about:blank) have no storage
+        try:
+            if hasattr(driver, 'execute_cdp_cmd'):
+                # webdriver only deletes the cookies of the current domain, chrome can drop all of them
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            else:
+                driver.delete_all_cookies()
+            if hasattr(driver, 'requests'):
+                del driver.requests
+            driver.get('about:blank')
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            logger.warning('failed to quit driver', exc_info=True)
+
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.close)
 
 
 def test_selenium_chrome(driver):
@@ -0,0 +1,28 @@
+"""
+ASGI config for finance project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The chat stream (``app.streaming``) is served natively so the agent output is
+flushed as it arrives, every other request goes to Django.
+
+    gunicorn finance.asgi:application -k uvicorn.workers.UvicornWorker
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance.settings')
+
+django_application = get_asgi_application()
+
+from app.streaming import CHAT_STREAM_PATH, ChatStreamApp  # noqa: E402 - needs the apps loaded
+
+chat_stream_application = ChatStreamApp()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == CHAT_STREAM_PATH:
+        await chat_stream_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,137 @@
+import datetime
+import logging
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dateutil import relativedelta
+from django.db import connections
+
+from bank_scraper.base import scraper_factory
+from finance import settings, utils
+from myFinance import models
+
+logger = logging.getLogger(__name__)
+
+
+def scrape_window(credential, end, full=False, overlap_days=None):
+    """
+    :returns the (start, end) datetimes to scrape for credential.
+    Incremental runs start overlap_days before the credential last_scanned high-water mark so late posted
+    transactions are picked up again (update_transactions skips the ones already stored).
+    A credential that was never scanned starts at the 1st of the month of end, a full resync
+    SCRAPE_FULL_RESYNC_MONTHS months before that.
+    """
+    overlap_days = settings.SCRAPE_OVERLAP_DAYS if overlap_days is None else overlap_days
+    if full:
+        start = end.replace(day=1) - relativedelta.relativedelta(months=settings.SCRAPE_FULL_RESYNC_MONTHS)
+    elif not credential.last_scanned:
+        start = end.replace(day=1)
+    else:
+        start = datetime.datetime.combine(credential.last_scanned, datetime.time()) - datetime.timedelta(
+            days=overlap_days)
+    return start, end
+
+
+def load_credential_transactions(credential, start, end, headless=False, grid=False):
+    """
+    Scrapes the transactions of a single credential between start and end and stores the new ones.
+    :returns dict with the number of inserted and skipped transactions
+    """
+    scraper = scraper_factory(credential.company)
+    transactions = scraper.get_transactions(start, end, credential, **credential.get_credential,
+                                            headless=headless, grid=grid)
+    result = utils.update_transactions(credential, transactions)
+    if not credential.last_scanned or end.date() > credential.last_scanned:
+        credential.last_scanned = end.date()
+        credential.save()
+    return result
+
+
+class ScrapeRun:
+    """
+    Scrapes many credentials concurrently.
+    At most max_workers credentials are scraped at once and at most per_company of them for the same company,
+    banks block parallel logins so the default is one session per company.
+    Jobs of a company that is at its cap wait in a queue and do not hold a worker.
+    """
+
+    def __init__(self, max_workers=None, per_company=None, loader=load_credential_transactions, **loader_options):
+        self.max_workers = max_workers or settings.SCRAPE_MAX_WORKERS
+        self.per_company = per_company or settings.SCRAPE_COMPANY_CONCURRENCY
+        self.loader = loader
+        self.loader_options = loader_options
+        self.summary = []
+
+    def run(self, jobs):
+        """
+        :param jobs: iterable of (credential, start, end)
+        :returns list of summary rows, one per job in the order the jobs were given
+        """
+        pending = {}
+        rows = []
+        for credential, start, end in jobs:
+            row = {'credential_id': credential.id, 'user': credential.user.username, 'company': credential.company,
+                   'start': start, 'end': end, 'status': 'pending', 'inserted': 0, 'skipped': 0, 'duration': 0.0,
+                   'error': None}
+            rows.append(row)
+            if end < start:
+                row['status'] = 'noop'
+                continue
+            pending.setdefault(credential.company, deque()).append((row, credential))
+
+        running = {}
+        active = dict.fromkeys(pending, 0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for company in list(pending):
+                    while pending[company] and active[company] < self.per_company and len(
+                            running) < self.max_workers:
+                        row, credential = pending[company].popleft()
+                        running[executor.submit(self._run_job, credential, row['start'], row['end'])] = (
+                            row, credential)
+                        active[company] += 1
+                    if not pending[company]:
+                        del pending[company]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row, credential = running.pop(future)
+                    active[credential.company] -= 1
+                    row.update(future.result())
+                    if row['status'] == 'error':
+                        models.ErrorLog.objects.create(user=credential.user, message={'error': row['error']})
+
+        self.summary = rows
+        logger.info('scrape run done\n{}'.format(self.format_summary()))
+        return rows
+
+    def _run_job(self, credential, start, end):
+        """runs in a worker thread, never raises so one failing credential does not stop the run"""
+        logger.info('starting work for user {} company {} ({} - {})'.format(credential.user.username,
+                                                                           credential.company, start, end))
+        started = time.monotonic()
+        try:
+            result = self.loader(credential, start, end, **self.loader_options) or {}
+            return {'status': 'ok', 'inserted': result.get('inserted', 0), 'skipped': result.get('skipped', 0),
+                    'duration': time.monotonic() - started}
+        except Exception:
+            message = 'Error loading Transactions for company {}: {}'.format(credential.company,
+                                                                              traceback.format_exc())
+            logger.error(message)
+            return {'status': 'error', 'error': message, 'duration': time.monotonic() - started}
+        finally:
+            connections.close_all()
+            logger.info('done work for user {} company {}'.format(credential.user.username, credential.company))
+
+    def format_summary(self):
+        lines = ['{:<6} {:<16} {:<10} {:<6} {:>8} {:>8} {:>9}'.format('id', 'user', 'company', 'status',
+                                                                       'inserted', 'skipped', 'seconds')]
+        for row in self.summary:
+            lines.append('{:<6} {:<16} {:<10} {:<6} {:>8} {:>8} {:>9.1f}'.format(
+                row['credential_id'], row['user'][:16], row['company'], row['status'], row['inserted'],
+                row['skipped'], row['duration']))
+        lines.append('total: {} credentials, {} inserted, {} failed, {:.1f}s scraping'.format(
+            len(self.summary), sum(row['inserted'] for row in self.summary),
+            sum(row['status'] == 'error' for row in self.summary), sum(row['duration'] for row in self.summary)))
+        return '\n'.join(lines)
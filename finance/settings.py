@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import logging.config
 import os
+from urllib.parse import urlsplit
 
 import boto3
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -136,6 +137,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'finance.wsgi.application'
+ASGI_APPLICATION = 'finance.asgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -201,6 +203,8 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+MEDIA_URL = '/media/'
+MEDIA_ROOT = config('MEDIA_ROOT', default=os.path.join(BASE_DIR, 'media'))
 #
 #
 STATICFILES_DIRS = [
@@ -293,8 +297,9 @@ CORS_ALLOW_CREDENTIALS = True
 KMS_FIELD_REGION = 'us-east-2'
 KMS_FIELD_CACHE_SIZE = 500
 
-CELERY_BROKER_URL = config('REDIS_ENDPOINT', default='redis://localhost:6379/0')
-CELERY_RESULT_BACKEND = config('REDIS_ENDPOINT', default='redis://localhost:6379/0')
+REDIS_ENDPOINT = config('REDIS_ENDPOINT', default='redis://localhost:6379/0')
+CELERY_BROKER_URL = REDIS_ENDPOINT
+CELERY_RESULT_BACKEND = REDIS_ENDPOINT
 CELERY_TRACK_STARTED = True
 CELERYD_LOG_FILE = os.path.join(BASE_DIR, 'celery.log')
 CELERYD_LOG_LEVEL = "INFO"
@@ -303,6 +308,40 @@ CELERY_TIMEZONE = 'UTC'
 CELERY_ENABLE_UTC = True
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers.DatabaseScheduler'
 
+# shared by the web and celery processes, so the cache invalidation of an ingestion reaches the chat; database 1 of
+# the celery redis unless CACHE_REDIS_URL is set
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default=urlsplit(REDIS_ENDPOINT)._replace(path='/1').geturl())
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+        # the cached results are recomputed when redis is unreachable, the chat keeps working without them
+        'OPTIONS': {'IGNORE_EXCEPTIONS': True},
+    }
+}
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+SCRAPE_MAX_WORKERS = config('SCRAPE_MAX_WORKERS', default=4, cast=int)
+SCRAPE_COMPANY_CONCURRENCY = config('SCRAPE_COMPANY_CONCURRENCY', default=1, cast=int)
+SCRAPE_OVERLAP_DAYS = config('SCRAPE_OVERLAP_DAYS', default=3, cast=int)
+SCRAPE_FULL_RESYNC_MONTHS = config('SCRAPE_FULL_RESYNC_MONTHS', default=12, cast=int)
+CHAT_CONTEXT_MONTHS = config('CHAT_CONTEXT_MONTHS', default=6, cast=int)
+CHAT_CONTEXT_MAX_TRANSACTIONS = config('CHAT_CONTEXT_MAX_TRANSACTIONS', default=1000, cast=int)
+CHAT_CONTEXT_CACHE_TIMEOUT = config('CHAT_CONTEXT_CACHE_TIMEOUT', default=600, cast=int)
+SELENIUM_POOL_MAX_USES = config('SELENIUM_POOL_MAX_USES', default=20, cast=int)
+SELENIUM_POOL_IDLE_TIMEOUT = config('SELENIUM_POOL_IDLE_TIMEOUT', default=600, cast=int)
+SELENIUM_POOL_MAX_IDLE = config('SELENIUM_POOL_MAX_IDLE', default=3, cast=int)
+ADK_SESSION_CACHE_SIZE = config('ADK_SESSION_CACHE_SIZE', default=256, cast=int)
+ADK_SESSION_COMPACT_AFTER = config('ADK_SESSION_COMPACT_AFTER', default=200, cast=int)
+ADK_SESSION_KEEP_EVENTS = config('ADK_SESSION_KEEP_EVENTS', default=50, cast=int)
+ADK_SESSION_SUMMARY_CHARS = config('ADK_SESSION_SUMMARY_CHARS', default=4000, cast=int)
+ADK_TOOL_CACHE_SESSIONS = config('ADK_TOOL_CACHE_SESSIONS', default=256, cast=int)
+ADK_TOOL_CACHE_TTL = config('ADK_TOOL_CACHE_TTL', default=300, cast=int)
+ADK_TOOL_WORKERS = config('ADK_TOOL_WORKERS', default=4, cast=int)
+CHART_RENDER_BACKEND = config('CHART_RENDER_BACKEND', default='thread')
+CHART_RENDER_WORKERS = config('CHART_RENDER_WORKERS', default=1, cast=int)
+CHART_RENDER_TIMEOUT = config('CHART_RENDER_TIMEOUT', default=300, cast=int)
+
 REST_AUTH_REGISTER_SERIALIZERS = {
 
     'REGISTER_SERIALIZER': 'app.serializers.CustomRegisterSerializer',
@@ -1,3 +1,5 @@
+import tempfile
+
 from .settings import *  # noqa
 
 DATABASES = {
@@ -6,3 +8,12 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# rendered charts
+MEDIA_ROOT = tempfile.mkdtemp(prefix="finance-test-media-")
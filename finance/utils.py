@@ -1,9 +1,22 @@
 import datetime
+import logging
 from functools import reduce
 
+from django.db import transaction as db_transaction
+from rest_framework.exceptions import ValidationError
+
 from myFinance import serialisers
-from myFinance.models import Transaction
-from sort_transactions import get_category
+from myFinance.billing_cycle import BillingCycle
+from myFinance.finance_queries import FinanceQueryService
+from myFinance.financial_context import FinancialContext
+from myFinance.models import MonthlyTagTotal, Transaction, TransactionNameTag
+from sort_transactions import get_categories
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+# the scraped fields checked before the bulk insert, the others are set by update_transactions
+VALIDATED_FIELDS = ('date', 'name', 'value')
 
 
 def is_transaction(transaction_fields, transaction):
@@ -14,36 +27,81 @@ def is_transaction(transaction_fields, transaction):
                        key != 'tag']))  # TODO change when change to category
 
 
+def valid_transactions(credential, transaction_list):
+    """
+    the scraped rows whose date, name and value pass the TransactionSerializer fields, with the date and value
+    converted; invalid rows are logged and left out instead of failing the whole batch
+    """
+    fields = serialisers.TransactionSerializer().fields
+    valid = []
+    for current in transaction_list:
+        if type(current.get('date')) == datetime.datetime:
+            current['date'] = current['date'].date()
+        try:
+            values = {name: fields[name].run_validation(current.get(name)) for name in VALIDATED_FIELDS}
+        except ValidationError as e:
+            logger.warning('credential {}: invalid transaction {}: {}'.format(credential.id, current, e.detail))
+            continue
+        valid.append({**current, 'date': values['date'], 'value': values['value']})
+    return valid
+
+
 def update_transactions(credential, transaction_list):
-    transaction_list_sorted = sorted(transaction_list, key=lambda x: (x['date'], x['name'], x['value']))
+    """
+    Insert the scraped transactions of a credential that are not in the db yet.
+    Existing identifiers and categories are loaded once and new rows are inserted with bulk_create.
+    :returns dict with the number of inserted, skipped (already in the db) and invalid transactions
+    """
+    valid = valid_transactions(credential, transaction_list)
+    result = {'inserted': 0, 'skipped': 0, 'invalid': len(transaction_list) - len(valid)}
+    transaction_list_sorted = sorted(valid, key=lambda x: (x['date'], x['name'], x['value']))
     if not transaction_list_sorted:
-        return
+        return result
     first_date, end_date = transaction_list_sorted[0]['date'], transaction_list_sorted[-1]['date']
-    db_transactions = credential.transaction_set.filter(date__gte=first_date, date__lte=end_date).order_by('date',
-                                                                                                           'name',
-                                                                                                           'value')
+    db_transactions = credential.transaction_set.filter(date__gte=first_date, date__lte=end_date)
 
-    db_transactions_list = list(db_transactions)
-    i = 0
     identifier = bool(transaction_list_sorted[0].get('identifier'))
-    for current in transaction_list_sorted:
-        if type(current['date']) == datetime.datetime:
-            current['date'] = current['date'].date()
-        if identifier:
-            if db_transactions.filter(identifier=current['identifier'], credential=credential).exists():
+    new_transactions = []
+    if identifier:
+        seen = set(db_transactions.exclude(identifier=None).values_list('identifier', flat=True))
+        for current in transaction_list_sorted:
+            if str(current['identifier']) in seen:
                 continue
-        else:
+            seen.add(str(current['identifier']))
+            new_transactions.append(current)
+    else:
+        db_transactions_list = list(db_transactions.order_by('date', 'name', 'value'))
+        i = 0
+        for current in transaction_list_sorted:
             if i < len(db_transactions_list) and is_transaction(current, db_transactions_list[i]):
                 i += 1
                 continue
-        current['credential'] = credential.id
-        current['user'] = credential.user.id
-        current['tag'] = get_category(current).id
-        serializer = serialisers.TransactionSerializer(data=current)
-        if serializer.is_valid():
-            serializer.save()
-        else:
-            raise Exception('could not validate transaction for credential: ' + credential.company)
+            new_transactions.append(current)
+    result['skipped'] = len(transaction_list_sorted) - len(new_transactions)
+    if not new_transactions:
+        return result
+
+    user = credential.user
+    categories = get_categories([t['name'] for t in new_transactions], user)
+    objs = [Transaction(user=user, credential=credential, date=t['date'], name=t['name'], value=float(t['value']),
+                        identifier=str(t['identifier']) if t.get('identifier') is not None else None,
+                        bank=t.get('bank', False), tag=categories[t['name']])
+            for t in new_transactions]
+    BillingCycle.for_user(user).apply(objs)
+    with db_transaction.atomic():
+        # Transaction.save keeps the name -> tag mapping, bulk_create has to do it explicitly
+        TransactionNameTag.objects.bulk_create(
+            [TransactionNameTag(user=user, transaction_name=name, tag=tag) for name, tag in categories.items()],
+            ignore_conflicts=True)
+        Transaction.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE)
+        MonthlyTagTotal.add_transactions(objs)
+    # bulk_create sends no post_save signals
+    FinancialContext.invalidate(user.id)
+    FinanceQueryService.invalidate(user.id)
+    result['inserted'] = len(objs)
+    logger.info('credential {}: inserted {} transactions, skipped {}, invalid {}'.format(
+        credential.id, result['inserted'], result['skipped'], result['invalid']))
+    return result
 
 
 def remove_duplicate_transactions(transaction_list):
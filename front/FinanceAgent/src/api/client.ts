@@ -1,6 +1,10 @@
 import { makeApi, Zodios, type ZodiosOptions } from "@zodios/core";
 import { z } from "zod";
 
+const StatusEnum = z.enum(["pending", "ready", "failed"]);
+const ChartStatus = z
+  .object({ chart_id: z.string(), url: z.string(), status: StatusEnum })
+  .passthrough();
 const MonthTracking = z.object({ text: z.string() }).passthrough();
 const SenderEnum = z.enum(["user", "agent"]);
 const Message = z
@@ -14,6 +18,13 @@ const Message = z
     status: z.string().max(20),
   })
   .passthrough();
+const PaginatedMessageList = z
+  .object({
+    next: z.string().url().nullish(),
+    previous: z.string().url().nullish(),
+    results: z.array(Message),
+  })
+  .passthrough();
 const ChatSendRequest = z.object({ text: z.string() }).passthrough();
 const CredentialTypes = z
   .object({
@@ -241,9 +252,12 @@ const PatchedTransactionRest = z
 const UserTransactionsNames = z.object({ name: z.string() }).passthrough();
 
 export const schemas = {
+  StatusEnum,
+  ChartStatus,
   MonthTracking,
   SenderEnum,
   Message,
+  PaginatedMessageList,
   ChatSendRequest,
   CredentialTypes,
   TagGoal,
@@ -276,12 +290,62 @@ export const schemas = {
 };
 
 const endpoints = makeApi([
+  {
+    method: "get",
+    path: "/api/charts/:chart_id/",
+    alias: "api_charts_retrieve",
+    requestFormat: "json",
+    parameters: [
+      {
+        name: "chart_id",
+        type: "Path",
+        schema: z.string(),
+      },
+    ],
+    response: ChartStatus,
+  },
   {
     method: "get",
     path: "/api/chat/history/",
-    alias: "api_chat_history_retrieve",
+    alias: "api_chat_history_list",
+    requestFormat: "json",
+    parameters: [
+      {
+        name: "compact",
+        type: "Query",
+        schema: z.boolean().optional(),
+      },
+      {
+        name: "cursor",
+        type: "Query",
+        schema: z.string().optional(),
+      },
+      {
+        name: "page_size",
+        type: "Query",
+        schema: z.number().int().optional(),
+      },
+      {
+        name: "since",
+        type: "Query",
+        schema: z.string().datetime({ offset: true }).optional(),
+      },
+    ],
+    response: PaginatedMessageList,
+  },
+  {
+    method: "get",
+    path: "/api/chat/messages/:id/",
+    alias: "api_chat_messages_retrieve",
     requestFormat: "json",
-    response: z.array(Message),
+    parameters: [
+      {
+        name: "id",
+        type: "Path",
+        schema: z.number().int(),
+      },
+    ],
+    response: Message,
   },
   {
     method: "post",
@@ -6,7 +6,7 @@ import ChartCard from '../../components/common/ChartCard'
 import MediaItem from '../../components/common/MediaItem'
 import { SafeAreaView } from 'react-native-safe-area-context'
 import { LinearGradient } from 'expo-linear-gradient'
-import { chatService } from '../../services/chatService'
+import { chatService, mediaUrl } from '../../services/chatService'
 import { audioService } from '../../services/audioService'
 import MediaModal from '../../components/common/MediaModal'
 import type { ChatMessage } from '../../types/chat'
@@ -14,6 +14,7 @@ import FormModal from '../../components/common/FormModal'
 import FormButton from '../../components/common/FormButton'
 
 const { width: screenWidth } = Dimensions.get('window')
+const CHART_POLL_INTERVAL = 2000
 
 type MessageStatus = 'sending' | 'sent' | 'delivered' | 'failed'
 type MediaType = 'chart' | 'image' | null
@@ -40,6 +41,9 @@ export default function ChatScreen() {
   const [formModalVisible, setFormModalVisible] = useState(false)
   const [currentForm, setCurrentForm] = useState<any>(null)
 
+  // Status of the chart images still rendering on the backend, by chart_id
+  const [chartStatuses, setChartStatuses] = useState<Record<string, string>>({})
+
   const theme = useTheme()
   const flatListRef = useRef<FlatList>(null)
   const typingTimeoutRef = useRef<NodeJS.Timeout | undefined>(undefined)
@@ -65,6 +69,33 @@ export default function ChatScreen() {
     }
   }, [])
 
+  const pendingCharts = [...new Set(messages
+    .map(msg => msg.payload as any)
+    .filter(payload => payload?.chart_id && payload.chart_status === 'pending')
+    .map(payload => payload.chart_id as string)
+    .filter(chartId => !chartStatuses[chartId]))].join(',')
+
+  useEffect(() => {
+    if (!pendingCharts) return
+    const timer = setInterval(async () => {
+      for (const chartId of pendingCharts.split(',')) {
+        try {
+          const chart = await chatService.chartStatus(chartId)
+          if (chart.status !== 'pending') {
+            setChartStatuses(prev => ({ ...prev, [chartId]: chart.status }))
+          }
+        } catch (err) {
+          console.warn('Failed to check chart status', err)
+        }
+      }
+    }, CHART_POLL_INTERVAL)
+    return () => clearInterval(timer)
+  }, [pendingCharts])
+
+  // The image of a chart is shown once rendered, until then the chart is drawn from its labels/values
+  const chartImageReady = (payload: any) =>
+    !payload.chart_id || payload.chart_status === 'ready' || chartStatuses[payload.chart_id] === 'ready'
+
   const initializeAudio = async () => {
     try {
       await audioService.initialize()
@@ -163,7 +194,24 @@ export default function ChatScreen() {
         ))
       }, 500)
       
-      const reply = await chatService.sendMessage(messageText)
+      // the reply text is shown while it streams in, replaced by the persisted message at the end
+      const streamId = -Date.now()
+      const reply = await chatService.streamMessage(messageText, (partial) => {
+        setIsTyping(false)
+        const streamed: EnhancedChatMessage = {
+          id: streamId,
+          conversation: userMessage.conversation,
+          sender: 'agent',
+          content_type: 'text',
+          payload: { text: partial },
+          timestamp: new Date().toISOString(),
+          status: 'sending'
+        }
+        setMessages(prev => prev.some(msg => msg.id === streamId)
+          ? prev.map(msg => msg.id === streamId ? streamed : msg)
+          : [...prev, streamed])
+        scrollToBottom()
+      })
       const enhancedReply: EnhancedChatMessage = {
         ...reply,
         status: 'delivered'
@@ -176,7 +224,7 @@ export default function ChatScreen() {
       
       // Add AI reply with animation
       setTimeout(() => {
-        setMessages(prev => [...prev, enhancedReply])
+        setMessages(prev => [...prev.filter(msg => msg.id !== streamId), enhancedReply])
         audioService.playReceive()
         scrollToBottom()
       }, 300)
@@ -283,16 +331,33 @@ export default function ChatScreen() {
       )
     } else if (item.content_type === 'image') {
       const payload = item.payload as any
-      const imageUrl = payload.url ?? payload.chart_url
-      content = (
-        <MediaItem
-          type="image"
-          data={imageUrl}
-          onPress={() => openImageModal(imageUrl)}
-          width={250}
-          height={180}
-        />
-      )
+      if (!chartImageReady(payload) && payload.labels && payload.values) {
+        const chartData = {
+          labels: payload.labels,
+          datasets: [{ data: payload.values, color: (opacity = 1) => `rgba(39, 83, 167, ${opacity})`, strokeWidth: 3 }],
+        }
+        content = (
+          <MediaItem
+            type="chart"
+            data={chartData}
+            onPress={() => openChartModal(chartData, payload.title ?? "Chart", 300, 220)}
+            width={250}
+            height={180}
+            title={payload.title}
+          />
+        )
+      } else {
+        const imageUrl = mediaUrl(payload.url ?? payload.chart_url)
+        content = (
+          <MediaItem
+            type="image"
+            data={imageUrl}
+            onPress={() => openImageModal(imageUrl)}
+            width={250}
+            height={180}
+          />
+        )
+      }
     } else if (item.content_type === 'buttons') {
       content = (
         <View style={styles.buttonContainer}>
@@ -333,37 +398,44 @@ export default function ChatScreen() {
               </LinearGradient>
             </View>
             
-            <MediaItem
-              type="chart"
-              data={{
-                labels: payload.labels,
-                datasets: [
-                  {
-                    data: payload.values,
-                    color: (opacity = 1) => `rgba(39, 83, 167, ${opacity})`,
-                    strokeWidth: 3,
-                  },
-                ],
-              }}
-              onPress={() => openChartModal({
-                labels: payload.labels,
-                datasets: [
-                  {
-                    data: payload.values,
-                    color: (opacity = 1) => `rgba(39, 83, 167, ${opacity})`,
-                    strokeWidth: 3,
-                  },
-                ],
-              }, "Chart", 300, 220)}
-              width={300}
-              height={220}
-              title="Chart"
-            />
+            <View style={styles.chartContainer}>
+              <MediaItem
+                type="chart"
+                data={{
+                  labels: payload.labels,
+                  datasets: [
+                    {
+                      data: payload.values,
+                      color: (opacity = 1) => `rgba(39, 83, 167, ${opacity})`,
+                      strokeWidth: 3,
+                    },
+                  ],
+                }}
+                onPress={() => openChartModal({
+                  labels: payload.labels,
+                  datasets: [
+                    {
+                      data: payload.values,
+                      color: (opacity = 1) => `rgba(39, 83, 167, ${opacity})`,
+                      strokeWidth: 3,
+                    },
+                  ],
+                }, "Chart", 300, 220)}
+                width={300}
+                height={220}
+                title={payload.title ?? "Chart"}
+              />
+              {payload.summary_markdown && (
+                <Text style={[styles.messageText, styles.chartSummary, { color: theme.colors.onSurface }]}>
+                  {payload.summary_markdown.replace(/[#*]/g, '').trim()}
+                </Text>
+              )}
+            </View>
           </Animated.View>
         )
-      } else if (payload.url || payload.chart_url) {
+      } else if ((payload.url || payload.chart_url) && chartImageReady(payload)) {
         // Fallback for chart images returned by the backend
-        const imageUrl = payload.url ?? payload.chart_url
+        const imageUrl = mediaUrl(payload.url ?? payload.chart_url)
         content = (
           <MediaItem
             type="image"
@@ -699,6 +771,9 @@ const styles = StyleSheet.create({
     alignItems: 'center',
     marginVertical: 8,
   },
+  chartSummary: {
+    marginTop: 8,
+  },
   typingIndicator: {
     flexDirection: 'row',
     alignItems: 'center',
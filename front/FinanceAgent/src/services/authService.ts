@@ -3,7 +3,7 @@ import { secureStorage } from '../utils/secureStorage';
 import type { LoginRequest, RegisterRequest, User, ApiError } from '../types/auth';
 
 // TODO: Replace with your actual backend URL
-const API_BASE_URL = 'http://localhost:8000'; // or your backend URL
+export const API_BASE_URL = 'http://localhost:8000'; // or your backend URL
 
 class AuthService {
   private apiClient;
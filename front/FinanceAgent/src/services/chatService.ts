@@ -1,8 +1,9 @@
 import { schemas } from '../api/client'
-import { authService } from './authService'
+import { API_BASE_URL, authService } from './authService'
 import type { z } from 'zod'
 
 export type ChatMessage = z.infer<typeof schemas.Message>
+export type ChartStatus = z.infer<typeof schemas.ChartStatus>
 
 class ChatService {
   // Use the authenticated API client from authService
@@ -15,10 +16,75 @@ class ChatService {
     return res
   }
 
-  async fetchHistory(): Promise<ChatMessage[]> {
-    const res = await this.apiClient.api_chat_history_retrieve()
-    return res
+  // Send a message over the server-sent events endpoint, onDelta gets the reply text received so far.
+  // Resolves with the persisted reply; XMLHttpRequest since React Native's fetch does not stream the body
+  streamMessage(text: string, onDelta: (text: string) => void): Promise<ChatMessage> {
+    return new Promise((resolve, reject) => {
+      const xhr = new XMLHttpRequest()
+      let parsed = 0
+      let reply = ''
+      let message: ChatMessage | null = null
+      let failure: string | null = null
+
+      const parse = () => {
+        // frames end with a blank line, the last one may still be arriving
+        const frames = xhr.responseText.slice(parsed).split('\n\n')
+        frames.pop()
+        for (const frame of frames) {
+          parsed += frame.length + 2
+          const event = frame.match(/^event: (.*)$/m)?.[1]
+          const data = frame.match(/^data: (.*)$/m)?.[1]
+          if (!event || data === undefined) continue
+          const body = JSON.parse(data)
+          if (event === 'delta') {
+            reply += body.text
+            onDelta(reply)
+          } else if (event === 'message') {
+            message = body
+          } else if (event === 'error') {
+            failure = body.detail
+          }
+        }
+      }
+
+      xhr.open('POST', `${API_BASE_URL}/api/chat/stream/`)
+      xhr.setRequestHeader('Content-Type', 'application/json')
+      xhr.setRequestHeader('Accept', 'text/event-stream')
+      const authorization = this.apiClient.axios.defaults.headers.common['Authorization']
+      if (authorization) {
+        xhr.setRequestHeader('Authorization', authorization)
+      }
+      xhr.onprogress = parse
+      xhr.onload = () => {
+        parse()
+        if (xhr.status !== 200) {
+          reject(new Error(`Chat stream failed with status ${xhr.status}`))
+        } else if (message) {
+          resolve(message)
+        } else {
+          reject(new Error(failure ?? 'Chat stream ended without a reply'))
+        }
+      }
+      xhr.onerror = () => reject(new Error('Chat stream network error'))
+      xhr.send(JSON.stringify({ text }))
+    })
+  }
+
+  // The latest page of the conversation, oldest message first
+  async fetchHistory(pageSize = 50): Promise<ChatMessage[]> {
+    const res = await this.apiClient.api_chat_history_list({ queries: { page_size: pageSize } })
+    return [...res.results].reverse()
+  }
+
+  // Render status of a report chart, polled while it is pending
+  async chartStatus(chartId: string): Promise<ChartStatus> {
+    return this.apiClient.api_charts_retrieve({ params: { chart_id: chartId } })
   }
 }
 
 export const chatService = new ChatService()
+
+// Rendered charts are referenced by a path on the backend
+export function mediaUrl(url: string): string {
+  return url && url.startsWith('/') ? `${API_BASE_URL}${url}` : url
+}
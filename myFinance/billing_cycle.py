@@ -0,0 +1,70 @@
+import calendar
+import datetime
+
+from django.db.models import Case, DateField, IntegerField, Max, Min, Q, Value, When
+
+
+class BillingCycle:
+    """
+    Buckets transaction dates into the user's billing months.
+    A billing month starts on the day of the user's 'start_date' DateInput (day 1 if it is not set), a date before
+    that day belongs to the previous month.
+    """
+
+    def __init__(self, start_day=1):
+        self.start_day = start_day
+
+    @classmethod
+    def for_user(cls, user):
+        """loads the user cycle start day with a single query"""
+        from myFinance.models import DateInput
+        start_date = DateInput.objects.filter(name='start_date', user=user).values_list('date', flat=True).first()
+        return cls(start_date.day if start_date else 1)
+
+    def cycle(self, date):
+        """:returns (year, month) of the billing month that contains date"""
+        if date.day >= self.start_day:
+            return date.year, date.month
+        return (date.year - 1, 12) if date.month == 1 else (date.year, date.month - 1)
+
+    def month(self, date):
+        return self.cycle(date)[1]
+
+    def month_date(self, date):
+        year, month = self.cycle(date)
+        return datetime.date(year, month, min(self.start_day, calendar.monthrange(year, month)[1]))
+
+    def apply(self, transactions):
+        """sets month and month_date on transaction instances without touching the db"""
+        for transaction in transactions:
+            transaction.month = self.month(transaction.date)
+            transaction.month_date = self.month_date(transaction.date)
+        return transactions
+
+    def update_queryset(self, queryset):
+        """
+        recomputes month and month_date of all the transactions in queryset with a single UPDATE statement
+        :returns number of updated rows
+        """
+        bounds = queryset.aggregate(Min('date'), Max('date'))
+        if bounds['date__min'] is None:
+            return 0
+        year, month = self.cycle(bounds['date__min'])
+        last = self.cycle(bounds['date__max'])
+        month_whens, month_date_whens = [], []
+        while (year, month) <= last:
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            in_cycle = Q(date__gte=self._cycle_start(year, month), date__lt=self._cycle_start(next_year, next_month))
+            month_whens.append(When(in_cycle, then=Value(month)))
+            month_date_whens.append(
+                When(in_cycle, then=Value(datetime.date(year, month,
+                                                        min(self.start_day, calendar.monthrange(year, month)[1])))))
+            year, month = next_year, next_month
+        return queryset.update(month=Case(*month_whens, output_field=IntegerField()),
+                               month_date=Case(*month_date_whens, output_field=DateField()))
+
+    def _cycle_start(self, year, month):
+        """first date of the billing month, the first of the next month when the start day is not in this month"""
+        if self.start_day <= calendar.monthrange(year, month)[1]:
+            return datetime.date(year, month, self.start_day)
+        return datetime.date(year + 1, 1, 1) if month == 12 else datetime.date(year, month + 1, 1)
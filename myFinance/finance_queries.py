@@ -0,0 +1,383 @@
+"""Finance queries shared by the ADK tool modules."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from myFinance.models import Credential, Tag, TagGoal, Transaction
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAYS = {"week": 7, "month": 30, "quarter": 90, "year": 365}
+DEFAULT_PERIOD = "month"
+REPORT_TYPES = ("overview", "spending", "income", "net_worth")
+UNCATEGORIZED = "Uncategorized"
+
+
+class FinanceQueryService:
+    """Read and write operations on one user's finances for the ADK tools.
+
+    Reads are grouped aggregates with a fixed number of queries, and their
+    results are memoized in the cache per user, operation and arguments
+    (e.g. the period), so the same tool called again in a conversation costs
+    one cache lookup.  The memoized results of a user are dropped by
+    :meth:`invalidate`, called on every change of their transactions, tags,
+    goals or credentials, or after ``CHAT_CONTEXT_CACHE_TIMEOUT`` seconds.
+    The cache is the shared ``default`` backend, so an invalidation in the
+    celery worker applies to the web process as well.
+    Results are plain JSON-serializable dicts with a fixed key order.
+    """
+
+    def __init__(self, user_id, today: datetime.date | None = None) -> None:
+        self.user_id = int(user_id)
+        self.today = today or datetime.date.today()
+        # the date windows of the periods, relative to today
+        self.windows = {
+            period: (self.today - datetime.timedelta(days=days), self.today) for period, days in PERIOD_DAYS.items()
+        }
+
+    @classmethod
+    def version_key(cls, user_id: int) -> str:
+        return f"finance_queries:{user_id}:version"
+
+    @classmethod
+    def version(cls, user_id: int) -> str:
+        """Version of the user's data, replaced by :meth:`invalidate`; part of every memo key."""
+        return cache.get_or_set(cls.version_key(user_id), lambda: uuid.uuid4().hex, None)
+
+    @classmethod
+    def invalidate(cls, user_id: int) -> None:
+        """Drop the memoized results of the user."""
+        cache.delete(cls.version_key(user_id))
+
+    def window(self, period: str) -> tuple[datetime.date, datetime.date]:
+        return self.windows.get(period, self.windows[DEFAULT_PERIOD])
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def transactions(self, date_range: Optional[str] = None, category: Optional[str] = None,
+                     limit: int = 100) -> Dict:
+        """Latest ``limit`` transactions matching the filters and their totals.
+
+        ``date_range`` is a month (``2024-01``) or ``start:end`` ISO dates,
+        ``category`` matches the tag or the description.
+        """
+        return self._memo(("transactions", date_range, category, limit),
+                          lambda: self._load_transactions(date_range, category, limit))
+
+    def account_summary(self) -> Dict:
+        """Overall and last 30 days income and expenses, and the totals of every account."""
+        return self._memo(("account_summary",), self._load_account_summary)
+
+    def spending_analysis(self, period: str = DEFAULT_PERIOD) -> Dict:
+        """Expenses of the period per category, largest first."""
+        return self._memo(("spending_analysis", period), lambda: self._load_spending_analysis(period))
+
+    def goal_progress(self) -> Dict:
+        """Progress of every goal, from the positive transactions of its tag."""
+        return self._memo(("goal_progress",), self._load_goal_progress)
+
+    def report(self, report_type: str, period: str = DEFAULT_PERIOD) -> Dict:
+        """``overview``, ``spending``, ``income`` or ``net_worth`` report of the period."""
+        if report_type == "spending":
+            analysis = self.spending_analysis(period)
+            return {
+                'report_type': 'spending',
+                'period': period,
+                'date_range': analysis['date_range'],
+                'spending_by_category': analysis['spending_by_category'],
+                'total_spending': analysis['total_spending'],
+            }
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f'Report type "{report_type}" not implemented yet')
+        totals = self._memo(("period_totals", period), lambda: self._load_period_totals(period))
+        report = {'report_type': report_type, 'period': period, 'date_range': totals['date_range']}
+        if report_type == "income":
+            report['total_income'] = totals['income']
+        elif report_type == "net_worth":
+            report.update(income=totals['income'], expenses=totals['expenses'], net_change=totals['net_flow'])
+        else:
+            count = totals['transaction_count']
+            report.update(
+                income=totals['income'],
+                expenses=totals['expenses'],
+                net_flow=totals['net_flow'],
+                transaction_count=count,
+                average_transaction=totals['net_flow'] / count if count else 0,
+                generated_at=totals['generated_at'],
+            )
+        return report
+
+    # ------------------------------------------------------------------
+    # Writes, the model signals invalidate the memoized reads
+    # ------------------------------------------------------------------
+
+    def categorize(self, transaction_id, category: str) -> Dict:
+        """Set the tag named ``category`` on the transaction, creating the tag if needed."""
+        user = self._user()
+        transaction = Transaction.objects.select_related('tag').get(id=transaction_id, user=user)
+        tag, created = Tag.objects.get_or_create(
+            name=category,
+            user=user,
+            defaults={'expense': transaction.value < 0}
+        )
+        old_category = transaction.tag.name if transaction.tag else UNCATEGORIZED
+        transaction.tag = tag
+        transaction.save()
+        return {
+            'transaction': {
+                'id': transaction.id,
+                'description': transaction.name,
+                'amount': float(transaction.value),
+                'date': transaction.date.isoformat(),
+                'old_category': old_category,
+                'new_category': category,
+            },
+            'tag_info': {'tag_id': tag.id, 'tag_created': created},
+        }
+
+    def create_goal(self, goal_name: str, target_amount: float, category: Optional[str] = None,
+                    deadline: Optional[str] = None, goal_type: str = "savings") -> Dict:
+        """Create or update the goal of the ``category`` (or ``goal_name``) tag and return its progress."""
+        user = self._user()
+        tag, created = Tag.objects.get_or_create(
+            name=category or goal_name,
+            user=user,
+            defaults={'expense': goal_type == "expense_reduction"}
+        )
+        tag_goal, goal_created = TagGoal.objects.get_or_create(user=user, tag=tag, defaults={'value': target_amount})
+        if not goal_created:
+            tag_goal.value = target_amount
+            tag_goal.save()
+
+        tag_transactions = Transaction.objects.filter(user=user, tag=tag)
+        if goal_type == "savings":
+            current_amount = tag_transactions.filter(value__gt=0).aggregate(total=Sum('value'))['total'] or 0
+        elif goal_type == "expense_reduction":
+            current_amount = abs(tag_transactions.filter(value__lt=0).aggregate(total=Sum('value'))['total'] or 0)
+        else:
+            current_amount = tag_transactions.aggregate(total=Sum('value'))['total'] or 0
+        progress_percentage = (current_amount / target_amount * 100) if target_amount > 0 else 0
+        return {
+            'goal': {
+                'id': tag_goal.id,
+                'name': goal_name,
+                'target_amount': target_amount,
+                'current_amount': float(current_amount),
+                'progress_percentage': min(progress_percentage, 100),
+                'category': tag.name,
+                'type': goal_type,
+                'deadline': deadline,
+                'created': goal_created,
+            },
+            'tag_info': {'tag_id': tag.id, 'tag_created': created},
+        }
+
+    # ------------------------------------------------------------------
+    # Loaders
+    # ------------------------------------------------------------------
+
+    def _memo(self, key: tuple, loader: Callable[[], Dict]) -> Dict:
+        version = self.version(self.user_id)
+        # the arguments come from the model, hashed to a key any cache backend accepts
+        digest = hashlib.sha256(json.dumps(key, default=str).encode()).hexdigest()
+        cache_key = f"finance_queries:{self.user_id}:{version}:{self.today.isoformat()}:{key[0]}:{digest}"
+        result = cache.get(cache_key)
+        if result is None:
+            result = loader()
+            cache.set(cache_key, result, settings.CHAT_CONTEXT_CACHE_TIMEOUT)
+            logger.debug("Loaded %s for user %s", key[0], self.user_id)
+        return result
+
+    def _user(self):
+        # raises DoesNotExist for unknown ids, reported by the tools
+        return get_user_model().objects.get(id=self.user_id)
+
+    def _load_transactions(self, date_range: Optional[str], category: Optional[str], limit: int) -> Dict:
+        transactions = Transaction.objects.filter(user=self._user())
+        if date_range:
+            if ':' in date_range:
+                start_date, end_date = date_range.split(':')
+                transactions = transactions.filter(
+                    date__gte=datetime.date.fromisoformat(start_date),
+                    date__lte=datetime.date.fromisoformat(end_date)
+                )
+            else:
+                year, month = date_range.split('-')
+                transactions = transactions.filter(date__year=int(year), date__month=int(month))
+        if category:
+            transactions = transactions.filter(Q(tag__name__icontains=category) | Q(name__icontains=category))
+
+        totals = transactions.aggregate(
+            count=Count('id'),
+            income=Sum('value', filter=Q(value__gt=0)),
+            expenses=Sum('value', filter=Q(value__lt=0)),
+        )
+        income = float(totals['income'] or 0)
+        expenses = float(totals['expenses'] or 0)
+        rows = transactions.select_related('tag', 'credential').order_by('-date', '-id')[:limit]
+        data = [self._transaction_json(tx) for tx in rows]
+        return {
+            'transactions': data,
+            'summary': {
+                'total_count': totals['count'],
+                'showing': len(data),
+                'total_income': income,
+                'total_expenses': abs(expenses),
+                'net_flow': income + expenses,
+            },
+            'filters': {'date_range': date_range, 'category': category, 'limit': limit},
+        }
+
+    @staticmethod
+    def _transaction_json(tx: Transaction) -> Dict:
+        return {
+            'id': tx.id,
+            'date': tx.date.isoformat(),
+            'amount': float(tx.value),
+            'description': tx.name,
+            'category': tx.tag.name if tx.tag else UNCATEGORIZED,
+            'account': tx.credential.company if tx.credential else 'Unknown',
+            'is_income': tx.value > 0,
+        }
+
+    def _load_account_summary(self) -> Dict:
+        user = self._user()
+        recent = Q(date__gte=self.today - datetime.timedelta(days=30))
+        totals = Transaction.objects.filter(user=user).aggregate(
+            income=Sum('value', filter=Q(value__gt=0)),
+            expenses=Sum('value', filter=Q(value__lt=0)),
+            recent_income=Sum('value', filter=Q(value__gt=0) & recent),
+            recent_expenses=Sum('value', filter=Q(value__lt=0) & recent),
+        )
+        income, expenses, recent_income, recent_expenses = (
+            float(totals[name] or 0) for name in ('income', 'expenses', 'recent_income', 'recent_expenses')
+        )
+        user_transactions = Q(transaction__user=user)
+        credentials = Credential.objects.filter(user=user).annotate(
+            calculated_balance=Sum('transaction__value', filter=user_transactions),
+            transaction_count=Count('transaction', filter=user_transactions),
+        ).order_by('id')
+        accounts = [
+            {
+                'company': cred.company,
+                'type': cred.type,
+                'current_balance': cred.balance,
+                'calculated_balance': float(cred.calculated_balance or 0),
+                'last_scanned': cred.last_scanned.isoformat() if cred.last_scanned else None,
+                'transaction_count': cred.transaction_count,
+            }
+            for cred in credentials
+        ]
+        return {
+            'user_id': str(self.user_id),
+            'overview': {
+                'total_income': income,
+                'total_expenses': abs(expenses),
+                'net_worth': income + expenses,
+                'account_count': len(accounts),
+            },
+            'recent_activity': {
+                'monthly_income': recent_income,
+                'monthly_expenses': abs(recent_expenses),
+                'monthly_net': recent_income + recent_expenses,
+            },
+            'accounts': accounts,
+            'last_updated': timezone.now().isoformat(),
+        }
+
+    def _load_spending_analysis(self, period: str) -> Dict:
+        start, end = self.window(period)
+        rows = (
+            Transaction.objects.filter(user=self._user(), date__gte=start, date__lte=end, value__lt=0)
+            .values('tag__name').annotate(total=Sum('value'), count=Count('id')).order_by()
+        )
+        spending_by_category: Dict[str, float] = {}
+        count_by_category: Dict[str, int] = {}
+        for row in rows:
+            category = row['tag__name'] or UNCATEGORIZED
+            spending_by_category[category] = spending_by_category.get(category, 0) + abs(float(row['total']))
+            count_by_category[category] = count_by_category.get(category, 0) + row['count']
+
+        # largest first, ties by name, so the projection does not depend on the database order
+        sorted_categories: List = sorted(spending_by_category.items(), key=lambda item: (-item[1], item[0]))
+        total_spending = sum(spending_by_category.values())
+        transaction_count = sum(count_by_category.values())
+        return {
+            'period': period,
+            'date_range': f"{start} to {end}",
+            'total_spending': total_spending,
+            'transaction_count': transaction_count,
+            'average_transaction': total_spending / transaction_count if transaction_count else 0,
+            'spending_by_category': dict(sorted_categories),
+            'transaction_count_by_category': {name: count_by_category[name] for name, _ in sorted_categories},
+            'top_categories': [list(item) for item in sorted_categories[:5]],
+            'insights': {
+                'largest_category': list(sorted_categories[0]) if sorted_categories else None,
+                'categories_count': len(spending_by_category),
+                'daily_average': total_spending / (end - start).days,
+            },
+        }
+
+    def _load_goal_progress(self) -> Dict:
+        user = self._user()
+        # Assume positive goals (savings) - could be enhanced based on goal type
+        tag_transactions = Q(tag__transaction__user=user)
+        goals = TagGoal.objects.filter(user=user).select_related('tag').annotate(
+            current_amount=Sum('tag__transaction__value', filter=tag_transactions & Q(tag__transaction__value__gt=0)),
+            transaction_count=Count('tag__transaction', filter=tag_transactions),
+        ).order_by('id')
+        goal_progress = []
+        for goal in goals:
+            current_amount = float(goal.current_amount or 0)
+            goal_progress.append({
+                'goal_id': goal.id,
+                'category': goal.tag.name if goal.tag else None,
+                'target_amount': float(goal.value),
+                'current_amount': current_amount,
+                'progress_percentage': min(current_amount / goal.value * 100, 100) if goal.value > 0 else 0,
+                'remaining_amount': max(float(goal.value) - current_amount, 0),
+                'is_completed': current_amount >= goal.value,
+                'transaction_count': goal.transaction_count,
+            })
+        return {
+            'user_id': str(self.user_id),
+            'goals': goal_progress,
+            'summary': {
+                'total_goals': len(goal_progress),
+                'completed_goals': sum(1 for goal in goal_progress if goal['is_completed']),
+                'total_target': sum(goal['target_amount'] for goal in goal_progress),
+                'total_achieved': sum(goal['current_amount'] for goal in goal_progress),
+            },
+        }
+
+    def _load_period_totals(self, period: str) -> Dict:
+        start, end = self.window(period)
+        totals = Transaction.objects.filter(user=self._user(), date__gte=start, date__lte=end).aggregate(
+            count=Count('id'),
+            income=Sum('value', filter=Q(value__gt=0)),
+            expenses=Sum('value', filter=Q(value__lt=0)),
+        )
+        income = float(totals['income'] or 0)
+        expenses = float(totals['expenses'] or 0)
+        return {
+            'date_range': f"{start} to {end}",
+            'income': income,
+            'expenses': abs(expenses),
+            'net_flow': income + expenses,
+            'transaction_count': totals['count'],
+            'generated_at': timezone.now().isoformat(),
+        }
@@ -0,0 +1,118 @@
+"""Lazy, cached financial context handed to the agents."""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from typing import Callable, Dict, List
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+
+from myFinance.models import TagGoal, Transaction, TransactionNameTag
+
+logger = logging.getLogger(__name__)
+
+
+class FinancialContext:
+    """Financial data of one user for the agents.
+
+    Every part is loaded on first use only, so a message routed to an agent
+    that does not read the data costs no queries.  Transactions are limited
+    to the last ``CHAT_CONTEXT_MONTHS`` months and at most
+    ``CHAT_CONTEXT_MAX_TRANSACTIONS`` rows, so the cost does not grow with
+    the user's history.  Loaded parts are cached per user until
+    :meth:`invalidate` is called for the user (on every change of their
+    transactions, categories or goals) or ``CHAT_CONTEXT_CACHE_TIMEOUT``
+    seconds passed.
+    """
+
+    PARTS = ("transactions", "category_map", "budget_targets")
+
+    def __init__(
+        self,
+        user,
+        *,
+        months: int | None = None,
+        max_transactions: int | None = None,
+        today: datetime.date | None = None,
+    ) -> None:
+        self.user = user
+        self.months = months or settings.CHAT_CONTEXT_MONTHS
+        self.max_transactions = max_transactions or settings.CHAT_CONTEXT_MAX_TRANSACTIONS
+        self.today = today or datetime.date.today()
+        self._loaded: Dict[str, object] = {}
+
+    @classmethod
+    def cache_key(cls, user_id: int, part: str) -> str:
+        return f"financial_context:{user_id}:{part}"
+
+    @classmethod
+    def invalidate(cls, user_id: int) -> None:
+        """Drop the cached context of the user."""
+        cache.delete_many([cls.cache_key(user_id, part) for part in cls.PARTS])
+
+    def transactions(self) -> List[Dict]:
+        """Return the serialized transactions of the relevance window."""
+        return self._get("transactions", self._load_transactions)
+
+    def category_map(self) -> Dict[str, str]:
+        """Return mapping of merchant/description to category."""
+        return self._get("category_map", self._load_category_map)
+
+    def budget_targets(self) -> Dict[str, float]:
+        """Return budget target values per tag name."""
+        return self._get("budget_targets", self._load_budget_targets)
+
+    def as_tuple(self) -> tuple[List[Dict], Dict[str, str], Dict[str, float]]:
+        return self.transactions(), self.category_map(), self.budget_targets()
+
+    # ------------------------------------------------------------------
+    # Loaders
+    # ------------------------------------------------------------------
+
+    def _get(self, part: str, loader: Callable[[], object]):
+        if part not in self._loaded:
+            key = self.cache_key(self.user.pk, part)
+            value = cache.get(key)
+            if value is None or value[0] != self._window():
+                value = (self._window(), loader())
+                cache.set(key, value, settings.CHAT_CONTEXT_CACHE_TIMEOUT)
+                logger.debug("Loaded %s context for user %s", part, self.user.pk)
+            self._loaded[part] = value[1]
+        return self._loaded[part]
+
+    def _window(self) -> tuple:
+        return self.today, self.months, self.max_transactions
+
+    def _load_transactions(self) -> List[Dict]:
+        start = self.today.replace(day=1) - relativedelta(months=self.months - 1)
+        rows = (
+            Transaction.objects.filter(user=self.user, date__gte=start, date__lte=self.today)
+            .order_by("-date", "-id")
+            .values_list("id", "date", "name", "value", "credential_id", "tag__name")[: self.max_transactions]
+        )
+        return [
+            {
+                "transaction_id": str(pk),
+                "date": date.isoformat(),
+                "description": name,
+                "amount": value,
+                "currency": "ILS",
+                "account_id": str(credential_id or "0"),
+                "category": tag_name,
+                "tags": [tag_name] if tag_name else [],
+            }
+            for pk, date, name, value, credential_id, tag_name in reversed(list(rows))
+        ]
+
+    def _load_category_map(self) -> Dict[str, str]:
+        return dict(
+            TransactionNameTag.objects.filter(user=self.user, tag__isnull=False).values_list(
+                "transaction_name", "tag__name"
+            )
+        )
+
+    def _load_budget_targets(self) -> Dict[str, float]:
+        return dict(TagGoal.objects.filter(user=self.user).values_list("tag__name", "value"))
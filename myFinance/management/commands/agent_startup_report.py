@@ -0,0 +1,25 @@
+import importlib
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Time the import of the ADK agent module and the build of every agent"
+
+    def handle(self, *args, **options):
+        imported = 'agents_adk.agent' in sys.modules
+        start = time.perf_counter()
+        agent_module = importlib.import_module('agents_adk.agent')
+        import_ms = (time.perf_counter() - start) * 1000
+        registry = agent_module.agent_registry
+        built = [name for name in registry.names() if registry.is_built(name)]
+        self.stdout.write('import agents_adk.agent: {:.1f} ms{}, agents built at import: {}'.format(
+            import_ms, ' (already imported)' if imported else '', len(built)))
+
+        start = time.perf_counter()
+        root = registry.get('orchestrator')
+        self.stdout.write('root agent {} with {} sub agents built in {:.1f} ms'.format(
+            root.name, len(root.sub_agents), (time.perf_counter() - start) * 1000))
+        self.stdout.write(registry.report())
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from myFinance.billing_cycle import BillingCycle
+from myFinance.models import MonthlyTagTotal, Transaction
+
+
+class Command(BaseCommand):
+    help = "Recompute month and month_date of the users transactions from their billing cycle start day"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, help="username")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(transaction__isnull=False).distinct()
+        if options.get('username'):
+            users = users.filter(username=options.get('username'))
+        for user in users:
+            updated = BillingCycle.for_user(user).update_queryset(Transaction.objects.filter(user=user))
+            MonthlyTagTotal.rebuild(user)
+            self.stdout.write('user {}: updated {} transactions'.format(user.username, updated))
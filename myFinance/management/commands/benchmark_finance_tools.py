@@ -0,0 +1,84 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from myFinance.finance_queries import FinanceQueryService
+from myFinance.models import Credential, Tag, TagGoal, Transaction
+
+
+class QueryCounter:
+    """execute wrapper collecting the sql of every query, unlike CaptureQueriesContext it is not capped"""
+
+    def __init__(self, queries):
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Time the ADK finance tools on a generated user, the data is rolled back afterwards"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=100000, help="transactions of the generated user")
+        parser.add_argument('--tags', type=int, default=40, help="tags of the generated user")
+        parser.add_argument('--credentials', type=int, default=5, help="credentials of the generated user")
+        parser.add_argument('--repeat', type=int, default=5, help="runs per tool and mode, the best one is reported")
+
+    def handle(self, *args, **options):
+        from agents_adk.tools import finance_tools
+
+        tools = [
+            ('get_spending_analysis', lambda user_id: finance_tools.get_spending_analysis(user_id, period="year")),
+            ('get_user_account_summary', finance_tools.get_user_account_summary),
+            ('get_goal_progress', finance_tools.get_goal_progress),
+        ]
+        with transaction.atomic():
+            user = self.create_user(options)
+            self.stdout.write('{:<28}{:>10}{:>10}{:>10}'.format('tool', 'cold ms', 'queries', 'warm ms'))
+            for name, tool in tools:
+                # cold: the memoized results are dropped before every run, warm: served from the cache
+                cold, queries = self.measure(tool, user.id, options['repeat'], invalidate=True)
+                warm, _ = self.measure(tool, user.id, options['repeat'], invalidate=False)
+                self.stdout.write('{:<28}{:>10.1f}{:>10}{:>10.2f}'.format(name, cold * 1000, queries, warm * 1000))
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(tool, user_id, repeat, invalidate):
+        """best time of ``repeat`` runs and the queries of a run"""
+        best = None
+        for _ in range(repeat):
+            if invalidate:
+                FinanceQueryService.invalidate(user_id)
+            queries = []
+            with connection.execute_wrapper(QueryCounter(queries)):
+                start = time.perf_counter()
+                tool(user_id)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(queries)
+
+    def create_user(self, options):
+        rnd = random.Random(0)
+        user = User.objects.create_user(username='benchmark-{}'.format(time.time_ns()))
+        credentials = [Credential.objects.create(user=user, company=Credential.CAL)
+                       for _ in range(options['credentials'])]
+        tags = [Tag.objects.create(user=user, name='tag {}'.format(i), key='tag{}'.format(i), expense=i % 4 != 0)
+                for i in range(options['tags'])]
+        for tag in tags[::4]:
+            TagGoal.objects.create(user=user, tag=tag, value=10000)
+        today = datetime.date.today()
+        Transaction.objects.bulk_create(
+            [Transaction(user=user, credential=rnd.choice(credentials), name='transaction {}'.format(i),
+                         date=today - datetime.timedelta(days=rnd.randrange(730)),
+                         value=round(rnd.uniform(-500, 300), 2), tag=rnd.choice(tags + [None]))
+             for i in range(options['transactions'])],
+            batch_size=5000,
+        )
+        self.stdout.write('generated {} transactions'.format(options['transactions']))
+        return user
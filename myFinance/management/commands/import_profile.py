@@ -0,0 +1,108 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROJECT = 'project'
+THIRD_PARTY = 'third-party'
+STDLIB = 'stdlib'
+
+# run in a fresh interpreter, prints the wall time of every step as json on the last line
+SCRIPT = '''
+import importlib, json, sys, time
+steps = []
+start = time.perf_counter()
+import django
+django.setup()
+steps.append(["django.setup()", time.perf_counter() - start])
+for target in sys.argv[1:]:
+    start = time.perf_counter()
+    importlib.import_module(target)
+    steps.append(["import " + target, time.perf_counter() - start])
+print(json.dumps(steps))
+'''
+
+
+def parse_importtime(output):
+    """``(module, self us, cumulative us)`` of every line of ``python -X importtime``"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        modules.append((module.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def package_kind(package, base_dir=None):
+    """whether the top level ``package`` is part of the project, a third party package or the stdlib"""
+    if package in sys.stdlib_module_names or package in sys.builtin_module_names:
+        return STDLIB
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        spec = None
+    locations = list(spec.submodule_search_locations or []) if spec else []
+    if spec and spec.origin:
+        locations.append(spec.origin)
+    base_dir = os.path.realpath(base_dir or settings.BASE_DIR)
+    if any(os.path.realpath(location).startswith(base_dir + os.sep) for location in locations):
+        return PROJECT
+    return THIRD_PARTY
+
+
+def attribute(modules):
+    """self time and module count per top level package, slowest first"""
+    packages = defaultdict(lambda: [0, 0])
+    for module, self_us, _ in modules:
+        package = packages[module.split('.')[0]]
+        package[0] += self_us
+        package[1] += 1
+    return sorted(((name, self_us, count) for name, (self_us, count) in packages.items()), key=lambda item: -item[1])
+
+
+class Command(BaseCommand):
+    help = ("Import time per module of a cold start (django.setup() and the given modules), "
+            "like python -X importtime but attributed to the project apps and packages")
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='*', default=['finance.celery_app'],
+                            help="modules imported after django.setup(), finance.celery_app by default")
+        parser.add_argument('--top', type=int, default=15, help="packages and modules listed")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'finance.settings'))
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT, *options['targets']],
+                                capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode:
+            raise CommandError('import failed:\n{}'.format(result.stderr[-2000:]))
+        steps = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = parse_importtime(result.stderr)
+
+        for step, seconds in steps:
+            self.stdout.write('{:<40}{:>10.1f} ms'.format(step, seconds * 1000))
+        self.stdout.write('{} modules imported, {:.1f} ms'.format(
+            len(modules), sum(self_us for _, self_us, _ in modules) / 1000))
+
+        packages = attribute(modules)
+        kinds = defaultdict(int)
+        for name, self_us, _ in packages:
+            kinds[package_kind(name)] += self_us
+        self.stdout.write('')
+        for kind, self_us in sorted(kinds.items(), key=lambda item: -item[1]):
+            self.stdout.write('{:<40}{:>10.1f} ms'.format(kind, self_us / 1000))
+
+        self.stdout.write('')
+        self.stdout.write('{:<28}{:<12}{:>10}{:>10}'.format('package', 'kind', 'self ms', 'modules'))
+        for name, self_us, count in packages[:options['top']]:
+            self.stdout.write('{:<28}{:<12}{:>10.1f}{:>10}'.format(name, package_kind(name), self_us / 1000, count))
+
+        self.stdout.write('')
+        self.stdout.write('{:<60}{:>10}{:>10}'.format('module', 'self ms', 'cumul ms'))
+        for module, self_us, cumulative_us in sorted(modules, key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write('{:<60}{:>10.1f}{:>10.1f}'.format(module, self_us / 1000, cumulative_us / 1000))
@@ -4,7 +4,7 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 
 from finance import settings
-from finance.celery_app import load_transactions_by_credential
+from finance.scraping import ScrapeRun, scrape_window
 # from sort_transactions import main
 from myFinance import models
 
@@ -21,21 +21,24 @@ class Command(BaseCommand):
             filter_options["user__username"] = options.get("username")
         if options.get("credential_id"):
             filter_options["id"] = options.get("credential_id")
-        for credential in models.Credential.objects.filter(**filter_options):
+        jobs = []
+        for credential in models.Credential.objects.filter(**filter_options).select_related('user'):
             start, end = self.get_date_range(options, credential)
-            load_transactions_by_credential(start=start, end=end, credential_id=credential.id)
-
-            # load_transactions_by_credential.apply_async(
-            #
-            #     **{'start': start.strftime(settings.DEFAULT_TIME_FORMAT) if start else None,
-            #        'end': end.strftime(settings.DEFAULT_TIME_FORMAT) if end else None, 'credential_id': credential.id},
-            # )
+            jobs.append((credential, start, end))
+        run = ScrapeRun(max_workers=options.get('workers'), per_company=options.get('per_company'))
+        run.run(jobs)
+        self.stdout.write(run.format_summary())
 
     def add_arguments(self, parser):
         parser.add_argument('--start', type=str, help="start date")
         parser.add_argument('--end', type=str, help="end date")
         parser.add_argument('--username', type=str, help="username")
         parser.add_argument('--credential_id', type=int, help="credential id")
+        parser.add_argument('--full', action='store_true',
+                            help="ignore last_scanned and resync SCRAPE_FULL_RESYNC_MONTHS months")
+        parser.add_argument('--overlap', type=int, help="days before last_scanned to scan again")
+        parser.add_argument('--workers', type=int, help="credentials scraped at once")
+        parser.add_argument('--per_company', type=int, help="credentials of the same company scraped at once")
 
     def get_date_range(self, options, credential):
         start = datetime.datetime.strptime(options.get("start"), '%Y-%m-%d') if options.get("start") else None
@@ -45,8 +48,5 @@ class Command(BaseCommand):
             end = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
         if not start:
-            # start = credential.last_scanned + datetime.timedelta(
-            #     days=1) if credential.last_scanned else models.DateInput.objects.get(name='last_scanned',
-            #                                                                          user=credential.user, ).date
-            start = end.replace(day=1)
+            start, end = scrape_window(credential, end, full=options.get('full'), overlap_days=options.get('overlap'))
         return start, end
@@ -0,0 +1,17 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from myFinance.models import MonthlyTagTotal
+
+
+class Command(BaseCommand):
+    help = "Recompute the MonthlyTagTotal rollup from the transactions table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', type=str, help="username, all users when omitted")
+
+    def handle(self, *args, **options):
+        user = User.objects.get(username=options['username']) if options.get('username') else None
+        MonthlyTagTotal.rebuild(user)
+        totals = MonthlyTagTotal.objects.filter(user=user) if user else MonthlyTagTotal.objects.all()
+        self.stdout.write('rebuilt {} monthly totals'.format(totals.count()))
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+
+def build_monthly_totals(apps, schema_editor):
+    Transaction = apps.get_model('myFinance', 'Transaction')
+    MonthlyTagTotal = apps.get_model('myFinance', 'MonthlyTagTotal')
+    rows = Transaction.objects.exclude(month_date=None).values('user_id', 'month_date', 'tag_id').annotate(
+        Sum('value'), Count('id'))
+    MonthlyTagTotal.objects.bulk_create([
+        MonthlyTagTotal(user_id=row['user_id'], month_date=row['month_date'], tag_id=row['tag_id'],
+                        value=row['value__sum'], count=row['id__count']) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('myFinance', '0043_auto_20250525_0616'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyTagTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month_date', models.DateField()),
+                ('value', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('tag', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='myFinance.tag')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'month_date', 'tag')},
+            },
+        ),
+        migrations.RunPython(build_monthly_totals, migrations.RunPython.noop),
+    ]
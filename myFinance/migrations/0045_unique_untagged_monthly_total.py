@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def merge_untagged_totals(apps, schema_editor):
+    MonthlyTagTotal = apps.get_model('myFinance', 'MonthlyTagTotal')
+    duplicates = MonthlyTagTotal.objects.filter(tag=None).values('user_id', 'month_date').annotate(
+        Count('id'), Sum('value'), Sum('count')).filter(id__count__gt=1)
+    for row in duplicates:
+        rows = MonthlyTagTotal.objects.filter(tag=None, user_id=row['user_id'], month_date=row['month_date'])
+        keep = rows.order_by('id').first()
+        rows.exclude(id=keep.id).delete()
+        MonthlyTagTotal.objects.filter(id=keep.id).update(value=row['value__sum'], count=row['count__sum'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myFinance', '0044_monthlytagtotal'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_untagged_totals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='monthlytagtotal',
+            constraint=models.UniqueConstraint(condition=Q(tag=None), fields=('user', 'month_date'),
+                                               name='unique_untagged_monthly_total'),
+        ),
+    ]
@@ -1,13 +1,15 @@
-import datetime
 import json
 import random
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django_kms.fields import KMSEncryptedCharField
 
+from myFinance.billing_cycle import BillingCycle
+
 
 def get_code(self):
     return str(self.additionalinfo_set.first().value['user_code'])
@@ -134,40 +136,45 @@ class Transaction(models.Model):
     month_date = models.DateField(null=True)
     bank = models.BooleanField(default=False)
     identifier = models.CharField(max_length=64, null=True)
-    __original_tag = None
+    __original_tag_id = None
+    __original_total_key = None
+    __original_value = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.__original_tag = self.tag
+        self.__original_tag_id = self.tag_id
+        self.__original_total_key = self.total_key
+        self.__original_value = self.value
+
+    @property
+    def total_key(self):
+        """the MonthlyTagTotal row this transaction is counted in"""
+        return self.user_id, self.month_date, self.tag_id
 
     def get_month(self):
-        start_date_input = DateInput.objects.filter(name="start_date", user=self.user)
-        if not start_date_input.exists():
-            return self.date.month
-        start_date = start_date_input.first().date
-        if self.date.day >= start_date.day:
-            return self.date.month
-        else:
-            return 12 if self.date.month == 1 else self.date.month - 1
+        return BillingCycle.for_user(self.user).month(self.date)
 
     def get_month_date(self):
-        start_date_input = DateInput.objects.filter(name="start_date", user=self.user)
-        if not start_date_input.exists():
-            return self.date.month
-        start_date = start_date_input.first().date
-        if self.date.day < start_date.day:
-            return (self.date - datetime.timedelta(days=start_date.day)).replace(day=start_date.day)
-        else:
-            return self.date.replace(day=start_date.day)
+        return BillingCycle.for_user(self.user).month_date(self.date)
 
-    def save(self, *args, **kwargs):
-        self.month = self.get_month()
-        self.month_date = self.get_month_date()
-        if self._state.adding or self.tag != self.__original_tag:  # only when new instance or tag changed
+    def save(self, *args, billing_cycle=None, **kwargs):
+        (billing_cycle or BillingCycle.for_user(self.user)).apply([self])
+        adding = self._state.adding
+        if adding or self.tag_id != self.__original_tag_id:  # only when new instance or tag changed
             TransactionNameTag.objects.update_or_create(user=self.user, transaction_name=self.name,
                                                         defaults={'tag': self.tag})
-        self.__original_tag = self.tag
-        return super(Transaction, self).save(*args, **kwargs)
+        with transaction.atomic():
+            result = super(Transaction, self).save(*args, **kwargs)
+            value = float(self.value)
+            if adding:
+                MonthlyTagTotal.add(*self.total_key, value, 1)
+            elif self.total_key != self.__original_total_key or value != self.__original_value:
+                MonthlyTagTotal.add(*self.__original_total_key, -self.__original_value, -1)
+                MonthlyTagTotal.add(*self.total_key, value, 1)
+        self.__original_tag_id = self.tag_id
+        self.__original_total_key = self.total_key
+        self.__original_value = value
+        return result
 
 
 class RecurringTransaction(models.Model):
@@ -192,6 +199,94 @@ class TransactionNameTag(models.Model):
         return trnt.tag if trnt else None
 
 
+# rollup keys written per update statement, bounds the size of its CASE
+TOTALS_BATCH_SIZE = 500
+
+
+class MonthlyTagTotal(models.Model):
+    """
+    Rollup of the transactions value and count per (user, month_date, tag).
+    Kept current by Transaction.save and the transaction delete/bulk ingestion paths, rebuild() recomputes it.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True)
+    month_date = models.DateField()
+    tag = models.ForeignKey(Tag, null=True, on_delete=models.CASCADE)
+    value = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'month_date', 'tag')
+        constraints = [
+            # null tags are not unique in unique_together, a second untagged row would be counted twice
+            models.UniqueConstraint(fields=['user', 'month_date'], condition=Q(tag=None),
+                                    name='unique_untagged_monthly_total'),
+        ]
+
+    @classmethod
+    def add(cls, user_id, month_date, tag_id, value, count):
+        """adds value and count to a single row, creates the row if needed"""
+        cls.apply({(user_id, month_date, tag_id): (value, count)})
+
+    @classmethod
+    def add_transactions(cls, transactions, sign=1):
+        """adds (or removes with sign=-1) a batch of transactions with a fixed number of queries per batch"""
+        totals = {}
+        for t in transactions:
+            value, count = totals.get(t.total_key, (0, 0))
+            totals[t.total_key] = (value + float(t.value), count + 1)
+        cls.apply({key: (sign * value, sign * count) for key, (value, count) in totals.items()})
+
+    @classmethod
+    def apply(cls, totals):
+        """
+        adds {(user_id, month_date, tag_id): (value, count)} to the rollup with a fixed number of queries per
+        TOTALS_BATCH_SIZE keys: an insert of the missing rows, one CASE update and, when removing, a delete of the
+        emptied rows
+        """
+        totals = {key: delta for key, delta in totals.items() if key[1] is not None}
+        keys = list(totals)
+        for i in range(0, len(keys), TOTALS_BATCH_SIZE):
+            cls._apply_batch({key: totals[key] for key in keys[i:i + TOTALS_BATCH_SIZE]})
+
+    @classmethod
+    def _apply_batch(cls, totals):
+        # nothing to remove from missing rows (e.g. rows already deleted with the user)
+        added = [key for key, (_, count) in totals.items() if count > 0]
+        if added:
+            # created empty and filled by the update, existing rows and rows created concurrently are skipped
+            cls.objects.bulk_create([cls(user_id=user_id, month_date=month_date, tag_id=tag_id)
+                                     for user_id, month_date, tag_id in added], ignore_conflicts=True)
+
+        conditions = [(Q(user_id=user_id, month_date=month_date, tag_id=tag_id), totals[user_id, month_date, tag_id])
+                      for user_id, month_date, tag_id in totals]
+        tags = Q(tag_id__in={key[2] for key in totals if key[2] is not None})
+        if any(key[2] is None for key in totals):
+            tags |= Q(tag=None)
+        rows = cls.objects.filter(tags, user_id__in={key[0] for key in totals}, month_date__in={key[1] for key in totals})
+        rows.update(
+            value=Case(*[When(condition, then=F('value') + Value(value)) for condition, (value, _) in conditions],
+                       default=F('value'), output_field=models.FloatField()),
+            count=Case(*[When(condition, then=F('count') + Value(count)) for condition, (_, count) in conditions],
+                       default=F('count'), output_field=models.IntegerField()))
+        if any(count < 0 for _, count in totals.values()):
+            rows.filter(count__lte=0).delete()
+
+    @classmethod
+    def rebuild(cls, user=None):
+        """recomputes the rollup from the transactions table, for all users if user is None"""
+        transactions = Transaction.objects.exclude(month_date=None)
+        totals = cls.objects.all()
+        if user is not None:
+            transactions = transactions.filter(user=user)
+            totals = totals.filter(user=user)
+        with transaction.atomic():
+            totals.delete()
+            rows = transactions.values('user_id', 'month_date', 'tag_id').annotate(Sum('value'), Count('id'))
+            cls.objects.bulk_create([cls(user_id=row['user_id'], month_date=row['month_date'], tag_id=row['tag_id'],
+                                         value=row['value__sum'], count=row['id__count']) for row in rows],
+                                    batch_size=500)
+
+
 class Plan(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True)
     tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
@@ -221,6 +316,54 @@ def create_user_info(sender, instance, created, **kwargs):
 post_save.connect(create_user_info, sender=User)
 
 
+def update_transactions_month_date(sender, instance, **kwargs):
+    if instance.name == 'start_date':
+        BillingCycle(instance.date.day).update_queryset(Transaction.objects.filter(user=instance.user))
+        MonthlyTagTotal.rebuild(instance.user)
+
+
+post_save.connect(update_transactions_month_date, sender=DateInput)
+
+
+def remove_transaction_from_totals(sender, instance, **kwargs):
+    MonthlyTagTotal.add(*instance.total_key, -float(instance.value), -1)
+
+
+post_delete.connect(remove_transaction_from_totals, sender=Transaction)
+
+
+def move_tag_totals_to_untagged(sender, instance, **kwargs):
+    # the tag transactions are set to null, merge their totals into the untagged rows instead of cascading them away
+    rows = MonthlyTagTotal.objects.filter(tag=instance)
+    MonthlyTagTotal.apply({(user_id, month_date, None): (value, count)
+                           for user_id, month_date, value, count in rows.values_list('user_id', 'month_date',
+                                                                                     'value', 'count')})
+    rows.delete()
+
+
+pre_delete.connect(move_tag_totals_to_untagged, sender=Tag)
+
+
+def invalidate_financial_context(sender, instance, **kwargs):
+    from myFinance.financial_context import FinancialContext
+    FinancialContext.invalidate(instance.user_id)
+
+
+for model in (Transaction, TransactionNameTag, TagGoal, Tag):
+    post_save.connect(invalidate_financial_context, sender=model)
+    post_delete.connect(invalidate_financial_context, sender=model)
+
+
+def invalidate_finance_queries(sender, instance, **kwargs):
+    from myFinance.finance_queries import FinanceQueryService
+    FinanceQueryService.invalidate(instance.user_id)
+
+
+for model in (Transaction, TagGoal, Tag, Credential):
+    post_save.connect(invalidate_finance_queries, sender=model)
+    post_delete.connect(invalidate_finance_queries, sender=model)
+
+
 class DiscountCredential(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True)
     password = KMSEncryptedCharField(key_id="7388ca30-4279-45cc-a05e-f05f9fb7d4af")
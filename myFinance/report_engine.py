@@ -0,0 +1,183 @@
+"""Report calculations over the MonthlyTagTotal rollup."""
+
+from __future__ import annotations
+
+import datetime
+from functools import cached_property
+from typing import Dict, List
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from myFinance.billing_cycle import BillingCycle
+from myFinance.models import MonthlyTagTotal
+
+
+class MonthlyRollup:
+    """Dense ``(tag, month)`` matrix of a user's rollup rows.
+
+    Missing months are zeros, so every series of the window has the same
+    length and the reports are whole-array operations.  Values keep the
+    transactions sign: expenses are positive, income negative.
+    """
+
+    def __init__(self, months: np.ndarray, tag_ids: List, names: List[str], expense: np.ndarray, values: np.ndarray):
+        self.months = months
+        self.tag_ids = tag_ids
+        self.names = names
+        self.expense = expense
+        self.values = values
+
+    @classmethod
+    def load(cls, user, start: datetime.date, end: datetime.date) -> "MonthlyRollup":
+        """Read the rows of the months ``start`` to ``end`` (inclusive) in one query."""
+        first = np.datetime64(start, "M")
+        months = np.arange(first, np.datetime64(end, "M") + 1)
+        rows = list(
+            MonthlyTagTotal.objects.filter(
+                user=user, month_date__gte=start.replace(day=1), month_date__lt=end.replace(day=1) + relativedelta(months=1)
+            ).values_list("month_date", "tag_id", "tag__name", "tag__expense", "value")
+        )
+        tag_index: Dict = {}
+        names, expense = [], []
+        for _, tag_id, name, is_expense, _ in rows:
+            if tag_id not in tag_index:
+                tag_index[tag_id] = len(tag_index)
+                names.append(name or "Other")
+                # untagged rows count as expenses, like expenses_monthly_totals
+                expense.append(is_expense is not False)
+        values = np.zeros((len(tag_index), len(months)))
+        if rows:
+            month_dates, tag_ids, _, _, amounts = zip(*rows)
+            month_index = (np.array(month_dates, dtype="datetime64[M]") - first).astype(int)
+            np.add.at(values, ([tag_index[tag_id] for tag_id in tag_ids], month_index), amounts)
+        return cls(months, list(tag_index), names, np.array(expense, dtype=bool), values)
+
+    @property
+    def labels(self) -> List[str]:
+        return [str(month) for month in self.months]
+
+    @property
+    def expenses(self) -> np.ndarray:
+        return self.values[self.expense]
+
+    @property
+    def expense_names(self) -> List[str]:
+        return [name for name, is_expense in zip(self.names, self.expense) if is_expense]
+
+
+class ReportEngine:
+    """Category, trend and debt reports of one user for the ReportingAgent.
+
+    All reports are computed from the monthly rollup of the last ``months``
+    billing months, loaded on first use with a single query, so the cost does
+    not depend on the number of transactions.  The window ends at the billing
+    month containing ``today``; ``cycle`` is the user's
+    :class:`~myFinance.billing_cycle.BillingCycle`, loaded when not passed.
+    """
+
+    def __init__(self, user, months: int = 12, today: datetime.date | None = None,
+                 cycle: BillingCycle | None = None) -> None:
+        self.user = user
+        self.months = months
+        self.today = today or datetime.date.today()
+        if cycle is not None:
+            self.cycle = cycle
+
+    @cached_property
+    def cycle(self) -> BillingCycle:
+        return BillingCycle.for_user(self.user)
+
+    @cached_property
+    def rollup(self) -> MonthlyRollup:
+        # month_date is the start of the billing month, which is the previous calendar month before the start day
+        end = self.cycle.month_date(self.today)
+        return MonthlyRollup.load(self.user, end - relativedelta(months=self.months - 1), end)
+
+    def has_data(self) -> bool:
+        return bool(self.rollup.values.any())
+
+    def category_breakdown(self, last_months: int | None = None) -> Dict:
+        """Expenses per category over the window (or its ``last_months``), largest first."""
+        expenses = self.rollup.expenses
+        totals = expenses[:, -last_months:].sum(axis=1) if last_months else expenses.sum(axis=1)
+        order = np.argsort(-totals, kind="stable")
+        order = order[totals[order] > 0]
+        total = totals[order].sum()
+        names = self.rollup.expense_names
+        return {
+            "labels": [names[i] for i in order],
+            "values": np.round(totals[order], 2).tolist(),
+            "shares": np.round(totals[order] / total, 4).tolist() if total else [],
+            "total": round(float(total), 2),
+        }
+
+    def month_over_month(self) -> Dict:
+        """Expense change per category between the last two months, largest change first."""
+        expenses = self.rollup.expenses
+        if expenses.shape[1] < 2:
+            return {"month": self.rollup.labels[-1], "labels": [], "current": [], "previous": [], "delta": [],
+                    "percent": []}
+        current, previous = expenses[:, -1], expenses[:, -2]
+        delta = current - previous
+        percent = np.divide(delta * 100, previous, out=np.full_like(delta, np.nan), where=previous != 0)
+        order = np.argsort(-np.abs(delta), kind="stable")
+        order = order[np.abs(delta[order]) > 0]
+        names = self.rollup.expense_names
+        return {
+            "month": self.rollup.labels[-1],
+            "labels": [names[i] for i in order],
+            "current": np.round(current[order], 2).tolist(),
+            "previous": np.round(previous[order], 2).tolist(),
+            "delta": np.round(delta[order], 2).tolist(),
+            "percent": [None if np.isnan(value) else round(float(value), 1) for value in percent[order]],
+        }
+
+    def net_worth_trend(self, current_balance: float | None = None) -> Dict:
+        """Cumulative net cash flow per month.
+
+        With ``current_balance`` the series is shifted so the last month ends
+        at it, giving the balance history implied by the cash flow.
+        """
+        net = -self.rollup.values.sum(axis=0)
+        trend = np.cumsum(net)
+        if current_balance is not None and len(trend):
+            trend += current_balance - trend[-1]
+        return {"labels": self.rollup.labels, "values": np.round(trend, 2).tolist(), "net": np.round(net, 2).tolist()}
+
+    def debt_payoff_timeline(self, debts: List[Dict], horizon: int = 360) -> Dict:
+        """Monthly balances of ``debts`` (``name``, ``balance``, ``apr`` percent, ``payment``) until paid off.
+
+        The balance after ``n`` payments is ``B(1+r)^n - P((1+r)^n - 1)/r``,
+        evaluated for all debts and months at once.  Debts whose payment does
+        not cover the interest are never paid off within ``horizon`` months.
+        """
+        if not debts:
+            return {"labels": [], "series": {}, "values": [], "payoff_months": {}, "interest": {}}
+        balance = np.array([float(debt["balance"]) for debt in debts])
+        rate = np.array([float(debt.get("apr", 0)) for debt in debts]) / 1200
+        payment = np.array([float(debt["payment"]) for debt in debts])
+        n = np.arange(horizon + 1)
+        growth = (1 + rate[:, None]) ** n
+        annuity = np.where(rate[:, None] > 0, (growth - 1) / np.where(rate > 0, rate, 1)[:, None], n)
+        balances = np.clip(balance[:, None] * growth - payment[:, None] * annuity, 0, None)
+        paid = balances <= 0.005
+        payoff = np.where(paid.any(axis=1), paid.argmax(axis=1), -1)
+        # payments actually made: the full payment or what is left of the balance
+        payments = np.minimum(payment[:, None], balances[:, :-1] * (1 + rate[:, None]))
+        interest = payments.sum(axis=1) - balance
+
+        length = horizon + 1 if (payoff < 0).any() else int(payoff.max()) + 1
+        balances = balances[:, :length]
+        start = self.today.replace(day=1)
+        names = [debt.get("name") or f"debt {i + 1}" for i, debt in enumerate(debts)]
+        return {
+            "labels": [(start + relativedelta(months=i)).isoformat() for i in range(length)],
+            "series": {name: np.round(row, 2).tolist() for name, row in zip(names, balances)},
+            "values": np.round(balances.sum(axis=0), 2).tolist(),
+            "payoff_months": {name: int(months) if months >= 0 else None for name, months in zip(names, payoff)},
+            "interest": {
+                name: round(float(value), 2) if months >= 0 else None
+                for name, value, months in zip(names, interest, payoff)
+            },
+        }
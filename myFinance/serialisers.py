@@ -1,8 +1,7 @@
 from django.contrib.auth.models import User
-from django.db.models import Sum
 from rest_framework import serializers
 
-from app.utils import expenses_transactions
+from app.utils import monthly_expenses
 from myFinance.models import Transaction, Tag, Credential, TagGoal, RecurringTransaction
 
 
@@ -51,8 +50,7 @@ class TagExtendedSerializer(TagSerializer):
         return obj.taggoal_set.first().value if obj.taggoal_set.exists() else None
 
     def get_expense_month_avg(self, obj):
-        transactions_exp = expenses_transactions(obj.user).filter(tag=obj)
-        values = transactions_exp.values('month_date').annotate(Sum('value')).order_by('month_date')
+        values = monthly_expenses(obj.user, tag=obj)
         return round(sum([v['value__sum'] for v in values]) / len(values)) if values else 0
 
     class Meta:
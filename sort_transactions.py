@@ -21,3 +21,18 @@ def get_category(transaction_statement):
     if not tag:
         tag = Tag.objects.get(user=transaction_statement['user'], key='other')
     return tag
+
+
+def get_categories(names, user):
+    """
+    Resolve the tag of every transaction name in a single query.
+    Names without a known tag are mapped to the user's 'other' tag.
+    """
+    names = set(names)
+    categories = {item.transaction_name: item.tag for item in
+                  TransactionNameTag.objects.filter(user=user, transaction_name__in=names).select_related('tag')}
+    unknown = names - categories.keys()
+    if unknown:
+        other = Tag.objects.get(user=user, key='other')
+        categories.update({name: other for name in unknown})
+    return categories
@@ -19,6 +19,19 @@ for var in [
 
 django.setup()
 
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached user data and LLM answers must not leak between tests."""
+    from django.core.cache import cache
+    from agents.llm_cache import get_response_cache
+    cache.clear()
+    if get_response_cache():
+        get_response_cache().clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def mock_litellm(monkeypatch):
     """Mock litellm.completion to avoid network calls."""
@@ -26,10 +39,14 @@ def mock_litellm(monkeypatch):
         return litellm.mock_completion(model=model, messages=messages, mock_response="{\"ok\": true}")
 
     monkeypatch.setattr(litellm, "completion", _mock_completion)
-    # Skip JSON schema validation during tests
+    return _mock_completion
+
+
+@pytest.fixture(autouse=True)
+def skip_validation(monkeypatch):
+    """Skip JSON schema validation during tests, override the fixture to validate."""
     from agents.base import BaseAgent
     monkeypatch.setattr(BaseAgent, "validate_payload", lambda self, payload: None)
-    return _mock_completion
 
 
 @pytest.fixture
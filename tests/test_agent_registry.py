@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+from django.core.management import call_command
+
+from agents_adk import agent
+from agents_adk.agent import AGENT_FACTORIES, AgentRegistry
+
+
+def test_importing_the_views_builds_no_agents():
+    # a fresh interpreter, other tests build the agents
+    script = (
+        "import django; django.setup(); import app.views; from agents_adk.agent import agent_registry; "
+        "print(sum(agent_registry.is_built(name) for name in agent_registry.names()))"
+    )
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="finance.test_settings", LITELLM_LOCAL_MODEL_COST_MAP="True")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "0"
+
+
+def test_registry_builds_each_agent_once_on_first_use():
+    calls = []
+    registry = AgentRegistry()
+    registry.register("reporting_agent", lambda: calls.append(1) or AGENT_FACTORIES["reporting_agent"]())
+    assert not registry.is_built("reporting_agent") and not calls
+
+    built = registry.get("reporting_agent")
+    assert registry.get("reporting_agent") is built and len(calls) == 1
+    assert built.name == "reporting_agent"
+    assert "reporting_agent" in registry.build_times and "reporting_agent" in registry.report()
+
+
+def test_startup_report_builds_the_root_agent(capsys):
+    call_command("agent_startup_report")
+    output = capsys.readouterr().out
+    assert f"with {len(AGENT_FACTORIES)} sub agents" in output
+    root = agent.root_agent
+    assert root is agent.agent_registry.get("orchestrator")
+    assert [sub.name for sub in root.sub_agents][:2] == ["onboarding_agent", "cash_flow_agent"]
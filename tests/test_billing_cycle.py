@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from myFinance.billing_cycle import BillingCycle
+from myFinance.models import DateInput, Tag, Transaction
+
+
+def test_billing_cycle_buckets_dates():
+    cycle = BillingCycle(10)
+    assert cycle.month(datetime.date(2024, 3, 10)) == 3
+    assert cycle.month_date(datetime.date(2024, 3, 10)) == datetime.date(2024, 3, 10)
+    assert cycle.month(datetime.date(2024, 3, 9)) == 2
+    assert cycle.month_date(datetime.date(2024, 3, 9)) == datetime.date(2024, 2, 10)
+    assert cycle.month_date(datetime.date(2024, 1, 1)) == datetime.date(2023, 12, 10)
+
+
+def test_billing_cycle_clamps_short_months():
+    cycle = BillingCycle(31)
+    assert cycle.month_date(datetime.date(2024, 3, 5)) == datetime.date(2024, 2, 29)
+    assert cycle.month_date(datetime.date(2024, 5, 1)) == datetime.date(2024, 4, 30)
+
+
+def test_billing_cycle_defaults_to_calendar_month():
+    assert BillingCycle().month_date(datetime.date(2024, 7, 18)) == datetime.date(2024, 7, 1)
+
+
+@pytest.fixture
+def user():
+    user = get_user_model().objects.create_user(username="cycle", password="pass")
+    tag = Tag.objects.create(user=user, name="Food", key="food")
+    for day in (1, 9, 10, 25):
+        Transaction.objects.create(user=user, name="Shop", value=5, date=datetime.date(2024, 3, day), tag=tag)
+    return user
+
+
+@pytest.mark.django_db
+def test_save_without_start_date_uses_calendar_month(user):
+    assert set(Transaction.objects.filter(user=user).values_list("month_date", flat=True)) == {
+        datetime.date(2024, 3, 1)}
+
+
+@pytest.mark.django_db
+def test_start_date_change_recomputes_month_date(user, django_assert_max_num_queries):
+    # the month recompute (3) and the set based rollup rebuild (5), neither grows with the transactions
+    with django_assert_max_num_queries(3 + 5):
+        DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 10))
+
+    month_dates = dict(Transaction.objects.filter(user=user).values_list("date", "month_date"))
+    assert month_dates[datetime.date(2024, 3, 1)] == datetime.date(2024, 2, 10)
+    assert month_dates[datetime.date(2024, 3, 9)] == datetime.date(2024, 2, 10)
+    assert month_dates[datetime.date(2024, 3, 10)] == datetime.date(2024, 3, 10)
+    assert month_dates[datetime.date(2024, 3, 25)] == datetime.date(2024, 3, 10)
+    assert Transaction.objects.get(user=user, date=datetime.date(2024, 3, 1)).month == 2
+
+
+@pytest.mark.django_db
+def test_backfill_month_date_command(user):
+    Transaction.objects.filter(user=user).update(month=None, month_date=None)
+
+    call_command("backfill_month_date", username=user.username)
+
+    assert not Transaction.objects.filter(user=user, month_date=None).exists()
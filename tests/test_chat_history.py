@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import Conversation, Message
+
+
+@pytest.fixture
+def history():
+    user = get_user_model().objects.create_user(username="history", password="pass")
+    conversation = Conversation.objects.create(user=user)
+    start = timezone.now() - datetime.timedelta(hours=1)
+    messages = []
+    for number in range(5):
+        message = Message.objects.create(conversation=conversation, sender=Message.USER, payload={"text": str(number)})
+        messages.append(message)
+    chart = Message.objects.create(
+        conversation=conversation,
+        sender=Message.AGENT,
+        content_type=Message.CHART,
+        payload={"report_id": "r1", "summary_markdown": "## Spend", "chart_url": "data:image/png;base64," + "A" * 5000},
+    )
+    messages.append(chart)
+    # two messages share a timestamp, the id breaks the tie
+    for message, minutes in zip(messages, [0, 1, 1, 2, 3, 4]):
+        Message.objects.filter(pk=message.pk).update(timestamp=start + datetime.timedelta(minutes=minutes))
+    client = APIClient()
+    client.force_authenticate(user)
+    return client, messages, start
+
+
+@pytest.mark.django_db
+def test_history_is_cursor_paginated_newest_first(history):
+    client, messages, _ = history
+    ids, url = [], "/api/chat/history/?page_size=2"
+    while url:
+        data = client.get(url).json()
+        assert len(data["results"]) <= 2
+        ids += [message["id"] for message in data["results"]]
+        url = data["next"]
+
+    assert ids == [message.pk for message in reversed(messages)]
+
+
+@pytest.mark.django_db
+def test_history_since_and_compact_projection(history):
+    client, messages, start = history
+    since = (start + datetime.timedelta(minutes=2)).isoformat()
+
+    data = client.get("/api/chat/history/", {"since": since, "compact": "1"}).json()
+    assert [message["id"] for message in data["results"]] == [messages[5].pk, messages[4].pk]
+    chart = data["results"][0]
+    assert chart["payload"] == {"report_id": "r1", "summary_markdown": "## Spend"}
+    assert data["results"][1]["payload"] == {"text": "4"} and data["results"][1]["payload_url"] is None
+
+    full = client.get(chart["payload_url"]).json()
+    assert full["payload"]["chart_url"].startswith("data:image/png;base64,")
+    assert client.get("/api/chat/history/", {"since": "yesterday"}).status_code == 400
+
+    other = APIClient()
+    other.force_authenticate(get_user_model().objects.create_user(username="other", password="pass"))
+    assert other.get(chart["payload_url"]).status_code == 404
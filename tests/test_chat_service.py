@@ -1,10 +1,14 @@
 import datetime
+from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from app.services.chat_service import ChatService
 from app.models import Message
+from myFinance.financial_context import FinancialContext
 from myFinance.models import (
     Tag,
     TransactionNameTag,
@@ -27,6 +31,21 @@ def test_send_message_creates_reply(orchestrator_llm):
     assert conv.messages.count() == 2
 
 
+@pytest.mark.django_db
+def test_send_message_returns_the_chart(orchestrator_llm):
+    user = get_user_model().objects.create_user(username="charted", password="pass")
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    Transaction.objects.create(user=user, name="Shop", value=40, date=datetime.date.today(), tag=food)
+
+    with patch("agents.charts._render_executor"):
+        msg = ChatService().send_message(user, "show me a chart of my spending")
+
+    assert msg.content_type == Message.CHART
+    assert msg.payload["chart_id"] and msg.payload["chart_status"] == "pending"
+    assert msg.payload["labels"] == ["Food"] and msg.payload["values"] == [40]
+    assert "Expenses by Category" in msg.payload["summary_markdown"]
+
+
 @pytest.mark.django_db
 def test_build_financial_context(monkeypatch):
     user = get_user_model().objects.create_user(username="ctx", password="pass")
@@ -70,6 +89,45 @@ def test_send_message_passes_context(monkeypatch):
     assert "budget_info" in captured
 
 
+@pytest.mark.django_db
+def test_send_message_loads_context_only_for_cash_flow(orchestrator_llm):
+    user = get_user_model().objects.create_user(username="lazy", password="pass")
+    tag = Tag.objects.create(user=user, name="Food", key="food")
+    Transaction.objects.create(user=user, name="Shop", value=10, date=datetime.date.today(), tag=tag)
+    service = ChatService()
+
+    with CaptureQueriesContext(connection) as queries:
+        service.send_message(user, "show me a chart")
+    assert not [q for q in queries if '"myFinance_transaction"' in q["sql"]]
+
+    with CaptureQueriesContext(connection) as queries:
+        service.send_message(user, "cash flow please")
+    assert [q for q in queries if '"myFinance_transaction"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_financial_context_is_bounded_and_cached(django_assert_num_queries):
+    user = get_user_model().objects.create_user(username="window", password="pass")
+    tag = Tag.objects.create(user=user, name="Food", key="food")
+    today = datetime.date(2024, 6, 15)
+    Transaction.objects.create(user=user, name="Old", value=1, date=datetime.date(2022, 1, 1), tag=tag)
+    for day in range(1, 6):
+        Transaction.objects.create(user=user, name="Shop", value=day, date=datetime.date(2024, 6, day), tag=tag)
+
+    context = FinancialContext(user, months=6, max_transactions=3, today=today)
+    with django_assert_num_queries(1):
+        txns = context.transactions()
+    assert [t["amount"] for t in txns] == [3, 4, 5]
+    assert txns[0]["category"] == "Food"
+
+    with django_assert_num_queries(0):
+        assert FinancialContext(user, months=6, max_transactions=3, today=today).transactions() == txns
+
+    Transaction.objects.create(user=user, name="Shop", value=6, date=datetime.date(2024, 6, 10), tag=tag)
+    fresh = FinancialContext(user, months=6, max_transactions=3, today=today).transactions()
+    assert [t["amount"] for t in fresh] == [4, 5, 6]
+
+
 @pytest.mark.django_db
 def test_get_budget_inputs_returns_mock():
     user = get_user_model().objects.create_user(username="budget", password="pass")
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+
+from app.models import Message
+from app.services.chat_service import ChatService
+from app.streaming import ChatStreamApp
+
+
+class ChunkedChatService(ChatService):
+    def stream_message(self, user, text):
+        agent_msg = self.send_message(user, text)
+        for chunk in ("Hel", "lo ", "there"):
+            yield {"type": "delta", "text": chunk}
+        yield {"type": "message", "message": agent_msg}
+
+
+def call(app, method, headers=(), body=b""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": "/api/chat/stream/",
+             "headers": [(key.encode(), value.encode()) for key, value in headers]}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], dict(sent[0]["headers"]), sent[1:]
+
+
+def parse_events(messages):
+    assert all(message.get("more_body") for message in messages[:-1])
+    assert messages[-1] == {"type": "http.response.body", "body": b""}
+    events = []
+    for frame in b"".join(message["body"] for message in messages).decode().split("\n\n")[:-1]:
+        event, data = frame.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.mark.django_db(transaction=True)
+def test_chat_stream_emits_deltas_then_persisted_message(monkeypatch):
+    user = get_user_model().objects.create_user(username="streamer", password="pass")
+    token = Token.objects.create(user=user)
+    service = ChunkedChatService()
+    monkeypatch.setattr(service.orchestrator, "handle_message", lambda text, **kwargs: (Message.TEXT,
+                                                                                        {"text": "Hello there"}))
+    app = ChatStreamApp(lambda: service)
+    origin = ("origin", "http://localhost:3000")
+
+    status, headers, _ = call(app, "OPTIONS", [origin])
+    assert status == 200 and headers[b"access-control-allow-origin"] == b"http://localhost:3000"
+
+    status, _, _ = call(app, "POST", [("authorization", "Token wrong")], b'{"text": "hi"}')
+    assert status == 401
+    assert not Message.objects.exists()
+
+    status, headers, body = call(app, "POST", [origin, ("authorization", f"Token {token.key}")], b'{"text": "hi"}')
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    events = parse_events(body)
+    assert events[:3] == [("delta", {"text": "Hel"}), ("delta", {"text": "lo "}), ("delta", {"text": "there"})]
+    assert events[3][0] == "message"
+    assert events[3][1]["payload"] == {"text": "Hello there"}
+    assert list(Message.objects.values_list("sender", flat=True).order_by("id")) == [Message.USER, Message.AGENT]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_chat_stream_reports_agent_errors(monkeypatch):
+    user = get_user_model().objects.create_user(username="broken", password="pass")
+    token = Token.objects.create(user=user)
+    service = ChatService()
+
+    def fail(text, **kwargs):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(service.orchestrator, "handle_message", fail)
+    status, _, body = call(ChatStreamApp(lambda: service), "POST", [("authorization", f"Token {token.key}")],
+                           b'{"text": "hi"}')
+
+    assert status == 200
+    assert [event for event, _ in parse_events(body)] == ["error"]
@@ -0,0 +1,125 @@
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from bank_scraper.selenium_api import DriverPool
+
+
+class StubBankHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'<html><title>bank</title><body>login</body></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Set-Cookie', 'session=1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeDriver:
+    """stands in for a webdriver, loads pages from the stub server with urllib"""
+
+    def __init__(self):
+        self.current_url = 'about:blank'
+        self.page_source = ''
+        self.cookies = {}
+        self._requests = []
+        self.quit_called = False
+        self.broken = False
+
+    def get(self, url):
+        if self.broken:
+            raise ConnectionError('chrome is gone')
+        self.current_url = url
+        if url == 'about:blank':
+            self.page_source = ''
+            return
+        with urllib.request.urlopen(url) as response:
+            self.page_source = response.read().decode()
+            self.cookies['session'] = response.headers['Set-Cookie']
+        self._requests.append(url)
+
+    @property
+    def requests(self):
+        return self._requests
+
+    @requests.deleter
+    def requests(self):
+        # like selenium-wire, deleting the captured requests clears them
+        self._requests = []
+
+    def execute_script(self, script):
+        pass
+
+    def delete_all_cookies(self):
+        self.cookies = {}
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def stub_bank():
+    server = HTTPServer(('127.0.0.1', 0), StubBankHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}/'.format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+def test_driver_pool_reuses_and_resets_drivers(stub_bank):
+    created = []
+
+    def factory(**options):
+        created.append(FakeDriver())
+        return created[-1]
+
+    pool = DriverPool(factory=factory, max_uses=2, idle_timeout=60, max_idle=2)
+    with pool.lease(grid=False) as driver:
+        driver.get(stub_bank)
+        assert 'login' in driver.page_source
+    assert driver.cookies == {} and driver.requests == [] and driver.current_url == 'about:blank'
+
+    with pool.lease(grid=False) as second:
+        second.get(stub_bank)
+    assert second is driver and len(created) == 1
+    # max_uses reached, the driver is recycled
+    assert driver.quit_called
+
+    with pool.lease(grid=False) as third:
+        pass
+    with pool.lease(grid=True) as other_options:
+        pass
+    assert len(created) == 3 and third is not other_options
+
+    with pytest.raises(ValueError):
+        with pool.lease(grid=False) as failed:
+            raise ValueError('scrape failed')
+    assert failed is third and failed.quit_called
+
+
+def test_driver_pool_health_check_and_idle_eviction(stub_bank):
+    pool = DriverPool(factory=lambda **options: FakeDriver(), max_uses=10, idle_timeout=60, max_idle=2)
+    with pool.lease() as driver:
+        driver.get(stub_bank)
+    driver.broken = True
+    del driver.current_url
+    with pool.lease() as healthy:
+        pass
+    assert healthy is not driver and driver.quit_called
+
+    pool.idle_timeout = 0.01
+    time.sleep(0.02)
+    pool.evict_idle()
+    assert healthy.quit_called
+    with pool.lease() as fresh:
+        pass
+    assert fresh is not healthy
+    pool.close()
+    assert fresh.quit_called
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.event_loop import EventLoopThread
+
+
+def test_event_loop_thread_runs_and_iterates_on_one_loop():
+    bridge = EventLoopThread(name="test-loop")
+    seen = []
+
+    async def current():
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop(), threading.current_thread().name
+
+    first = bridge.run(current())
+    second = bridge.run(current())
+    assert first == second and first[1] == "test-loop"
+
+    async def numbers(fail=False):
+        try:
+            for i in range(5):
+                await asyncio.sleep(0)
+                yield i
+            if fail:
+                raise ValueError("boom")
+        finally:
+            seen.append("closed")
+
+    assert list(bridge.iterate(numbers())) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        list(bridge.iterate(numbers(fail=True)))
+
+    events = bridge.iterate(numbers())
+    assert next(events) == 0
+    events.close()
+    bridge.run(asyncio.sleep(0.01))
+    assert seen == ["closed"] * 3
+
+    async def nested():
+        return bridge.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        bridge.run(nested())
+    bridge.stop()
@@ -0,0 +1,81 @@
+import datetime
+import json
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from dateutil.rrule import MONTHLY, rrule
+
+from bank_scraper.base_scraper import ScrapeSession, fetch_concurrently
+from bank_scraper.cal import CalScraper
+
+
+class StubCalHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    failed = set()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.in_flight -= 1
+            first_try = payload['month'] not in cls.failed
+            cls.failed.add(payload['month'])
+        if payload['month'] == '3' and first_try:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        transactions = [{'trnIntId': '{}-{}'.format(payload['year'], payload['month'])}]
+        body = json.dumps({'result': {'bankAccounts': [{'debitDates': [{'transactions': transactions}]}]}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeDriver:
+    get_cookies_calls = 0
+
+    def get_cookies(self):
+        self.get_cookies_calls += 1
+        return [{'name': 'token', 'value': 'abc'}]
+
+
+@pytest.fixture
+def stub_cal():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}/getCardTransactionsDetails'.format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+def test_cal_months_are_fetched_concurrently_in_order(stub_cal):
+    months = list(rrule(MONTHLY, dtstart=datetime.datetime(2023, 1, 1), until=datetime.datetime(2023, 12, 1)))
+    driver = FakeDriver()
+    with ScrapeSession(driver, pool_size=4, backoff=0.01) as session:
+        started = time.monotonic()
+        results = fetch_concurrently(
+            partial(CalScraper()._get_month_transactions, session, stub_cal, {}, {'cardUniqueId': '1'}), months,
+            max_workers=4)
+        elapsed = time.monotonic() - started
+
+    assert [month[0]['trnIntId'] for month in results] == ['2023-{}'.format(month) for month in range(1, 13)]
+    assert StubCalHandler.peak == 4
+    assert elapsed < 12 * 0.05
+    assert driver.get_cookies_calls == 1
+    assert session.latency_summary()['POST /getCardTransactionsDetails']['calls'] == 12
@@ -0,0 +1,86 @@
+import datetime
+import json
+import warnings
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.base import CacheKeyWarning
+
+from agents_adk import django_integration
+from agents_adk.tools import finance_tools
+from myFinance.finance_queries import FinanceQueryService
+from myFinance.models import Credential, Tag, Transaction
+
+
+@pytest.fixture
+def user():
+    user = get_user_model().objects.create_user(username="queries", password="pass")
+    credential = Credential.objects.create(user=user, company=Credential.CAL, type=Credential.CARD)
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    today = datetime.date.today()
+    Transaction.objects.create(user=user, credential=credential, name="shop", value=-40, date=today, tag=food)
+    # untagged transactions come from the bulk ingestion
+    Transaction.objects.bulk_create([
+        Transaction(user=user, credential=credential, name="cafe", value=-10, date=today - datetime.timedelta(days=3)),
+        Transaction(user=user, name="salary", value=1000, date=today - datetime.timedelta(days=100)),
+    ])
+    return user
+
+
+@pytest.mark.django_db
+def test_reads_are_memoized_until_the_user_data_changes(user, django_assert_num_queries):
+    service = FinanceQueryService(user.id)
+    first = service.spending_analysis("week")
+    assert first["spending_by_category"] == {"Food": 40.0, "Uncategorized": 10.0}
+
+    # another tool call of the same conversation, another worker
+    with django_assert_num_queries(0):
+        assert FinanceQueryService(str(user.id)).spending_analysis("week") == first
+        finance_tools.get_spending_analysis(user.id, "week")
+    with django_assert_num_queries(2):
+        month = FinanceQueryService(user.id).spending_analysis("month")
+    assert month["spending_by_category"] == first["spending_by_category"]
+    assert month["insights"]["daily_average"] == 50 / 30
+
+    summary = service.account_summary()
+    assert summary["overview"]["total_income"] == 1000
+    Transaction.objects.create(user=user, name="bonus", value=500, date=datetime.date.today(),
+                               tag=Tag.objects.create(user=user, name="Bonus", key="bonus"))
+    assert service.account_summary()["overview"]["total_income"] == 1500
+    assert service.report("income", "year")["total_income"] == 1500
+
+
+@pytest.mark.django_db
+def test_memo_keys_are_valid_for_any_arguments(user, django_assert_num_queries):
+    # arguments are written by the model, with spaces, colons and any length
+    category = "coffee: the place on main street " * 10
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", CacheKeyWarning)
+        first = FinanceQueryService(user.id).transactions(category=category)
+        with django_assert_num_queries(0):
+            assert FinanceQueryService(user.id).transactions(category=category) == first
+    assert first["summary"]["total_count"] == 0
+
+
+@pytest.mark.django_db
+def test_integration_module_wraps_the_service(user):
+    transactions = json.loads(django_integration.get_user_transactions(user.id, category="food"))
+    assert transactions["total_count"] == 1
+    assert transactions["transactions"][0]["credential"] == Credential.CAL
+
+    balances = json.loads(django_integration.get_user_account_balances(user.id))
+    assert balances["net_worth"] == 950 and balances["monthly_spending"] == 50
+    assert balances["credentials"][0]["company"] == Credential.CAL
+
+    untagged = Transaction.objects.get(name="cafe")
+    result = json.loads(django_integration.categorize_user_transaction(user.id, untagged.id, "Coffee"))
+    assert result["success"] and result["transaction"]["category"] == "Coffee"
+    spending = json.loads(django_integration.generate_user_report(user.id, "spending", "week"))
+    assert spending["spending_by_category"] == {"Food": 40.0, "Coffee": 10.0}
+
+    goal = json.loads(django_integration.create_user_goal(user.id, "Trip", 2000))
+    assert goal["goal"]["category"] == "Trip"
+    assert json.loads(finance_tools.get_goal_progress(user.id))["summary"]["total_goals"] == 1
+
+    assert "error" in json.loads(django_integration.generate_user_report(user.id, "categories"))
+    assert "error" in json.loads(finance_tools.get_user_account_summary(user.id + 100))
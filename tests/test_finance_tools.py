@@ -0,0 +1,58 @@
+import datetime
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from agents_adk.tools.finance_tools import get_goal_progress, get_spending_analysis, get_user_account_summary
+from myFinance.models import Credential, Tag, TagGoal, Transaction
+
+
+def add_transactions(user, count, credential=None):
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    savings = Tag.objects.create(user=user, name="Savings", key="savings")
+    today = datetime.date.today()
+    Transaction.objects.bulk_create(
+        [Transaction(user=user, credential=credential, name=f"shop {i}", value=-10, date=today, tag=food)
+         for i in range(count)]
+        + [Transaction(user=user, credential=credential, name="rent", value=-100, date=today),
+           Transaction(user=user, name="deposit", value=500, date=today, tag=savings),
+           Transaction(user=user, name="old deposit", value=200, date=today - datetime.timedelta(days=60),
+                       tag=savings)]
+    )
+    return food, savings
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", [3, 30])
+def test_tools_issue_a_constant_number_of_queries(count, django_assert_num_queries):
+    user = get_user_model().objects.create_user(username=f"tools{count}", password="pass")
+    credentials = [Credential.objects.create(user=user, company=Credential.CAL) for _ in range(count // 3)]
+    food, savings = add_transactions(user, count, credentials[0])
+    for _ in range(count // 3):
+        TagGoal.objects.create(user=user, tag=savings, value=1000)
+
+    with django_assert_num_queries(2):
+        spending = json.loads(get_spending_analysis(user.id))
+    with django_assert_num_queries(3):
+        summary = json.loads(get_user_account_summary(user.id))
+    with django_assert_num_queries(2):
+        goals = json.loads(get_goal_progress(user.id))
+
+    assert spending["spending_by_category"] == {"Food": 10.0 * count, "Uncategorized": 100.0}
+    assert spending["transaction_count_by_category"] == {"Food": count, "Uncategorized": 1}
+    assert spending["transaction_count"] == count + 1
+    assert spending["top_categories"][0][1] == max(10.0 * count, 100.0)
+
+    assert summary["overview"]["total_income"] == 700
+    assert summary["overview"]["total_expenses"] == 10 * count + 100
+    assert summary["recent_activity"]["monthly_income"] == 500
+    assert summary["overview"]["account_count"] == len(credentials)
+    accounts = sorted(summary["accounts"], key=lambda account: -account["transaction_count"])
+    assert accounts[0]["transaction_count"] == count + 1
+    assert accounts[0]["calculated_balance"] == -10 * count - 100
+    assert all(account["transaction_count"] == 0 for account in accounts[1:])
+
+    assert len(goals["goals"]) == count // 3
+    assert goals["goals"][0]["current_amount"] == 700 and goals["goals"][0]["transaction_count"] == 2
+    assert goals["goals"][0]["progress_percentage"] == 70
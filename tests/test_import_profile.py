@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+from django.core.management import call_command
+
+from myFinance.management.commands.import_profile import PROJECT, STDLIB, THIRD_PARTY, attribute, package_kind, \
+    parse_importtime
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     myFinance.models
+import time:       300 |        400 |   myFinance
+import time:      2000 |       2000 |   django.db
+import time:        50 |         50 | json
+"""
+
+
+def test_import_times_are_attributed_to_packages():
+    modules = parse_importtime(IMPORTTIME)
+    assert modules[0] == ("myFinance.models", 100, 100)
+    assert attribute(modules) == [("django", 2000, 1), ("myFinance", 400, 2), ("json", 50, 1)]
+    assert [package_kind(name) for name in ("myFinance", "django", "json")] == [PROJECT, THIRD_PARTY, STDLIB]
+
+
+def test_modules_import_without_setting_django_up():
+    script = ("import finance, bank_scraper.cal, agents_adk.tools.finance_tools, agents_adk.django_integration; "
+              "from django.apps import apps; import sys; print(apps.ready, 'app.views' in sys.modules)")
+    env = {key: value for key, value in os.environ.items() if key != "DJANGO_SETTINGS_MODULE"}
+    env["LITELLM_LOCAL_MODEL_COST_MAP"] = "True"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_import_profile_reports_the_cold_start(capsys):
+    call_command("import_profile", "finance.celery_app", "--top", "3")
+    output = capsys.readouterr().out
+    assert "django.setup()" in output and "import finance.celery_app" in output
+    assert "django" in output and PROJECT in output
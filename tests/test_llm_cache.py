@@ -0,0 +1,82 @@
+import time
+
+import litellm
+
+from agents.cash_flow import CashFlowAgent
+from agents.conversation import ConversationAgent
+from agents.llm_cache import DjangoCacheBackend, MemoryBackend, ResponseCache, get_response_cache
+from agents.orchestrator import Orchestrator
+
+
+def test_memory_backend_lru_and_ttl():
+    backend = MemoryBackend(max_size=2, ttl=60)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    assert backend.get("a") == "1"
+    backend.set("c", "3")
+    assert backend.get("b") is None
+    assert backend.get("a") == "1" and backend.get("c") == "3"
+
+    expiring = MemoryBackend(ttl=0.01)
+    expiring.set("a", "1")
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_django_backend_round_trip():
+    cache = ResponseCache(DjangoCacheBackend(ttl=60))
+    key = cache.key("model", [{"role": "user", "content": "hi"}])
+    assert cache.get(key, "agent") is None
+    cache.set(key, "{}")
+    assert cache.get(key, "agent") == "{}"
+    assert cache.stats == {"agent.miss": 1, "agent.hit": 1}
+
+
+def test_django_backend_clears_only_its_entries():
+    from django.core.cache import cache as django_cache
+    django_cache.set("financial_context:1", "kept")
+    backend = DjangoCacheBackend(ttl=60)
+    backend.set("key", "{}")
+    backend.clear()
+    assert backend.get("key") is None
+    assert django_cache.get("financial_context:1") == "kept"
+    backend.set("key", "{}")
+    assert backend.get("key") == "{}"
+
+
+def test_generate_payload_replays_cached_answers(monkeypatch):
+    calls = []
+
+    def completion(model, messages, **kwargs):
+        calls.append(messages)
+        return litellm.mock_completion(model=model, messages=messages, mock_response='{"messages": ["hi"]}')
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    agent = Orchestrator()
+    assert agent.generate_payload("hello") == {"messages": ["hi"]}
+    assert agent.generate_payload("hello") == {"messages": ["hi"]}
+    assert len(calls) == 1
+    assert get_response_cache().stats["orchestrator.hit"] == 1
+
+    agent.generate_payload("hello again")
+    assert len(calls) == 2
+
+    # the agents opt in, conversational answers are not replayed
+    for other in (ConversationAgent(), CashFlowAgent()):
+        other.generate_payload("same input")
+        other.generate_payload("same input")
+    assert len(calls) == 6
+
+
+def test_unparsable_answers_are_not_cached(monkeypatch):
+    calls = []
+
+    def completion(model, messages, **kwargs):
+        calls.append(messages)
+        return litellm.mock_completion(model=model, messages=messages, mock_response="not json")
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    agent = Orchestrator()
+    assert agent.generate_payload("hello") == {}
+    assert agent.generate_payload("hello") == {}
+    assert len(calls) == 2
@@ -0,0 +1,60 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.views import create_continuous_category_summery
+from myFinance.models import Tag, TagGoal, Transaction
+
+
+def _add_categories(user, count):
+    today = datetime.date.today()
+    for i in range(count):
+        tag = Tag.objects.create(user=user, name=f"cat_{i}", key=f"cat_{i}", expense=True, type=Tag.CONTINUOUS)
+        TagGoal.objects.create(user=user, tag=tag, value=100 + i)
+        Transaction.objects.create(user=user, name=f"Shop {i}", value=10 + i, date=today.replace(day=1), tag=tag)
+
+
+def _count_queries(func):
+    with CaptureQueriesContext(connection) as ctx:
+        result = func()
+    return len(ctx.captured_queries), result
+
+
+@pytest.mark.django_db
+def test_month_category_query_count_is_constant():
+    user = get_user_model().objects.create_user(username="categories", password="pass")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    _add_categories(user, 2)
+    few_queries, response = _count_queries(lambda: client.get("/month_category"))
+    assert response.status_code == 200
+    assert len(response.data) == 2
+
+    _add_categories(user, 8)
+    many_queries, response = _count_queries(lambda: client.get("/month_category"))
+    assert len(response.data) == 10
+    assert many_queries == few_queries
+
+    row = next(item for item in response.data if item["category"] == "cat_3")
+    assert row["value"] == 13
+    assert row["goal"] == 103
+    assert row["type"] == Tag.CONTINUOUS
+
+
+@pytest.mark.django_db
+def test_continuous_category_summery_query_count_is_constant():
+    user = get_user_model().objects.create_user(username="summery", password="pass")
+
+    _add_categories(user, 2)
+    few_queries, _ = _count_queries(lambda: create_continuous_category_summery(user))
+
+    _add_categories(user, 8)
+    many_queries, summery = _count_queries(lambda: create_continuous_category_summery(user))
+
+    assert many_queries == few_queries
+    assert "Cat 3: 13/ 103" in summery
@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from app.utils import monthly_expenses
+from myFinance.models import DateInput, MonthlyTagTotal, Tag, Transaction
+
+
+@pytest.fixture
+def user():
+    user = get_user_model().objects.create_user(username="rollup", password="pass")
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 1))
+    return user
+
+
+def _totals(user):
+    return {
+        (row.month_date, row.tag_id): (round(row.value, 2), row.count)
+        for row in MonthlyTagTotal.objects.filter(user=user)
+    }
+
+
+def _rebuilt_totals(user):
+    current = _totals(user)
+    MonthlyTagTotal.rebuild(user)
+    assert _totals(user) == current
+    return current
+
+
+@pytest.mark.django_db
+def test_totals_follow_insert_retag_and_delete(user):
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    fun = Tag.objects.create(user=user, name="Fun", key="fun", expense=True)
+    march = datetime.date(2024, 3, 1)
+
+    first = Transaction.objects.create(user=user, name="Shop", value=10, date=datetime.date(2024, 3, 5), tag=food)
+    Transaction.objects.create(user=user, name="Shop", value=5, date=datetime.date(2024, 3, 6), tag=food)
+    assert _rebuilt_totals(user) == {(march, food.id): (15, 2)}
+
+    first.tag = fun
+    first.value = 12
+    first.save()
+    assert _rebuilt_totals(user) == {(march, food.id): (5, 1), (march, fun.id): (12, 1)}
+
+    first.delete()
+    assert _rebuilt_totals(user) == {(march, food.id): (5, 1)}
+
+
+@pytest.mark.django_db
+def test_deleting_a_tag_keeps_its_totals(user):
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    Transaction.objects.create(user=user, name="Shop", value=10, date=datetime.date(2024, 3, 5), tag=food)
+
+    food.delete()
+
+    assert _rebuilt_totals(user) == {(datetime.date(2024, 3, 1), None): (10, 1)}
+
+
+@pytest.mark.django_db
+def test_deleting_tags_of_one_month_merges_their_totals(user):
+    march = datetime.date(2024, 3, 1)
+    first = Tag.objects.create(user=user, name="A", key="a", expense=True)
+    second = Tag.objects.create(user=user, name="B", key="b", expense=True)
+    removed = Transaction.objects.create(user=user, name="Shop", value=10, date=datetime.date(2024, 3, 5), tag=first)
+    Transaction.objects.create(user=user, name="Shop", value=20, date=datetime.date(2024, 3, 6), tag=second)
+
+    first.delete()
+    second.delete()
+    assert _totals(user) == {(march, None): (30, 2)}
+
+    Transaction.objects.get(pk=removed.pk).delete()
+    assert _rebuilt_totals(user) == {(march, None): (20, 1)}
+
+
+@pytest.mark.django_db
+def test_monthly_expenses_reads_rollup(user, django_assert_num_queries):
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    salary = Tag.objects.create(user=user, name="Salary", key="salary", expense=False)
+    for month in range(1, 4):
+        for day in range(1, 20):
+            Transaction.objects.create(user=user, name="Shop", value=1, date=datetime.date(2024, month, day), tag=food)
+        Transaction.objects.create(user=user, name="Work", value=-100, date=datetime.date(2024, month, 1), tag=salary)
+
+    with django_assert_num_queries(2):
+        values = list(monthly_expenses(user))
+
+    assert [v["value__sum"] for v in values] == [19, 19, 19]
+    assert [v["month_date"].month for v in values] == [1, 2, 3]
+
+
+@pytest.mark.django_db
+def test_monthly_expenses_ends_at_the_billing_month_of_today():
+    user = get_user_model().objects.create_user(username="late cycle", password="pass")
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 3, 25))
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    for day, value in [(datetime.date(2024, 3, 20), 1), (datetime.date(2024, 3, 26), 2),
+                       (datetime.date(2024, 6, 24), 4), (datetime.date(2024, 6, 26), 8)]:
+        Transaction.objects.create(user=user, name="Shop", value=value, date=day, tag=food)
+
+    # June 20 is in the billing month that started on May 25
+    values = list(monthly_expenses(user, today=datetime.date(2024, 6, 20)))
+
+    assert [(v["month_date"], v["value__sum"]) for v in values] == [(datetime.date(2024, 3, 25), 2),
+                                                                    (datetime.date(2024, 5, 25), 4)]
+
+
+@pytest.mark.django_db
+def test_rebuild_monthly_totals_command(user):
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    Transaction.objects.create(user=user, name="Shop", value=10, date=datetime.date(2024, 3, 5), tag=food)
+    MonthlyTagTotal.objects.all().delete()
+
+    call_command("rebuild_monthly_totals", username=user.username)
+
+    assert _totals(user) == {(datetime.date(2024, 3, 1), food.id): (10, 1)}
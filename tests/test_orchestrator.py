@@ -1,4 +1,6 @@
+import litellm
 import pytest
+from agents.intent_router import IntentRouter
 from agents.orchestrator import Orchestrator
 from app.models import Message
 
@@ -18,3 +20,62 @@ def test_handle_message_special_intents(orchestrator_llm):
     content_type, payload = orch.handle_message("tell me a joke")
     assert content_type == Message.TEXT
     assert payload["text"].lower().startswith("tell me a joke")
+
+
+def test_intent_router_only_classifies_confident_messages():
+    router = IntentRouter()
+    assert router.classify("show me my budget breakdown")["intent"] == "show_budget"
+    assert router.classify("hi, can you help me set a goal to save for a car")["intent"] == "set_goal"
+    assert router.classify("create a budget for my transactions")["intent"] == "create_budget"
+    # a single generic keyword is not enough
+    for text in ("show me a chart", "my transactions", "hi", "a report please"):
+        assert router.classify(text) is None
+    assert router.classify("I have a loan and want to invest") is None
+    assert router.classify("tell me a joke") is None
+
+
+def test_intent_router_leaves_an_unclear_intent_to_the_agent():
+    payload = IntentRouter().classify("build me a monthly budget from my cash flow")
+    assert payload["agent"] == "Cash-Flow & Budget" and "intent" not in payload
+
+    orch = Orchestrator()
+    seen = {}
+
+    def handle_message(text, **kwargs):
+        seen.clear()
+        seen.update(kwargs)
+        return Message.TEXT, {"summary_markdown": "budget"}
+
+    orch.agents["cash_flow"].handle_message = handle_message
+    orch.handle_message("build me a monthly budget from my cash flow")
+    assert "intent" not in seen
+    orch.handle_message("create a budget for my transactions")
+    assert seen["intent"] == "create_budget"
+
+
+def test_handle_message_fast_path_llm_calls(orchestrator_llm, monkeypatch):
+    calls = []
+
+    def counting_completion(model, messages, **kwargs):
+        calls.append(messages[0]["content"][:40])
+        return orchestrator_llm(model, messages, **kwargs)
+
+    monkeypatch.setattr(litellm, "completion", counting_completion)
+    orch = Orchestrator()
+
+    content_type, payload = orch.handle_message("show me my budget breakdown")
+    # the chart reaches the client as is, with the agent's summary
+    assert content_type == Message.CHART and "Monthly Expenses" in payload["summary_markdown"]
+    assert payload["labels"] and payload["chart_id"]
+    assert len(calls) == 0
+
+    orch.handle_message("good morning")
+    assert len(calls) == 1
+
+    orch.handle_message("I have a loan and want to invest")
+    assert len(calls) == 4  # router, agent and summary
+
+    assert orch.metrics["route.fast_path"] == 2
+    assert orch.metrics["route.llm"] == 1
+    assert orch.metrics["summary.chart"] == 1
+    assert orch.metrics["summary.llm"] == 1
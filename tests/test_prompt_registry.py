@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+from jsonschema import ValidationError
+
+from agents.registry import PromptRegistry
+from agents.reporting import ReportingAgent
+
+
+@pytest.fixture
+def prompt_dirs(tmp_path):
+    prompts, schemas = tmp_path / "prompts", tmp_path / "schemas"
+    prompts.mkdir()
+    schemas.mkdir()
+    (prompts / "reporting.md").write_text("v1")
+    (schemas / "Report.json").write_text(json.dumps({
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "required": ["report_id"],
+    }))
+    return prompts, schemas
+
+
+def test_registry_reads_files_once(prompt_dirs):
+    prompts, schemas = prompt_dirs
+    registry = PromptRegistry(prompts, schemas, reload=False)
+    assert registry.prompt("reporting") == "v1"
+    assert registry.prompt("missing") == ""
+    validator = registry.validator("Report.json")
+    assert registry.validator("Report.json") is validator
+    assert validator.is_valid({"report_id": "1"}) and not validator.is_valid({})
+
+    (prompts / "reporting.md").write_text("v2")
+    assert registry.prompt("reporting") == "v1"
+    assert registry.version == 0
+
+
+def test_registry_reloads_changed_files(prompt_dirs):
+    prompts, schemas = prompt_dirs
+    registry = PromptRegistry(prompts, schemas, reload=True)
+    assert registry.prompt("reporting") == "v1"
+    path = prompts / "reporting.md"
+    path.write_text("v2")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert registry.prompt("reporting") == "v2"
+    assert registry.version == 1
+
+
+@pytest.fixture
+def skip_validation():
+    """the conftest one disables the validation tested here"""
+
+
+def test_validate_payload_uses_compiled_validator():
+    agent = ReportingAgent()
+    with pytest.raises(ValidationError):
+        agent.validate_payload({"type": "budget"})
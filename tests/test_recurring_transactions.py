@@ -0,0 +1,56 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.views import estimated_recurring_transactions
+from app.utils import RecurringTransactionMatcher
+from myFinance.models import DateInput, RecurringTransaction, Tag, Transaction
+
+
+@pytest.fixture
+def user():
+    user = get_user_model().objects.create_user(username="recurring", password="pass")
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 1))
+    tag = Tag.objects.create(user=user, name="Bills", key="bills", expense=True)
+    today = datetime.date.today()
+    Transaction.objects.create(user=user, name="NETFLIX.COM 1234", value=50, date=today.replace(day=1), tag=tag)
+    Transaction.objects.create(user=user, name="Rent", value=3000, date=today.replace(day=1), tag=tag)
+    return user
+
+
+def _recurring(user, name, value, day=15):
+    return RecurringTransaction.objects.create(user=user, name=name, value=value, date=datetime.date(2024, 1, day))
+
+
+@pytest.mark.django_db
+def test_unregistered_recurring_transactions(user):
+    _recurring(user, "NETFLIX", 52)  # charged, name contained and value within 10%
+    _recurring(user, "Rent", 3500)  # value out of range
+    _recurring(user, "Gym", 200, day=31)  # not charged
+
+    result = estimated_recurring_transactions(False, user)
+
+    assert sorted(item.name for item in result) == ["Gym", "Rent"]
+    gym = next(item for item in result if item.name == "Gym")
+    today = datetime.date.today()
+    assert gym.date.month == today.month
+    assert RecurringTransaction.objects.get(name="Gym").date == datetime.date(2024, 1, 31)
+
+
+@pytest.mark.django_db
+def test_matcher_query_count_is_constant(user):
+    for i in range(3):
+        _recurring(user, f"Item {i}", 10 + i)
+    with CaptureQueriesContext(connection) as few:
+        RecurringTransactionMatcher(user).unregistered(bill_month=True)
+
+    for i in range(3, 30):
+        _recurring(user, f"Item {i}", 10 + i)
+    with CaptureQueriesContext(connection) as many:
+        result = RecurringTransactionMatcher(user).unregistered(bill_month=True)
+
+    assert len(result) == 30
+    assert len(many.captured_queries) == len(few.captured_queries)
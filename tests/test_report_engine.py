@@ -0,0 +1,157 @@
+import datetime
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from agents.reporting import ReportingAgent
+from app.models import Message
+from myFinance.billing_cycle import BillingCycle
+from myFinance.models import DateInput, MonthlyTagTotal, Tag
+from myFinance.report_engine import ReportEngine
+
+TODAY = datetime.date(2024, 6, 20)
+
+
+@pytest.fixture
+def engine():
+    user = get_user_model().objects.create_user(username="report", password="pass")
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    rent = Tag.objects.create(user=user, name="Rent", key="rent", expense=True)
+    salary = Tag.objects.create(user=user, name="Salary", key="salary", expense=False)
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 10))
+    rows = [
+        # (month_date, tag, value), month dates fall on the billing cycle start day
+        (datetime.date(2024, 4, 10), food, 300),
+        (datetime.date(2024, 4, 10), rent, 1000),
+        (datetime.date(2024, 4, 10), salary, -2000),
+        (datetime.date(2024, 5, 10), food, 400),
+        (datetime.date(2024, 5, 10), rent, 1000),
+        (datetime.date(2024, 5, 10), None, 50),
+        (datetime.date(2024, 5, 10), salary, -2000),
+        (datetime.date(2024, 6, 10), food, 200),
+        (datetime.date(2024, 6, 10), rent, 1000),
+        (datetime.date(2024, 6, 10), salary, -2100),
+        # outside the window
+        (datetime.date(2023, 1, 10), food, 9999),
+    ]
+    for month_date, tag, value in rows:
+        MonthlyTagTotal.objects.create(user=user, month_date=month_date, tag=tag, value=value, count=1)
+    return ReportEngine(user, months=3, today=TODAY)
+
+
+@pytest.mark.django_db
+def test_rollup_is_loaded_with_one_query(engine, django_assert_num_queries):
+    # and one for the billing cycle of the window
+    with django_assert_num_queries(2):
+        engine.category_breakdown()
+        engine.month_over_month()
+        engine.net_worth_trend()
+    assert engine.rollup.labels == ["2024-04", "2024-05", "2024-06"]
+
+
+@pytest.mark.django_db
+def test_category_breakdown_and_month_over_month(engine):
+    breakdown = engine.category_breakdown()
+    assert breakdown["labels"] == ["Rent", "Food", "Other"]
+    assert breakdown["values"] == [3000, 900, 50]
+    assert breakdown["total"] == 3950
+    assert engine.category_breakdown(last_months=1)["values"] == [1000, 200]
+
+    change = engine.month_over_month()
+    assert change["month"] == "2024-06"
+    assert change["labels"] == ["Food", "Other"]
+    assert change["delta"] == [-200, -50]
+    assert change["percent"] == [-50.0, -100.0]
+
+
+@pytest.mark.django_db
+def test_net_worth_trend(engine):
+    trend = engine.net_worth_trend()
+    assert trend["net"] == [700, 550, 900]
+    assert trend["values"] == [700, 1250, 2150]
+    assert engine.net_worth_trend(current_balance=10000)["values"] == [8550, 9100, 10000]
+
+
+@pytest.mark.django_db
+def test_window_ends_at_the_billing_month_of_today():
+    user = get_user_model().objects.create_user(username="late cycle", password="pass")
+    food = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 25))
+    # June 20 is in the billing month that started on May 25
+    for month_date, value in [(datetime.date(2024, 3, 25), 100), (datetime.date(2024, 4, 25), 200),
+                              (datetime.date(2024, 5, 25), 150)]:
+        MonthlyTagTotal.objects.create(user=user, month_date=month_date, tag=food, value=value, count=1)
+    engine = ReportEngine(user, months=3, today=TODAY)
+
+    assert engine.cycle.start_day == 25
+    assert engine.rollup.labels == ["2024-03", "2024-04", "2024-05"]
+    assert engine.category_breakdown()["values"] == [450]
+    change = engine.month_over_month()
+    assert change["month"] == "2024-05" and change["delta"] == [-50]
+    assert ReportEngine(user, months=3, today=datetime.date(2024, 6, 25), cycle=BillingCycle(25)).rollup.labels == [
+        "2024-04", "2024-05", "2024-06"]
+
+
+def test_debt_payoff_timeline():
+    engine = ReportEngine(None, today=TODAY)
+    timeline = engine.debt_payoff_timeline([
+        {"name": "car", "balance": 1000, "apr": 0, "payment": 300},
+        {"name": "card", "balance": 1000, "apr": 12, "payment": 100},
+        {"name": "stuck", "balance": 1000, "apr": 24, "payment": 10},
+    ], horizon=24)
+
+    assert timeline["payoff_months"] == {"car": 4, "card": 11, "stuck": None}
+    assert timeline["series"]["car"][:5] == [1000, 700, 400, 100, 0]
+    assert timeline["interest"]["car"] == 0
+    # 1% a month on a 1000 loan repaid over 11 months
+    assert 55 < timeline["interest"]["card"] < 60
+    assert timeline["series"]["stuck"][-1] > 1000
+    assert len(timeline["labels"]) == 25 and timeline["labels"][0] == "2024-06-01"
+    assert timeline["values"][0] == 3000
+
+
+@pytest.mark.django_db
+def test_reporting_agent_uses_engine(engine):
+    agent = ReportingAgent()
+
+    content_type, payload = agent.handle_message("chart data", engine=engine)
+    assert content_type == Message.CHART
+    assert payload["source_refs"] == ["monthly_tag_totals"]
+    assert payload["labels"] == ["Rent", "Food", "Other"]
+    assert "**Food**: -200.00 (-50.0%)" in payload["summary_markdown"]
+
+    _, payload = agent.handle_message("net worth chart data", engine=engine)
+    assert payload["type"] == "net_worth" and payload["values"] == [700, 1250, 2150]
+
+    _, payload = agent.handle_message("debt payoff chart data", engine=engine)
+    assert payload["missing_info"] == ["debts"]
+    _, payload = agent.handle_message("debt payoff chart data", engine=engine,
+                                      debts=[{"name": "car", "balance": 1000, "payment": 300}])
+    assert payload["type"] == "debt_payoff" and payload["values"] == [1000, 700, 400, 100, 0]
+
+    empty = ReportEngine(get_user_model().objects.create_user(username="empty", password="pass"), today=TODAY)
+    content_type, payload = agent.handle_message("show me a chart", engine=empty)
+    assert payload["missing_info"] == ["transactions"] and "chart_url" not in payload
+
+
+@pytest.mark.django_db
+def test_reports_are_fast_on_a_large_rollup():
+    user = get_user_model().objects.create_user(username="large", password="pass")
+    tags = [Tag.objects.create(user=user, name=f"tag {i}", key=f"tag{i}", expense=True) for i in range(60)]
+    start = datetime.date(2019, 7, 1)
+    MonthlyTagTotal.objects.bulk_create([
+        MonthlyTagTotal(user=user, month_date=datetime.date(start.year + (start.month + m - 1) // 12,
+                                                              (start.month + m - 1) % 12 + 1, 1),
+                        tag=tag, value=(i + 1) * 10 + m, count=5)
+        for m in range(60) for i, tag in enumerate(tags)
+    ])
+    engine = ReportEngine(user, months=60, today=TODAY)
+
+    began = time.perf_counter()
+    engine.category_breakdown()
+    engine.month_over_month()
+    engine.net_worth_trend()
+    engine.debt_payoff_timeline([{"balance": 5000 + i, "apr": 5 + i, "payment": 200} for i in range(10)])
+    assert time.perf_counter() - began < 0.1
+    assert len(engine.rollup.names) == 60
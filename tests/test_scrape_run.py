@@ -0,0 +1,63 @@
+import datetime
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+
+from finance import settings
+from finance.scraping import ScrapeRun, scrape_window
+from myFinance.models import Credential, ErrorLog
+
+
+@pytest.mark.django_db
+def test_scrape_run_caps_concurrency_per_company():
+    user = User.objects.create(username='scraper')
+    credentials = [Credential.objects.create(user=user, company=company, credential='{}')
+                   for company in [Credential.CAL, Credential.CAL, Credential.CAL, Credential.MAX, Credential.MAX,
+                                   Credential.DISCOUNT]]
+    lock = threading.Lock()
+    active, peak = {}, {'total': 0}
+
+    def loader(credential, start, end):
+        with lock:
+            active[credential.company] = active.get(credential.company, 0) + 1
+            peak[credential.company] = max(peak.get(credential.company, 0), active[credential.company])
+            peak['total'] = max(peak['total'], sum(active.values()))
+        time.sleep(0.05)
+        with lock:
+            active[credential.company] -= 1
+        if credential.id == credentials[1].id:
+            raise ValueError('login failed')
+        return {'inserted': 2, 'skipped': 1}
+
+    end = datetime.datetime(2024, 3, 31)
+    jobs = [(credential, datetime.datetime(2024, 3, 1), end) for credential in credentials]
+    jobs.append((credentials[0], end, datetime.datetime(2024, 3, 1)))
+    run = ScrapeRun(max_workers=2, per_company=1, loader=loader)
+    rows = run.run(jobs)
+
+    assert peak[Credential.CAL] == 1 and peak[Credential.MAX] == 1
+    assert peak['total'] == 2
+    assert [row['credential_id'] for row in rows] == [credential.id for credential in credentials] + [
+        credentials[0].id]
+    assert [row['status'] for row in rows] == ['ok', 'error', 'ok', 'ok', 'ok', 'ok', 'noop']
+    assert sum(row['inserted'] for row in rows) == 10
+    assert 'login failed' in rows[1]['error']
+    assert ErrorLog.objects.filter(user=user).count() == 1
+    assert 'total: 7 credentials, 10 inserted, 1 failed' in run.format_summary()
+
+
+@pytest.mark.django_db
+def test_scrape_window_is_incremental_from_last_scanned(monkeypatch):
+    monkeypatch.setattr(settings, 'SCRAPE_OVERLAP_DAYS', 3)
+    monkeypatch.setattr(settings, 'SCRAPE_FULL_RESYNC_MONTHS', 12)
+    user = User.objects.create(username='scraper')
+    credential = Credential.objects.create(user=user, company=Credential.MAX, credential='{}')
+    end = datetime.datetime(2024, 3, 20)
+
+    assert scrape_window(credential, end) == (datetime.datetime(2024, 3, 1), end)
+    credential.last_scanned = datetime.date(2024, 3, 15)
+    assert scrape_window(credential, end) == (datetime.datetime(2024, 3, 12), end)
+    assert scrape_window(credential, end, overlap_days=0) == (datetime.datetime(2024, 3, 15), end)
+    assert scrape_window(credential, end, full=True) == (datetime.datetime(2023, 3, 1), end)
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from django.contrib.auth import get_user_model
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.events.event_actions import EventActions
+from google.genai import types
+
+from app.models import AgentSession, AgentSessionEvent, Conversation
+from app.services.session_service import DjangoSessionService
+
+APP = "FinanceAgent"
+
+
+def text_event(author, text, **actions):
+    return Event(
+        author=author,
+        invocation_id=Event.new_id(),
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(**actions),
+    )
+
+
+def turn(service, session, number):
+    asyncio.run(service.append_event(session, text_event("user", f"question {number}")))
+    asyncio.run(service.append_event(session, text_event("root_agent", f"answer {number}")))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sessions_are_shared_between_service_instances():
+    user = get_user_model().objects.create_user(username="adk", password="pass")
+    conversation = Conversation.objects.create(user=user)
+    service = DjangoSessionService()
+    session = asyncio.run(service.create_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+    with pytest.raises(AlreadyExistsError):
+        asyncio.run(service.create_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+
+    turn(service, session, 1)
+    asyncio.run(service.append_event(session, text_event(
+        "root_agent", "noted", state_delta={"currency": "ILS", "temp:scratch": 1})))
+    asyncio.run(service.append_event(session, Event(author="root_agent", partial=True)))
+
+    key = (APP, str(user.id), str(conversation.id))
+    entry = service._cache[key]
+    cached = asyncio.run(service.get_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+    assert service._cache[key] is entry and cached is not entry
+    other_worker = DjangoSessionService()
+    loaded = asyncio.run(other_worker.get_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+
+    for restored in (cached, loaded):
+        assert [event.content.parts[0].text for event in restored.events] == ["question 1", "answer 1", "noted"]
+        assert restored.state == {"currency": "ILS"}
+    assert AgentSession.objects.get().conversation == conversation
+
+    turn(other_worker, loaded, 2)
+    refreshed = asyncio.run(service.get_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+    assert len(refreshed.events) == 5
+
+    listed = asyncio.run(service.list_sessions(app_name=APP, user_id=str(user.id)))
+    assert [item.id for item in listed.sessions] == [str(conversation.id)]
+    asyncio.run(service.delete_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id)))
+    assert asyncio.run(other_worker.get_session(app_name=APP, user_id=str(user.id), session_id=str(conversation.id))) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_old_events_are_compacted_into_a_summary():
+    user = get_user_model().objects.create_user(username="compact", password="pass")
+    service = DjangoSessionService(compact_after=10, keep_events=4)
+    session = asyncio.run(service.create_session(app_name=APP, user_id=str(user.id)))
+
+    for number in range(6):
+        turn(service, session, number)
+
+    loaded = asyncio.run(DjangoSessionService().get_session(app_name=APP, user_id=str(user.id), session_id=session.id))
+    compactions = [event.actions.compaction for event in loaded.events if event.actions.compaction]
+    assert [event.content.parts[0].text for event in loaded.events if event.content] == [
+        "question 4", "answer 4", "question 5", "answer 5"]
+    summary = compactions[0].compacted_content.parts[0].text
+    assert "user: question 0" in summary and "root_agent: answer 3" in summary and "question 4" not in summary
+    assert AgentSessionEvent.objects.count() == 13
+
+    for number in range(6, 11):
+        turn(service, session, number)
+    loaded = asyncio.run(service.get_session(app_name=APP, user_id=str(user.id), session_id=session.id))
+    summary = [event for event in loaded.events if event.actions.compaction][-1].actions.compaction \
+        .compacted_content.parts[0].text
+    assert summary.count("Summary of the earlier conversation") == 1
+    assert "user: question 0" in summary and "root_agent: answer 7" in summary and "question 8" not in summary
@@ -0,0 +1,78 @@
+import asyncio
+import datetime
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.flows.llm_flows.tools._thread_pool import _get_tool_thread_pool, _use_executor_for_sync_callables
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+from agents_adk.tools import finance_tools
+from agents_adk.tools.tool_cache import STATS_KEY, tool_cache
+from myFinance.models import Tag, Transaction
+
+
+@pytest.fixture
+def adk():
+    tool_cache.clear()
+    service = InMemorySessionService()
+    session = asyncio.run(service.create_session(app_name="FinanceAgent", user_id="1"))
+
+    async def run(tool, args, context):
+        # what the ADK runner does with the tool_thread_pool_config of ADKChatService
+        with _use_executor_for_sync_callables(_get_tool_thread_pool()):
+            return await FunctionTool(tool).run_async(args=args, tool_context=context)
+
+    def call(tool, invocation_id="turn-1", **args):
+        context = ToolContext(InvocationContext(session_service=service, invocation_id=invocation_id, session=session))
+        return json.loads(asyncio.run(run(tool, args, context))), context
+
+    yield call
+    tool_cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_tool_results_are_cached_per_turn_and_session(adk, django_assert_num_queries):
+    user = get_user_model().objects.create_user(username="cached", password="pass")
+    tag = Tag.objects.create(user=user, name="Food", key="food", expense=True)
+    transaction = Transaction.objects.create(user=user, name="shop", value=-20, date=datetime.date.today(), tag=tag)
+
+    listed, _ = adk(finance_tools.get_user_transactions, user_id=str(user.id))
+    summary, _ = adk(finance_tools.get_user_account_summary, user_id=str(user.id))
+    with django_assert_num_queries(0):
+        assert adk(finance_tools.get_user_transactions, user_id=str(user.id))[0] == listed
+        assert adk(finance_tools.get_user_account_summary, user_id=str(user.id), invocation_id="turn-2")[0] == summary
+    # the turn entries ended with the turn, the session ones did not
+    _, context = adk(finance_tools.get_user_transactions, invocation_id="turn-2", user_id=str(user.id))
+    assert context.state[STATS_KEY] == {"hits": 2, "misses": 3, "invalidations": 0}
+
+    result, context = adk(finance_tools.categorize_transaction, invocation_id="turn-2", user_id=str(user.id),
+                          transaction_id=str(transaction.id), category="Groceries")
+    assert result["success"]
+    assert context.state[STATS_KEY]["invalidations"] == 1
+    listed, _ = adk(finance_tools.get_user_transactions, invocation_id="turn-2", user_id=str(user.id))
+    assert listed["transactions"][0]["category"] == "Groceries"
+
+    # errors are not cached
+    adk(finance_tools.get_goal_progress, user_id="999")
+    assert tool_cache.stats(context)["misses"] == 5
+    adk(finance_tools.get_goal_progress, user_id="999")
+    assert tool_cache.stats(context)["misses"] == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_session_entries_follow_changes_outside_the_tools(adk):
+    user = get_user_model().objects.create_user(username="ingested", password="pass")
+    tag = Tag.objects.create(user=user, name="Salary", key="salary")
+    Transaction.objects.create(user=user, name="salary", value=1000, date=datetime.date.today(), tag=tag)
+
+    summary, _ = adk(finance_tools.get_user_account_summary, user_id=str(user.id))
+    assert adk(finance_tools.get_user_account_summary, user_id=str(user.id), invocation_id="turn-2")[0] == summary
+    # e.g. the celery ingestion, the model signals replace the data version
+    Transaction.objects.create(user=user, name="bonus", value=500, date=datetime.date.today(), tag=tag)
+    summary, context = adk(finance_tools.get_user_account_summary, user_id=str(user.id), invocation_id="turn-3")
+    assert summary["overview"]["total_income"] == 1500
+    assert context.state[STATS_KEY] == {"hits": 1, "misses": 2, "invalidations": 0}
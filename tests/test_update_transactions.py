@@ -0,0 +1,111 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from finance.utils import update_transactions
+from myFinance.models import Credential, DateInput, MonthlyTagTotal, Tag, Transaction, TransactionNameTag
+
+
+@pytest.fixture
+def credential():
+    user = get_user_model().objects.create_user(username="ingest", password="pass")
+    DateInput.objects.create(user=user, name="start_date", date=datetime.date(2024, 1, 10))
+    Tag.objects.create(user=user, name="Other", key="other")
+    return Credential.objects.create(user=user, company=Credential.CAL, credential="{}")
+
+
+def _rows(count, start=0):
+    return [
+        {
+            "date": datetime.datetime(2024, 3, 1) + datetime.timedelta(days=i % 28),
+            "name": f"Shop {i % 5}",
+            "value": 10 + i,
+            "identifier": f"id-{i}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.django_db
+def test_update_transactions_skips_existing_identifiers(credential):
+    first = update_transactions(credential, _rows(10))
+    assert first == {"inserted": 10, "skipped": 0, "invalid": 0}
+
+    second = update_transactions(credential, _rows(15))
+    assert second == {"inserted": 5, "skipped": 10, "invalid": 0}
+    assert Transaction.objects.filter(credential=credential).count() == 15
+
+
+@pytest.mark.django_db
+def test_update_transactions_skips_invalid_rows(credential):
+    rows = _rows(4)
+    del rows[1]["date"]
+    rows[2]["value"] = "n/a"
+
+    assert update_transactions(credential, rows) == {"inserted": 2, "skipped": 0, "invalid": 2}
+    assert set(Transaction.objects.values_list("identifier", flat=True)) == {"id-0", "id-3"}
+
+
+@pytest.mark.django_db
+def test_update_transactions_sets_tag_and_month(credential):
+    food = Tag.objects.create(user=credential.user, name="Food", key="food")
+    TransactionNameTag.objects.create(user=credential.user, transaction_name="Shop 0", tag=food)
+
+    update_transactions(credential, _rows(5))
+
+    assert Transaction.objects.get(identifier="id-0").tag == food
+    assert Transaction.objects.get(identifier="id-1").tag.key == "other"
+    assert TransactionNameTag.objects.get(user=credential.user, transaction_name="Shop 1").tag.key == "other"
+    txn = Transaction.objects.get(identifier="id-2")  # 2024-03-03, before the cycle start day
+    assert txn.month == 2
+    assert txn.month_date == datetime.date(2024, 2, 10)
+
+
+@pytest.mark.django_db
+def test_update_transactions_query_count_is_constant(credential, django_assert_max_num_queries):
+    # the ingestion itself and the rollup upsert: an insert of the missing rows and one update
+    with django_assert_max_num_queries(10 + 2):
+        update_transactions(credential, _rows(200))
+    assert Transaction.objects.filter(credential=credential).count() == 200
+
+
+def _spread_rows(credential, count, start=0):
+    """rows over 12 months and 15 tags, one rollup key each"""
+    for i in range(15):
+        tag = Tag.objects.get_or_create(user=credential.user, key=f"tag{i}", defaults={"name": f"Tag {i}"})[0]
+        TransactionNameTag.objects.get_or_create(user=credential.user, transaction_name=f"Shop {i}", tag=tag)
+    return [
+        {
+            "date": datetime.datetime(2023, 1 + i % 12, 15),
+            "name": f"Shop {i // 12 % 15}",
+            "value": 1 + i,
+            "identifier": f"id-{i}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _totals(user):
+    return {(row.month_date, row.tag_id): (row.value, row.count) for row in MonthlyTagTotal.objects.filter(user=user)}
+
+
+@pytest.mark.django_db
+def test_rollup_queries_do_not_depend_on_the_touched_months_and_tags(credential):
+    spread = _spread_rows(credential, 360)
+
+    def queries(rows):
+        with CaptureQueriesContext(connection) as captured:
+            update_transactions(credential, rows)
+        return len(captured)
+
+    # one key against 180 keys, first created and then updated
+    assert queries(_rows(180)) == queries(spread[:180])
+    assert queries(_rows(180, start=1000)) == queries(spread[180:])
+
+    current = _totals(credential.user)
+    assert len(current) > 180
+    MonthlyTagTotal.rebuild(credential.user)
+    assert _totals(credential.user) == current